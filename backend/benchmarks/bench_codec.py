@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Tiempo de (de)serialización por cada 1k items: capa resource de boto3
+(TypeSerializer/TypeDeserializer con Decimal, más la conversión a JSON que
+hacían las vistas) frente a launch_codec con el cliente de bajo nivel.
+
+    cd backend && python benchmarks/bench_codec.py
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launches.launch_codec import deserialize_launch, serialize_launch  # noqa: E402
+
+
+def sample_launch(n):
+    return {
+        'launch_id': f'5eb87cd9ffd86e000604b{n:03d}',
+        'mission_name': f'Starlink-{n}',
+        'rocket_name': 'Falcon 9',
+        'launch_date': '2020-01-29T14:07:00.000Z',
+        'launch_date_unix': 1580306820 + n,
+        'status': 'success',
+        'launchpad_name': 'CCSFS SLC 40',
+        'launchpad_full_name': 'Cape Canaveral Space Force Station Space Launch Complex 40',
+        'payload_names': [f'Starlink-{n} v1.0'],
+        'payload_types': ['Satellite'],
+        'patch_image': 'https://images2.imgbox.com/9a/96/nLppz9HW_o.png',
+        'webcast_url': 'https://youtu.be/1GxY2SEqEYc',
+        'article_url': 'https://spaceflightnow.com/2020/01/29/',
+        'wikipedia_url': 'https://en.wikipedia.org/wiki/Starlink',
+        'details': 'Fourth Starlink launch. ' * 10,
+        'flight_number': n,
+        'last_updated': '2024-01-01T00:00:00+00:00',
+    }
+
+
+def decimal_encoder(obj):
+    if isinstance(obj, Decimal):
+        return float(obj) if obj % 1 != 0 else int(obj)
+    raise TypeError
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    launches = [sample_launch(n) for n in range(1000)]
+    resource_items = [
+        dict(launch, launch_date_unix=Decimal(launch['launch_date_unix']), flight_number=Decimal(launch['flight_number']))
+        for launch in launches
+    ]
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+    wire_items = [serialize_launch(launch) for launch in launches]
+
+    cases = {
+        'write: TypeSerializer': lambda: [
+            {key: serializer.serialize(value) for key, value in item.items()} for item in resource_items
+        ],
+        'write: launch_codec': lambda: [serialize_launch(launch) for launch in launches],
+        'read: TypeDeserializer + JSON': lambda: [
+            json.loads(json.dumps(
+                {key: deserializer.deserialize(value) for key, value in item.items()},
+                default=decimal_encoder
+            ))
+            for item in wire_items
+        ],
+        'read: launch_codec': lambda: [deserialize_launch(item) for item in wire_items],
+    }
+
+    print(f"{'path':<32} {'ms / 1k items':>14}")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:<32} {best * 1000:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Efecto de comprimir los atributos de detalle (details, payload_names) sobre
+el tamaño de item en DynamoDB y, con él, sobre WCU por escritura, RCU por
+lectura y almacenamiento; también el coste de CPU de comprimir en el ingester
+y de descomprimir en el backend.
+
+El tamaño se calcula con las reglas de DynamoDB (nombres + valores en UTF-8),
+así que no hace falta una tabla real.
+
+    cd backend && python benchmarks/bench_compression.py
+    cd backend && python benchmarks/bench_compression.py --codec zstd
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_codec import sample_launch  # noqa: E402
+from launches.launch_codec import (  # noqa: E402
+    Compression, Launch, deserialize_launch, serialize_detail
+)
+
+WORDS = (
+    'falcon booster stage landing droneship orbit satellite payload fairing recovery '
+    'mission customer static fire scrub weather engine merlin second deploy '
+    'constellation geostationary transfer insertion nominal telemetry reentry'
+).split()
+
+
+def attribute_size(attribute):
+    """Tamaño aproximado de un AttributeValue según las reglas de DynamoDB"""
+    kind, value = next(iter(attribute.items()))
+    if kind in ('S', 'B'):
+        return len(value.encode('utf-8')) if kind == 'S' else len(value)
+    if kind == 'N':
+        return math.ceil(len(value.lstrip('-').replace('.', '')) / 2) + 1
+    if kind == 'L':
+        return 3 + sum(attribute_size(element) + 1 for element in value)
+    if kind == 'M':
+        return 3 + sum(len(key) + attribute_size(element) + 1 for key, element in value.items())
+    return 1
+
+
+def item_size(item):
+    return sum(len(name) + attribute_size(attribute) for name, attribute in item.items())
+
+
+def detail_launch(n, details_bytes, payloads, rng):
+    launch = sample_launch(n)
+    words = []
+    while sum(len(word) + 1 for word in words) < details_bytes:
+        words.append(rng.choice(WORDS))
+    launch['details'] = ' '.join(words).capitalize() + '.'
+    launch['payload_names'] = [f'Starlink Group {n}-{index} ({rng.randint(1000, 9999)})' for index in range(payloads)]
+    return Launch(**launch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--codec', choices=['zlib', 'zstd'], default='zlib')
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--sizes', default='300,1000,3000,8000', help='bytes de details por escenario')
+    args = parser.parse_args()
+
+    compression = Compression(fields=['details', 'payload_names'], codec=args.codec)
+    if compression.codec != args.codec:
+        print(f'{args.codec} is not installed, falling back to {compression.codec}')
+    rng = random.Random(42)
+
+    print(f"{'details B':>9} {'item B':>7} {'comp B':>7} {'ratio':>6} "
+          f"{'WCU':>5} {'WCU c':>6} {'RCU':>5} {'RCU c':>6} {'enc us':>7} {'dec us':>7}")
+    for details_bytes in (int(value) for value in args.sizes.split(',')):
+        launches = [detail_launch(n, details_bytes, 1 + details_bytes // 500, rng) for n in range(args.items)]
+        plain = [serialize_detail(launch) for launch in launches]
+        packed = [serialize_detail(launch, compression) for launch in launches]
+
+        plain_size = sum(map(item_size, plain)) / len(plain)
+        packed_size = sum(map(item_size, packed)) / len(packed)
+        # WCU: 1 por KB; RCU: 0,5 por 4 KB con lectura eventual (BatchGetItem)
+        wcu = sum(math.ceil(item_size(item) / 1024) for item in plain) / len(plain)
+        wcu_packed = sum(math.ceil(item_size(item) / 1024) for item in packed) / len(packed)
+        rcu = sum(math.ceil(item_size(item) / 4096) * 0.5 for item in plain) / len(plain)
+        rcu_packed = sum(math.ceil(item_size(item) / 4096) * 0.5 for item in packed) / len(packed)
+
+        encode = min(timeit.repeat(
+            lambda: [serialize_detail(launch, compression) for launch in launches], number=1, repeat=5
+        )) / len(launches) * 1e6
+        decode = min(timeit.repeat(
+            lambda: [deserialize_launch(item).to_dict() for item in packed], number=1, repeat=5
+        )) / len(packed) * 1e6
+        decode_plain = min(timeit.repeat(
+            lambda: [deserialize_launch(item).to_dict() for item in plain], number=1, repeat=5
+        )) / len(plain) * 1e6
+
+        print(f"{details_bytes:>9} {plain_size:>7.0f} {packed_size:>7.0f} {packed_size / plain_size:>6.2f} "
+              f"{wcu:>5.2f} {wcu_packed:>6.2f} {rcu:>5.2f} {rcu_packed:>6.2f} "
+              f"{encode:>7.1f} {decode - decode_plain:>7.1f}")
+
+    print('\nenc us: serialize_detail con compresión; dec us: coste extra de descomprimir en to_dict()')
+
+
+if __name__ == '__main__':
+    main()
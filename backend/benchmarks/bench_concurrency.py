@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Mide cómo escala el throughput del backend al aumentar las peticiones en
+vuelo. Útil para comparar WSGI (workers sync) con ASGI (vistas async).
+
+    # WSGI
+    gunicorn --workers 3 spacex_site.wsgi:application
+    # ASGI
+    gunicorn -k uvicorn.workers.UvicornWorker --workers 1 spacex_site.asgi:application
+
+    python benchmarks/bench_concurrency.py --url http://localhost:8000/api/launches/?limit=20
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_level(url, concurrency, duration):
+    """Mantiene `concurrency` peticiones en vuelo durante `duration` segundos"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'concurrency': concurrency,
+        'requests': count,
+        'errors': errors,
+        'rps': count / duration,
+        'p50_ms': latencies[count // 2] if count else 0.0,
+        'p99_ms': latencies[max(int(count * 0.99) - 1, 0)] if count else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000/api/launches/?limit=20')
+    parser.add_argument('--levels', default='1,2,4,8,16,32,64', help='Niveles de concurrencia separados por comas')
+    parser.add_argument('--duration', type=float, default=10.0, help='Segundos por nivel')
+    args = parser.parse_args()
+
+    print(f"{'in-flight':>9} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for level in (int(value) for value in args.levels.split(',')):
+        result = run_level(args.url, level, args.duration)
+        print(f"{result['concurrency']:>9} {result['requests']:>9} {result['errors']:>7} "
+              f"{result['rps']:>8.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
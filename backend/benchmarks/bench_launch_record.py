@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Memoria por lanzamiento cacheado y tiempo de construcción: dict plano (lo
+que devolvían el transform y DynamoDBService) frente al registro Launch.
+
+    cd backend && python benchmarks/bench_launch_record.py
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_codec import sample_launch  # noqa: E402
+from launches import launch_codec  # noqa: E402
+from launches.launch_codec import decode_value, deserialize_launch, serialize_launch  # noqa: E402
+
+
+def decode_to_dict(attributes):
+    """Decodificación a dict, equivalente a la de antes de Launch"""
+    decoders = launch_codec._DECODERS
+    return {
+        name: decoders[name](attribute) if name in decoders else decode_value(attribute)
+        for name, attribute in attributes.items()
+    }
+
+
+def measure_memory(build, wire_items):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    cache = [build(item) for item in wire_items]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del cache
+    return allocated / len(wire_items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000)
+    args = parser.parse_args()
+
+    # Valores repetidos como en la tabla real (pocas variantes de estado/cohete)
+    wire_items = [serialize_launch(sample_launch(n % 1000)) for n in range(args.items)]
+
+    print(f"{'record':<8} {'bytes/launch':>13} {'us/construct':>13}")
+    for name, build in (('dict', decode_to_dict), ('Launch', deserialize_launch)):
+        memory = measure_memory(build, wire_items)
+        seconds = min(timeit.repeat(lambda: [build(item) for item in wire_items], number=1, repeat=15))
+        print(f"{name:<8} {memory:>13.0f} {seconds / args.items * 1e6:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Mide el coste por petición del stack de Django/DRF con el perfil completo y
+con API_PROFILE=True. DynamoDB se sustituye por datos fijos para que solo
+cuente el framework.
+
+    cd backend && python benchmarks/bench_middleware.py
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ['/health/', '/api/launches/?limit=20', '/api/launches/bench0001/']
+
+
+def measure(requests_per_path):
+    """Se ejecuta en un subproceso: los settings se leen al importar Django"""
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spacex_site.settings')
+
+    from unittest.mock import patch
+    from django.core.wsgi import get_wsgi_application
+    from launches.services import DynamoDBService
+
+    item = {'launch_id': 'bench0001', 'launch_date': '2020-01-01T00:00:00.000Z', 'mission_name': 'Bench'}
+    patch.object(DynamoDBService, '__init__', lambda self: None).start()
+    patch.object(DynamoDBService, 'get_all_launches', lambda self, **kwargs: {
+        'items': [item] * 20, 'last_evaluated_key': None, 'count': 20, 'scanned_count': 20
+    }).start()
+    patch.object(DynamoDBService, 'get_launch_by_id', lambda self, launch_id: item).start()
+
+    application = get_wsgi_application()
+
+    def call(path):
+        url, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': url, 'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '8000', 'HTTP_HOST': 'localhost',
+            'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+        }
+        body = application(environ, lambda status, headers: None)
+        b''.join(body)
+        body.close()
+
+    results = {}
+    for path in PATHS:
+        for _ in range(50):
+            call(path)
+        start = time.perf_counter()
+        for _ in range(requests_per_path):
+            call(path)
+        results[path] = (time.perf_counter() - start) / requests_per_path * 1e6
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.requests)
+        return
+
+    profiles = {}
+    for name, api_profile in (('full', 'False'), ('api', 'True')):
+        env = dict(os.environ, API_PROFILE=api_profile, DEBUG='False')
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', '--requests', str(args.requests)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        profiles[name] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'path':<28} {'full us/req':>12} {'api us/req':>12} {'saved':>7}")
+    for path in PATHS:
+        full, api = profiles['full'][path], profiles['api'][path]
+        print(f"{path:<28} {full:>12.1f} {api:>12.1f} {(1 - api / full) * 100:>6.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Compara la lectura puntual por Query (solo launch_id) con GetItem (clave
+completa resuelta con el mapa de claves) contra DynamoDB Local.
+
+    docker run -p 8001:8000 amazon/dynamodb-local
+    python benchmarks/bench_point_lookup.py --endpoint-url http://localhost:8001
+"""
+import argparse
+import random
+import statistics
+import time
+
+import boto3
+from boto3.dynamodb.conditions import Key
+
+
+def create_table(dynamodb, table_name):
+    existing = [table.name for table in dynamodb.tables.all()]
+    if table_name in existing:
+        dynamodb.Table(table_name).delete()
+        dynamodb.Table(table_name).wait_until_not_exists()
+
+    table = dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {'AttributeName': 'launch_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'launch_date', 'KeyType': 'RANGE'},
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'launch_id', 'AttributeType': 'S'},
+            {'AttributeName': 'launch_date', 'AttributeType': 'S'},
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    table.wait_until_exists()
+    return table
+
+
+def seed(table, count):
+    keys = {}
+    with table.batch_writer() as batch:
+        for n in range(count):
+            launch_id = f'bench{n:06d}'
+            launch_date = f'20{n % 24:02d}-01-01T00:00:00.000Z'
+            keys[launch_id] = launch_date
+            batch.put_item(Item={
+                'launch_id': launch_id,
+                'launch_date': launch_date,
+                'mission_name': f'Mission {n}',
+                'status': 'success',
+                'details': 'x' * 512,
+            })
+    return keys
+
+
+def timed(fn, launch_ids):
+    latencies = []
+    capacity = 0.0
+    for launch_id in launch_ids:
+        start = time.perf_counter()
+        response = fn(launch_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+        capacity += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+    latencies.sort()
+    return {
+        'mean_ms': statistics.mean(latencies),
+        'p50_ms': latencies[len(latencies) // 2],
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+        'rcu_per_read': capacity / len(launch_ids),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint-url', default='http://localhost:8001')
+    parser.add_argument('--table-name', default='spacex-launches-bench')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--reads', type=int, default=2000)
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        endpoint_url=args.endpoint_url,
+        region_name='us-east-1',
+        aws_access_key_id='local',
+        aws_secret_access_key='local'
+    )
+    table = create_table(dynamodb, args.table_name)
+    keys = seed(table, args.items)
+    launch_ids = random.Random(42).choices(list(keys), k=args.reads)
+
+    results = {
+        'query': timed(
+            lambda launch_id: table.query(
+                KeyConditionExpression=Key('launch_id').eq(launch_id),
+                Limit=1,
+                ReturnConsumedCapacity='TOTAL'
+            ),
+            launch_ids
+        ),
+        'get_item': timed(
+            lambda launch_id: table.get_item(
+                Key={'launch_id': launch_id, 'launch_date': keys[launch_id]},
+                ConsistentRead=False,
+                ReturnConsumedCapacity='TOTAL'
+            ),
+            launch_ids
+        ),
+    }
+
+    print(f"{'path':<10} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'RCU/read':>9}")
+    for path, result in results.items():
+        print(f"{path:<10} {result['mean_ms']:>9.3f} {result['p50_ms']:>9.3f} "
+              f"{result['p99_ms']:>9.3f} {result['rcu_per_read']:>9.2f}")
+
+    table.delete()
+
+
+if __name__ == '__main__':
+    main()
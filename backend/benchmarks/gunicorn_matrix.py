@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Matriz de carga sobre configuraciones de gunicorn.conf.py (clase de worker,
+workers e hilos) para elegir los valores por defecto de la tarea Fargate.
+Arranca cada configuración en local, la somete a varios niveles de
+concurrencia y muestra req/s y p99.
+
+Para reproducir la tarea de 0.25 vCPU / 512 MB conviene ejecutarlo dentro
+del contenedor con límites equivalentes:
+
+    docker run --cpus 0.25 --memory 512m -e TABLE_NAME=... spacex-backend \\
+        python benchmarks/gunicorn_matrix.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_concurrency import run_level  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATRIX = [
+    {'GUNICORN_WORKER_CLASS': 'sync', 'WEB_CONCURRENCY': '2'},
+    {'GUNICORN_WORKER_CLASS': 'sync', 'WEB_CONCURRENCY': '3'},
+    {'GUNICORN_WORKER_CLASS': 'gthread', 'WEB_CONCURRENCY': '2', 'GUNICORN_THREADS': '4'},
+    {'GUNICORN_WORKER_CLASS': 'gthread', 'WEB_CONCURRENCY': '2', 'GUNICORN_THREADS': '8'},
+    {'GUNICORN_WORKER_CLASS': 'gthread', 'WEB_CONCURRENCY': '1', 'GUNICORN_THREADS': '16'},
+    {'GUNICORN_WORKER_CLASS': 'uvicorn', 'WEB_CONCURRENCY': '1'},
+    {'GUNICORN_WORKER_CLASS': 'uvicorn', 'WEB_CONCURRENCY': '2'},
+]
+
+
+def wait_until_healthy(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'{base_url}/health/', timeout=2):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError('gunicorn did not become healthy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/api/launches/?limit=20')
+    parser.add_argument('--port', type=int, default=8010)
+    parser.add_argument('--levels', default='4,16,64')
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    levels = [int(value) for value in args.levels.split(',')]
+
+    print(f"{'config':<40} {'in-flight':>9} {'req/s':>8} {'p99 ms':>9} {'errors':>7}")
+    for config in MATRIX:
+        env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{args.port}', **config)
+        server = subprocess.Popen(
+            ['gunicorn', '--config', 'gunicorn.conf.py', '--access-logfile', '/dev/null'],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_healthy(base_url)
+            label = ' '.join(f'{key.split("_")[-1].lower()}={value}' for key, value in config.items())
+            for level in levels:
+                result = run_level(base_url + args.path, level, args.duration)
+                print(f"{label:<40} {level:>9} {result['rps']:>8.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
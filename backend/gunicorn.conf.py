@@ -0,0 +1,109 @@
+"""
+Configuración de gunicorn para el backend.
+
+Variables de entorno:
+    GUNICORN_WORKER_CLASS  sync | gthread | uvicorn (por defecto gthread)
+    WEB_CONCURRENCY        número de workers (por defecto según la cuota de CPU)
+    GUNICORN_THREADS       hilos por worker con gthread (por defecto 4)
+    CPU_QUOTA              vCPUs de la tarea si el cgroup no la expone (ej. 0.25)
+    GUNICORN_KEEPALIVE     segundos de keep-alive (> idle timeout del ALB, 60s)
+    GUNICORN_MAX_REQUESTS  reciclado de workers (0 lo desactiva)
+    WARM_KEY_MAP           carga el mapa de claves antes del fork
+    GUNICORN_ACCESS_LOG    access log propio de gunicorn ('-' para stdout)
+    PROMETHEUS_MULTIPROC_DIR  ficheros de métricas compartidos entre workers
+"""
+import math
+import os
+import shutil
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+
+
+def cpu_quota():
+    """vCPUs disponibles según el cgroup; en Fargate suele ser una fracción"""
+    if os.environ.get('CPU_QUOTA'):
+        return float(os.environ['CPU_QUOTA'])
+    try:
+        # cgroup v2
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return float(os.cpu_count() or 1)
+
+
+def default_workers(kind, cpus):
+    if kind == 'sync':
+        # Los workers sync se bloquean en la E/S de DynamoDB: 2n+1 clásico
+        return max(2, math.ceil(2 * cpus + 1))
+    if kind == 'gthread':
+        return max(2, math.ceil(cpus * 2))
+    # uvicorn: un event loop por CPU
+    return max(1, math.ceil(cpus))
+
+
+_kind = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if _kind not in WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {sorted(WORKER_CLASSES)}, got {_kind!r}")
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = WORKER_CLASSES[_kind]
+workers = int(os.environ.get('WEB_CONCURRENCY') or default_workers(_kind, cpu_quota()))
+threads = int(os.environ.get('GUNICORN_THREADS', '4')) if _kind == 'gthread' else 1
+# El control de admisión reserva hilos para las vistas baratas (launches/admission.py);
+# con uvicorn los hilos son los del pool de DynamoDB (DYNAMODB_MAX_CONCURRENCY), no estos
+if _kind != 'uvicorn':
+    os.environ.setdefault('WORKER_THREADS', str(threads))
+wsgi_app = 'spacex_site.asgi:application' if _kind == 'uvicorn' else 'spacex_site.wsgi:application'
+
+# Cargar la app en el master: Django, modelos boto3 y cachés se comparten copy-on-write
+preload_app = True
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '75'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 20
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+# El access log JSON (con tiempos de DynamoDB) lo escribe la app en launches.access
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+
+# prometheus_client lee la variable al importarse y preload_app carga la app
+# antes que cualquier hook: el directorio se prepara (vacío) al leer la config
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-multiproc')
+shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    """Se ejecuta en el master tras cargar la app y antes de crear workers"""
+    from launches.services import dynamodb_connections
+    dynamodb_connections.warm_up(load_key_map=os.environ.get('WARM_KEY_MAP', 'False').lower() == 'true')
+
+
+def post_fork(server, worker):
+    """Los pools HTTP heredados del master no se comparten entre procesos"""
+    from launches.services import dynamodb_connections
+    dynamodb_connections.reset()
+
+
+def child_exit(server, worker):
+    """Los gauges 'live' de un worker muerto dejan de sumarse en /metrics"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,268 @@
+"""
+Control de admisión para las vistas caras.
+
+/api/search/, /api/statistics/, /api/dashboard/ y /api/filter/ pueden
+recorrer la tabla entera; una ráfaga de ellas ocupa todos los hilos de los
+workers y las peticiones baratas (/api/launches/<id>/, /health/) se quedan esperando
+detrás. Por worker y por vista con política (ADMISSION_POLICIES) se aplica:
+
+- un token bucket (peticiones/s y ráfaga): si no hay token, 429;
+- un límite de peticiones simultáneas, y además un presupuesto común
+  EXPENSIVE_QUERY_BUDGET para todas las vistas caras juntas;
+- una cola corta y común: si no hay hueco la petición espera como mucho
+  ADMISSION_QUEUE_TIMEOUT_SECONDS; con ADMISSION_QUEUE_DEPTH peticiones ya
+  esperando, o si se agota la espera, 503.
+
+Con gthread una petición en cola también ocupa un hilo, así que las
+ejecuciones más las esperas nunca pasan de WORKER_THREADS (lo exporta
+gunicorn.conf.py) menos ADMISSION_RESERVED_THREADS: esos hilos quedan
+siempre libres para las vistas sin política, que no pasan por aquí. Bajo
+ASGI (ASYNC_API) las vistas corren en el pool de async_views
+(DYNAMODB_MAX_CONCURRENCY hilos) y las que esperan son corrutinas sin hilo:
+la reserva se descuenta de ese pool y la cola no compite con él.
+Las respuestas rechazadas llevan Retry-After.
+
+ADMISSION_POLICIES tiene el formato "Vista=simultáneas:peticiones_s:ráfaga,..."
+y sustituye a DEFAULT_POLICIES; ADMISSION_CONTROL=False desactiva el
+middleware.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+from . import metrics as prometheus
+
+ADMISSION_CONTROL = os.environ.get('ADMISSION_CONTROL', 'True').lower() == 'true'
+
+
+def thread_limits(environ=os.environ):
+    """(hilos del worker, hilos reservados, presupuesto común, profundidad de la cola)"""
+    async_api = environ.get('ASYNC_API', 'False').lower() == 'true'
+    if async_api:
+        threads = int(environ.get('DYNAMODB_MAX_CONCURRENCY', '16'))
+    else:
+        threads = int(environ.get('WORKER_THREADS', '4'))
+    reserved = int(environ.get('ADMISSION_RESERVED_THREADS', '1'))
+    # Con un solo hilo (workers sync) no hay nada que reservar
+    available = max(threads - reserved, 1)
+    budget = min(int(environ.get('EXPENSIVE_QUERY_BUDGET', '2')), available)
+    # Con gthread la cola ocupa los hilos que deja el presupuesto; bajo ASGI no ocupa ninguno
+    queue_room = available if async_api else available - budget
+    queue_depth = min(int(environ.get('ADMISSION_QUEUE_DEPTH', str(queue_room))), queue_room)
+    return threads, reserved, budget, queue_depth
+
+
+WORKER_THREADS, ADMISSION_RESERVED_THREADS, EXPENSIVE_QUERY_BUDGET, ADMISSION_QUEUE_DEPTH = thread_limits()
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_SECONDS', '2'))
+# Espera entre comprobaciones de la cola bajo ASGI (no se bloquea el event loop)
+ADMISSION_POLL_SECONDS = 0.01
+
+# vista: (simultáneas, peticiones/s, ráfaga)
+DEFAULT_POLICIES = {
+    'SearchLaunchesView': (2, 5.0, 10),
+    'LaunchStatisticsView': (1, 2.0, 5),
+    # Incluye el mismo scan que /api/statistics/
+    'DashboardView': (1, 2.0, 5),
+    # Sin índice aplicable (solo q o launchpad) recorre hasta FILTER_MAX_PAGES páginas
+    'LaunchFilterView': (2, 5.0, 10),
+}
+
+
+def parse_policies(value):
+    policies = {}
+    for entry in filter(None, (part.strip() for part in value.split(','))):
+        view, _, limits = entry.partition('=')
+        concurrency, rate, burst = limits.split(':')
+        policies[view.strip()] = (int(concurrency), float(rate), int(burst))
+    return policies
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """0 si hay token; si no, segundos hasta el siguiente"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class Rejected:
+    def __init__(self, status, reason, retry_after):
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(int(math.ceil(retry_after)), 1)
+
+
+QUEUED = object()
+
+
+class AdmissionController:
+    def __init__(self, policies, budget=EXPENSIVE_QUERY_BUDGET, queue_depth=ADMISSION_QUEUE_DEPTH,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS):
+        self.policies = policies
+        self.budget = budget
+        self.queue_depth = queue_depth
+        self.queue_timeout = queue_timeout
+        self._buckets = {view: TokenBucket(rate, burst) for view, (_, rate, burst) in policies.items()}
+        self._active = dict.fromkeys(policies, 0)
+        self._waiting = dict.fromkeys(policies, 0)
+        # Duración media (EWMA) de cada vista, para estimar Retry-After
+        self._service_seconds = dict.fromkeys(policies, 1.0)
+        self._expensive = 0
+        self._cond = threading.Condition()
+
+    def controls(self, view):
+        return view in self.policies
+
+    def admit(self, view):
+        """None si la petición pasa (y ocupa hueco hasta release); Rejected si no"""
+        decision = self._arrive(view)
+        if decision is not QUEUED:
+            return decision
+        start = time.monotonic()
+        deadline = start + self.queue_timeout
+        with self._cond:
+            while not self._has_slot(view):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self._give_up(view)
+                self._cond.wait(remaining)
+            return self._dequeue(view, start)
+
+    async def aadmit(self, view):
+        decision = self._arrive(view)
+        if decision is not QUEUED:
+            return decision
+        start = time.monotonic()
+        deadline = start + self.queue_timeout
+        while True:
+            with self._cond:
+                if self._has_slot(view):
+                    return self._dequeue(view, start)
+                if time.monotonic() >= deadline:
+                    return self._give_up(view)
+            await asyncio.sleep(ADMISSION_POLL_SECONDS)
+
+    def release(self, view, seconds):
+        with self._cond:
+            self._active[view] -= 1
+            self._expensive -= 1
+            self._service_seconds[view] = 0.8 * self._service_seconds[view] + 0.2 * seconds
+            self._cond.notify_all()
+
+    def _arrive(self, view):
+        wait = self._buckets[view].take()
+        if wait:
+            return Rejected(429, 'rate_limited', wait)
+        with self._cond:
+            if self._has_slot(view) and not self._waiting[view]:
+                self._take(view)
+                return None
+            if sum(self._waiting.values()) >= self.queue_depth:
+                return Rejected(503, 'queue_full', self._drain_estimate(view))
+            self._waiting[view] += 1
+            return QUEUED
+
+    def _has_slot(self, view):
+        return self._active[view] < self.policies[view][0] and self._expensive < self.budget
+
+    def _take(self, view):
+        self._active[view] += 1
+        self._expensive += 1
+
+    def _dequeue(self, view, start):
+        self._waiting[view] -= 1
+        self._take(view)
+        prometheus.observe_admission_wait(view, time.monotonic() - start)
+        return None
+
+    def _give_up(self, view):
+        self._waiting[view] -= 1
+        return Rejected(503, 'queue_timeout', self._drain_estimate(view))
+
+    def _drain_estimate(self, view):
+        """Tiempo aproximado hasta vaciar la cola actual de la vista"""
+        concurrency = self.policies[view][0]
+        return self._service_seconds[view] * (self._waiting[view] + 1) / concurrency
+
+
+admission = AdmissionController(
+    parse_policies(os.environ['ADMISSION_POLICIES']) if os.environ.get('ADMISSION_POLICIES') else DEFAULT_POLICIES
+)
+
+
+def _view(request):
+    try:
+        return prometheus.match_view_name(resolve(request.path_info))
+    except Resolver404:
+        return None
+
+
+def _rejection_response(view, rejected):
+    prometheus.observe_admission_rejected(view, rejected.reason)
+    message = 'Too many requests' if rejected.status == 429 else 'Server is busy'
+    return JsonResponse(
+        {'error': message, 'reason': rejected.reason},
+        status=rejected.status,
+        headers={'Retry-After': str(rejected.retry_after)}
+    )
+
+
+class AdmissionControlMiddleware:
+    """Aplica `admission` a las vistas con política (síncrono y async)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not ADMISSION_CONTROL:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        view = _view(request)
+        if not admission.controls(view):
+            return self.get_response(request)
+        rejected = admission.admit(view)
+        if rejected:
+            return _rejection_response(view, rejected)
+        start = time.monotonic()
+        try:
+            return self.get_response(request)
+        finally:
+            admission.release(view, time.monotonic() - start)
+
+    async def __acall__(self, request):
+        view = _view(request)
+        if not admission.controls(view):
+            return await self.get_response(request)
+        rejected = await admission.aadmit(view)
+        if rejected:
+            return _rejection_response(view, rejected)
+        start = time.monotonic()
+        try:
+            return await self.get_response(request)
+        finally:
+            admission.release(view, time.monotonic() - start)
@@ -0,0 +1,45 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.views.decorators.csrf import csrf_exempt
+
+from .profiling import profile_label, run_profiled
+
+# Hilos dedicados a las llamadas bloqueantes a DynamoDB. El límite acota la
+# concurrencia real contra la tabla aunque el event loop acepte más peticiones.
+DYNAMODB_MAX_CONCURRENCY = int(os.environ.get('DYNAMODB_MAX_CONCURRENCY', '16'))
+
+_executor = ThreadPoolExecutor(
+    max_workers=DYNAMODB_MAX_CONCURRENCY,
+    thread_name_prefix='dynamodb'
+)
+
+
+def offload(view):
+    """
+    Convierte una vista síncrona en una vista async que se ejecuta en el pool
+    acotado, sin bloquear el event loop mientras espera a DynamoDB.
+
+    Bajo ASGI Django ejecuta las vistas síncronas en un único hilo compartido
+    (thread_sensitive), por lo que sin esto las peticiones se serializan.
+    """
+    def run_view(request, *args, **kwargs):
+        # ProfilingMiddleware marca la petición; el perfil se toma en este hilo
+        label = profile_label.get()
+        if label is not None:
+            return run_profiled(label, view, request, *args, **kwargs)
+        return view(request, *args, **kwargs)
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            _executor,
+            functools.partial(context.run, run_view, request, *args, **kwargs)
+        )
+
+    return csrf_exempt(async_view)
@@ -0,0 +1,266 @@
+"""
+Instrumentación por petición: tiempo y número de llamadas a DynamoDB, items
+leídos frente a devueltos y capacidad consumida (ReturnConsumedCapacity).
+
+Las métricas de la petición en curso viven en un contextvar; offload() copia
+el contexto al hilo del pool, así que las llamadas hechas allí también cuentan.
+PerformanceMiddleware las publica como cabecera Server-Timing, como línea JSON
+en el logger launches.access y en histogramas por endpoint que se vuelcan al
+logger launches.metrics cada METRICS_LOG_INTERVAL_SECONDS. También alimenta
+las métricas Prometheus definidas en metrics.py.
+"""
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics as prometheus
+from .resilience import CircuitOpenError, dynamodb_breaker, note_unavailable
+
+access_logger = logging.getLogger('launches.access')
+metrics_logger = logging.getLogger('launches.metrics')
+
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', 'True').lower() == 'true'
+METRICS_LOG_INTERVAL_SECONDS = int(os.environ.get('METRICS_LOG_INTERVAL_SECONDS', '60'))
+
+# Operaciones de lectura que admiten ReturnConsumedCapacity
+READ_OPERATIONS = frozenset(('scan', 'query', 'get_item', 'batch_get_item'))
+
+# Límites superiores (ms) de los buckets de latencia
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+current_metrics = contextvars.ContextVar('dynamodb_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Acumulado de llamadas a DynamoDB de una petición"""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.scanned = 0
+        self.returned = 0
+        self.capacity_units = 0.0
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, response):
+        """Acumula una llamada y devuelve las unidades de capacidad consumidas"""
+        scanned = returned = 0
+        capacity_units = 0.0
+        if response:
+            if operation in ('scan', 'query'):
+                returned = response.get('Count', 0)
+                scanned = response.get('ScannedCount', returned)
+            elif operation == 'get_item':
+                scanned = returned = 1 if response.get('Item') else 0
+            else:
+                scanned = returned = sum(len(items) for items in response.get('Responses', {}).values())
+            capacity = response.get('ConsumedCapacity') or ()
+            for entry in [capacity] if isinstance(capacity, dict) else capacity:
+                capacity_units += entry.get('CapacityUnits', 0)
+
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+            self.scanned += scanned
+            self.returned += returned
+            self.capacity_units += capacity_units
+            self.operations[operation] = self.operations.get(operation, 0) + 1
+        return capacity_units
+
+    def server_timing(self, total_seconds):
+        return (
+            f'ddb;dur={self.seconds * 1000:.1f};desc="calls={self.calls} scanned={self.scanned} '
+            f'returned={self.returned} rcu={self.capacity_units:g}", '
+            f'app;dur={total_seconds * 1000:.1f}'
+        )
+
+
+class InstrumentedClient:
+    """
+    Envoltorio del cliente boto3 que registra las lecturas en las métricas de
+    la petición en curso. Fuera de una petición delega sin cambiar parámetros.
+    Todas las lecturas pasan por el circuit breaker de DynamoDB.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        if name not in READ_OPERATIONS:
+            return method
+
+        def call(**params):
+            # Con el circuito abierto falla aquí mismo, sin llegar a DynamoDB
+            try:
+                dynamodb_breaker.before_call()
+            except CircuitOpenError as e:
+                note_unavailable(e)
+                raise
+            metrics = current_metrics.get()
+            if metrics is not None:
+                params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+            response = None
+            start = time.perf_counter()
+            try:
+                response = method(**params)
+            except Exception as e:
+                dynamodb_breaker.record(e)
+                note_unavailable(e)
+                raise
+            finally:
+                if metrics is not None:
+                    seconds = time.perf_counter() - start
+                    prometheus.observe_dynamodb_call(name, seconds, metrics.record(name, seconds, response))
+            dynamodb_breaker.record()
+            return response
+
+        return call
+
+
+class EndpointStats:
+    """Histogramas de latencia y totales de DynamoDB por endpoint, en memoria del worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._last_flush = time.monotonic()
+
+    def observe(self, endpoint, status_code, seconds, metrics):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'count': 0, 'errors': 0, 'seconds': 0.0, 'ddb_seconds': 0.0, 'ddb_calls': 0,
+                    'scanned': 0, 'returned': 0, 'rcu': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            stats['count'] += 1
+            stats['errors'] += status_code >= 500
+            stats['seconds'] += seconds
+            stats['ddb_seconds'] += metrics.seconds
+            stats['ddb_calls'] += metrics.calls
+            stats['scanned'] += metrics.scanned
+            stats['returned'] += metrics.returned
+            stats['rcu'] += metrics.capacity_units
+            stats['buckets'][bucket] += 1
+
+    def snapshot(self, reset=False):
+        with self._lock:
+            endpoints = {endpoint: dict(stats, buckets=list(stats['buckets'])) for endpoint, stats in self._endpoints.items()}
+            if reset:
+                self._endpoints = {}
+                self._last_flush = time.monotonic()
+        return endpoints
+
+    def flush_if_due(self, interval=METRICS_LOG_INTERVAL_SECONDS):
+        """Vuelca y reinicia los histogramas si ha pasado el intervalo"""
+        if time.monotonic() - self._last_flush < interval:
+            return
+        for endpoint, stats in self.snapshot(reset=True).items():
+            metrics_logger.info(json.dumps({
+                'endpoint': endpoint,
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'p50_ms': percentile(stats['buckets'], 0.50),
+                'p95_ms': percentile(stats['buckets'], 0.95),
+                'p99_ms': percentile(stats['buckets'], 0.99),
+                'avg_ms': round(stats['seconds'] / stats['count'] * 1000, 1),
+                'ddb_avg_ms': round(stats['ddb_seconds'] / stats['count'] * 1000, 1),
+                'ddb_calls': stats['ddb_calls'],
+                'scanned': stats['scanned'],
+                'returned': stats['returned'],
+                'rcu': round(stats['rcu'], 1),
+            }))
+
+
+def percentile(buckets, quantile):
+    """Límite superior del bucket que contiene el percentil (None si no hay datos)"""
+    total = sum(buckets)
+    if not total:
+        return None
+    threshold = quantile * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if seen >= threshold:
+            return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else float('inf')
+    return float('inf')
+
+
+endpoint_stats = EndpointStats()
+
+
+class PerformanceMiddleware:
+    """Mide cada petición y sus llamadas a DynamoDB (síncrono y async)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        prometheus.IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            prometheus.IN_FLIGHT.dec()
+            current_metrics.reset(token)
+        self._finish(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        prometheus.IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            prometheus.IN_FLIGHT.dec()
+            current_metrics.reset(token)
+        self._finish(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    def _finish(self, request, response, metrics, seconds):
+        response['Server-Timing'] = metrics.server_timing(seconds)
+
+        match = request.resolver_match
+        endpoint = f'/{match.route}' if match and match.route else 'unmatched'
+        endpoint_stats.observe(endpoint, response.status_code, seconds, metrics)
+        prometheus.observe_request(prometheus.view_name(request), request.method, response.status_code, seconds, metrics)
+
+        if access_logger.isEnabledFor(logging.INFO):
+            access_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'endpoint': endpoint,
+                'status': response.status_code,
+                'duration_ms': round(seconds * 1000, 2),
+                'ddb_ms': round(metrics.seconds * 1000, 2),
+                'ddb_calls': metrics.calls,
+                'ddb_operations': metrics.operations,
+                'scanned': metrics.scanned,
+                'returned': metrics.returned,
+                'rcu': metrics.capacity_units,
+            }))
+        endpoint_stats.flush_if_due()
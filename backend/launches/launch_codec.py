@@ -0,0 +1,374 @@
+"""
+Codec de items de lanzamiento para el cliente de bajo nivel de DynamoDB.
+
+Convierte el esquema fijo de lanzamientos directamente a y desde el formato
+wire (diccionarios AttributeValue) con una tabla de conversores por campo,
+sin pasar por TypeSerializer/TypeDeserializer ni por Decimal: los números se
+devuelven como int/float nativos, listos para JSON.
+
+Los atributos grandes pueden guardarse como Binary comprimido (zlib, o zstd
+si está instalado) con una cabecera de 2 bytes: códec y tipo de valor. La
+lectura es autodescriptiva y la descompresión es perezosa: solo ocurre al
+acceder al campo o al incluirlo en la salida JSON.
+
+Launch es el registro compacto (__slots__) que usan tanto el transform del
+ingester como las cachés y las respuestas del backend.
+
+Este módulo se comparte entre el ingester (lambda/launch_codec.py) y el
+backend (backend/launches/launch_codec.py); ambas copias deben ser idénticas.
+"""
+
+import json
+import sys
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd es opcional; zlib siempre está disponible
+    zstandard = None
+
+NULL = {'NULL': True}
+
+CODEC_ZLIB = b'z'
+CODEC_ZSTD = b's'
+KIND_STR = b's'
+KIND_JSON = b'j'
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class Compressed:
+    """Valor comprimido tal como llega de DynamoDB; se expande bajo demanda"""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def value(self):
+        codec, kind, payload = self.data[:1], self.data[1:2], self.data[2:]
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError('zstandard is required to read zstd-compressed attributes')
+            raw = zstandard.ZstdDecompressor().decompress(payload)
+        else:
+            raw = zlib.decompress(payload)
+        text = raw.decode('utf-8')
+        return json.loads(text) if kind == KIND_JSON else text
+
+
+def _is_compressed(data):
+    return data[:1] in (CODEC_ZLIB, CODEC_ZSTD) and data[1:2] in (KIND_STR, KIND_JSON)
+
+
+class Compression:
+    """Qué atributos comprimir, a partir de qué tamaño y con qué códec"""
+
+    def __init__(self, fields=(), min_bytes=256, codec='zlib', level=6):
+        if codec == 'zstd' and zstandard is None:
+            codec = 'zlib'
+        self.fields = frozenset(fields)
+        self.min_bytes = min_bytes
+        self.codec = codec
+        self.level = level
+
+    def encode(self, value):
+        """AttributeValue Binary comprimido, o None si no compensa"""
+        if isinstance(value, str):
+            kind, raw = KIND_STR, value.encode('utf-8')
+        else:
+            kind, raw = KIND_JSON, json.dumps(value, separators=(',', ':')).encode('utf-8')
+        if len(raw) < self.min_bytes:
+            return None
+        if self.codec == 'zstd':
+            payload = CODEC_ZSTD + kind + zstandard.ZstdCompressor(level=self.level).compress(raw)
+        else:
+            payload = CODEC_ZLIB + kind + zlib.compress(raw, self.level)
+        return {'B': payload} if len(payload) < len(raw) else None
+
+
+def encode_value(value):
+    """Conversión genérica para atributos fuera del esquema"""
+    if value is None:
+        return NULL
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, float)):
+        return {'N': repr(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, (list, tuple)):
+        return {'L': [encode_value(element) for element in value]}
+    if isinstance(value, dict):
+        return {'M': {key: encode_value(element) for key, element in value.items()}}
+    # Decimal y otros numéricos
+    return {'N': str(value)}
+
+
+def decode_value(attribute):
+    """Conversión genérica desde AttributeValue"""
+    kind, value = next(iter(attribute.items()))
+    if kind == 'S':
+        return value
+    if kind == 'N':
+        return _number(value)
+    if kind == 'L':
+        return [decode_value(element) for element in value]
+    if kind == 'M':
+        return {key: decode_value(element) for key, element in value.items()}
+    if kind == 'BOOL':
+        return value
+    if kind == 'NULL':
+        return None
+    if kind == 'SS':
+        return list(value)
+    if kind == 'NS':
+        return [_number(element) for element in value]
+    if kind == 'B' and _is_compressed(value):
+        return Compressed(value)
+    return value
+
+
+def _encode_str(value):
+    return {'S': value}
+
+
+def _decode_str(attribute):
+    value = attribute.get('S')
+    return value if value is not None else decode_value(attribute)
+
+
+def _encode_int(value):
+    return {'N': str(int(value))}
+
+
+def _decode_int(attribute):
+    value = attribute.get('N')
+    return _number(value) if value is not None else decode_value(attribute)
+
+
+def _encode_str_list(value):
+    return {'L': [{'S': element} for element in value]}
+
+
+def _decode_str_list(attribute):
+    value = attribute.get('L')
+    if value is None:
+        return decode_value(attribute)
+    return [element['S'] if 'S' in element else decode_value(element) for element in value]
+
+
+_STR = (_encode_str, _decode_str)
+_INT = (_encode_int, _decode_int)
+_STR_LIST = (_encode_str_list, _decode_str_list)
+
+# Esquema de un lanzamiento tal como lo escribe transform_launch_data
+LAUNCH_FIELDS = {
+    'launch_id': _STR,
+    'mission_name': _STR,
+    'rocket_name': _STR,
+    'launch_date': _STR,
+    'launch_date_unix': _INT,
+    'status': _STR,
+    'launchpad_name': _STR,
+    'launchpad_full_name': _STR,
+    'payload_names': _STR_LIST,
+    'payload_types': _STR_LIST,
+    'patch_image': _STR,
+    'webcast_url': _STR,
+    'article_url': _STR,
+    'wikipedia_url': _STR,
+    'details': _STR,
+    'flight_number': _INT,
+    'last_updated': _STR,
+}
+
+KEY_FIELDS = ('launch_id', 'launch_date')
+FIELDS = tuple(LAUNCH_FIELDS)
+
+# Partición vertical: la tabla principal guarda un resumen pequeño (lo que
+# leen listados, filtros, búsqueda y estadísticas) y la tabla de detalles,
+# con clave launch_id, los campos grandes que solo necesita la vista detalle
+DETAIL_FIELDS = (
+    'launchpad_full_name',
+    'payload_names',
+    'webcast_url',
+    'article_url',
+    'wikipedia_url',
+    'details',
+)
+SUMMARY_FIELDS = tuple(name for name in FIELDS if name not in DETAIL_FIELDS)
+
+# Campos con pocos valores distintos: se internan para compartir la cadena
+INTERNED_FIELDS = ('status', 'rocket_name', 'launchpad_name')
+
+_ENCODERS = {name: codec[0] for name, codec in LAUNCH_FIELDS.items()}
+_DECODERS = {name: codec[1] for name, codec in LAUNCH_FIELDS.items()}
+for _name in INTERNED_FIELDS:
+    _DECODERS[_name] = lambda attribute, _decode=_DECODERS[_name]: _intern(_decode(attribute))
+
+_MISSING = object()
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Launch:
+    """
+    Registro compacto de un lanzamiento. Admite acceso tipo dict
+    (launch['status'], launch.get('status')) para el código existente.
+    Los campos no leídos (proyecciones) quedan sin asignar.
+    """
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, **fields):
+        self.extra = None
+        for name, value in fields.items():
+            self[name] = value
+
+    def __getitem__(self, name):
+        value = getattr(self, name, _MISSING) if name in _DECODERS else self._get_extra(name)
+        if value is _MISSING:
+            raise KeyError(name)
+        if type(value) is Compressed:
+            value = value.value()
+            self[name] = value
+        return value
+
+    def __setitem__(self, name, value):
+        if name in _DECODERS:
+            setattr(self, name, _intern(value) if name in INTERNED_FIELDS else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[name] = value
+
+    def __contains__(self, name):
+        return self.get(name, _MISSING) is not _MISSING
+
+    def _get_extra(self, name):
+        return self.extra.get(name, _MISSING) if self.extra else _MISSING
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def keys(self):
+        names = [name for name in FIELDS if getattr(self, name, _MISSING) is not _MISSING]
+        if self.extra:
+            names.extend(self.extra)
+        return names
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+    def to_dict(self, fields=None):
+        """
+        Representación JSON (tipos nativos, sin conversión adicional). Con
+        `fields` solo se incluyen (y descomprimen) los campos proyectados.
+        """
+        data = {}
+        for name in FIELDS if fields is None else fields:
+            value = getattr(self, name, _MISSING) if name in _DECODERS else self._get_extra(name)
+            if value is _MISSING:
+                continue
+            data[name] = self[name] if type(value) is Compressed else value
+        if self.extra and fields is None:
+            for name, value in self.extra.items():
+                data[name] = self[name] if type(value) is Compressed else value
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, Launch):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Launch(launch_id={self.get('launch_id')!r}, mission_name={self.get('mission_name')!r})"
+
+
+def _iter_launch(launch):
+    for name in FIELDS:
+        value = getattr(launch, name, _MISSING)
+        if value is not _MISSING:
+            yield name, value
+    if launch.extra:
+        yield from launch.extra.items()
+
+
+def serialize_launch(item, include=None, exclude=None, compression=None):
+    """Launch (o dict) -> Item en formato wire, opcionalmente filtrando campos"""
+    encoders = _ENCODERS
+    compressed_fields = compression.fields if compression else ()
+    attributes = {}
+    pairs = _iter_launch(item) if isinstance(item, Launch) else item.items()
+    for name, value in pairs:
+        if (include is not None and name not in include) or (exclude is not None and name in exclude):
+            continue
+        if value is None:
+            attributes[name] = NULL
+            continue
+        if type(value) is Compressed:
+            attributes[name] = {'B': value.data}
+            continue
+        if name in compressed_fields:
+            encoded = compression.encode(value)
+            if encoded is not None:
+                attributes[name] = encoded
+                continue
+        encoder = encoders.get(name)
+        attributes[name] = encoder(value) if encoder else encode_value(value)
+    return attributes
+
+
+# Decoder y descriptor del slot por campo: evita setattr() en el camino caliente
+_SLOT_DECODERS = {name: (_DECODERS[name], Launch.__dict__[name].__set__) for name in FIELDS}
+
+
+_DETAIL_ONLY = frozenset(DETAIL_FIELDS)
+_DETAIL_ITEM = frozenset(('launch_id',) + DETAIL_FIELDS)
+
+
+def serialize_summary(launch):
+    """Item de la tabla principal: todo salvo los campos de detalle"""
+    return serialize_launch(launch, exclude=_DETAIL_ONLY)
+
+
+def serialize_detail(launch, compression=None):
+    """Item de la tabla de detalles: launch_id + campos grandes"""
+    return serialize_launch(launch, include=_DETAIL_ITEM, compression=compression)
+
+
+def deserialize_launch(attributes, launch=None):
+    """Item en formato wire -> Launch; con `launch` completa un registro existente"""
+    slot_decoders = _SLOT_DECODERS
+    if launch is None:
+        launch = Launch.__new__(Launch)
+        launch.extra = None
+    for name, attribute in attributes.items():
+        slot = slot_decoders.get(name)
+        if slot:
+            slot[1](launch, slot[0](attribute))
+        else:
+            if launch.extra is None:
+                launch.extra = {}
+            launch.extra[name] = decode_value(attribute)
+    return launch
+
+
+def serialize_key(key):
+    """Clave (o LastEvaluatedKey) en dict plano -> formato wire"""
+    return {name: {'S': value} for name, value in key.items()}
+
+
+def deserialize_key(attributes):
+    return {name: attribute['S'] for name, attribute in attributes.items()}
@@ -0,0 +1,108 @@
+"""
+Métricas Prometheus del backend, expuestas en /metrics.
+
+Con varios workers de gunicorn cada proceso escribe sus valores en ficheros
+mmap bajo PROMETHEUS_MULTIPROC_DIR (lo prepara gunicorn.conf.py) y /metrics
+los agrega con MultiProcessCollector. Sin esa variable (runserver, tests) se
+usa el registro del proceso.
+"""
+import os
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DYNAMODB_BUCKETS = (0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by view',
+    ['view', 'method'], buckets=REQUEST_BUCKETS
+)
+REQUESTS = Counter('http_requests', 'Requests by view and status class', ['view', 'status'])
+IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests being served', multiprocess_mode='livesum')
+
+DYNAMODB_LATENCY = Histogram(
+    'dynamodb_call_duration_seconds', 'DynamoDB call latency by operation',
+    ['operation'], buckets=DYNAMODB_BUCKETS
+)
+DYNAMODB_CAPACITY = Counter('dynamodb_consumed_capacity_units', 'DynamoDB consumed capacity units', ['operation'])
+DYNAMODB_ITEMS = Counter('dynamodb_items', 'Items scanned and returned by view', ['view', 'kind'])
+
+CACHE_LOOKUPS = Counter('cache_lookups', 'Cache lookups by cache and result', ['cache', 'result'])
+
+# Estado por worker; en modo multiproceso se publica el peor de los vivos
+CIRCUIT_STATE = Gauge(
+    'circuit_breaker_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)',
+    ['circuit'], multiprocess_mode='livemax'
+)
+CIRCUIT_TRANSITIONS = Counter('circuit_breaker_transitions', 'Circuit breaker state changes', ['circuit', 'state'])
+STALE_RESPONSES = Counter('stale_responses', 'Responses served from the last good copy', ['view', 'reason'])
+
+ADMISSION_REJECTED = Counter('admission_rejected', 'Requests shed by admission control', ['view', 'reason'])
+ADMISSION_WAIT = Histogram(
+    'admission_queue_wait_seconds', 'Time queued before admission', ['view'], buckets=REQUEST_BUCKETS
+)
+
+
+def view_name(request):
+    """Nombre de la clase de vista (LaunchListView, ...) o del callable resuelto"""
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    return match_view_name(match)
+
+
+def match_view_name(match):
+    func = match.func
+    view_class = getattr(func, 'view_class', None) or getattr(func, 'cls', None)
+    return (view_class or func).__name__
+
+
+def observe_request(view, method, status_code, seconds, request_metrics):
+    REQUEST_LATENCY.labels(view, method).observe(seconds)
+    REQUESTS.labels(view, f'{status_code // 100}xx').inc()
+    if request_metrics.calls:
+        DYNAMODB_ITEMS.labels(view, 'scanned').inc(request_metrics.scanned)
+        DYNAMODB_ITEMS.labels(view, 'returned').inc(request_metrics.returned)
+
+
+def observe_dynamodb_call(operation, seconds, capacity_units):
+    DYNAMODB_LATENCY.labels(operation).observe(seconds)
+    if capacity_units:
+        DYNAMODB_CAPACITY.labels(operation).inc(capacity_units)
+
+
+def observe_cache(cache, hits, misses):
+    if hits:
+        CACHE_LOOKUPS.labels(cache, 'hit').inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache, 'miss').inc(misses)
+
+
+def observe_circuit_state(circuit, state, value):
+    CIRCUIT_STATE.labels(circuit).set(value)
+    CIRCUIT_TRANSITIONS.labels(circuit, state).inc()
+
+
+def observe_stale(view, reason):
+    STALE_RESPONSES.labels(view, reason).inc()
+
+
+def observe_admission_rejected(view, reason):
+    ADMISSION_REJECTED.labels(view, reason).inc()
+
+
+def observe_admission_wait(view, seconds):
+    ADMISSION_WAIT.labels(view).observe(seconds)
+
+
+def metrics_view(request):
+    """Exposición en formato texto de Prometheus, agregada entre workers"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,19 @@
+from rest_framework.negotiation import BaseContentNegotiation, DefaultContentNegotiation
+
+
+class FirstRendererNegotiation(BaseContentNegotiation):
+    """
+    Las vistas de la API solo tienen el renderer JSON: se omite el análisis
+    de la cabecera Accept y se usa directamente. Las vistas con varios
+    renderers (Swagger, ReDoc) o que piden un formato concreto (?format=,
+    sufijo .json/.yaml) pasan por la negociación estándar de DRF.
+    """
+    default = DefaultContentNegotiation()
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        if len(renderers) == 1 and not format_suffix and not request.query_params.get('format'):
+            return (renderers[0], renderers[0].media_type)
+        return self.default.select_renderer(request, renderers, format_suffix)
@@ -0,0 +1,243 @@
+"""
+Perfilado bajo demanda de peticiones en producción.
+
+Se perfila 1 de cada PROFILE_SAMPLE_RATE peticiones, o las que traen la
+cabecera X-Debug-Profile firmada con PROFILE_SECRET:
+
+    X-Debug-Profile: <expira_unix>:<hmac_sha256(secret, "<expira_unix>:<path>")>
+
+PROFILE_MODE elige cProfile (volcado pstats, .prof) o un muestreador
+estadístico de pilas (formato colapsado, .folded, para flamegraph.pl o
+speedscope). Los volcados van a un anillo acotado en PROFILE_DIR y se listan y
+descargan en /api/profiles/ con una cabecera firmada para esa ruta.
+
+Sin PROFILE_SAMPLE_RATE ni PROFILE_SECRET el middleware se desactiva
+(MiddlewareNotUsed) y no añade ningún coste.
+"""
+import contextvars
+import cProfile
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, Http404, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_SECRET = os.environ.get('PROFILE_SECRET', '')
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'cprofile')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/profiles')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '50'))
+# Intervalo del muestreador estadístico
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '5')) / 1000
+
+PROFILE_HEADER = 'HTTP_X_DEBUG_PROFILE'
+
+# Marca la petición en curso; offload() la lee para perfilar en el hilo del pool
+profile_label = contextvars.ContextVar('profile_label', default=None)
+
+
+def sign(secret, path, expires):
+    """Valor de X-Debug-Profile para `path` válido hasta `expires` (unix)"""
+    digest = hmac.new(secret.encode(), f'{expires}:{path}'.encode(), hashlib.sha256).hexdigest()
+    return f'{expires}:{digest}'
+
+
+def verify(secret, path, value):
+    if not secret or not value:
+        return False
+    expires, _, _ = value.partition(':')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign(secret, path, expires), value)
+
+
+class StackSampler:
+    """Muestreador estadístico: apila el frame del hilo objetivo cada intervalo"""
+
+    def __init__(self, thread_id, interval=PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileRing:
+    """Directorio con como mucho `max_files` volcados; se borran los más antiguos"""
+
+    def __init__(self, directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def path(self, label, extension):
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_')[:60] or 'root'
+        return os.path.join(self.directory, f'{time.time_ns() // 1000}-{os.getpid()}-{slug}.{extension}')
+
+    def write(self, label, extension, writer):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(label, extension)
+            writer(path)
+            for name in self.list()[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, name['name']))
+                except OSError:
+                    pass
+        return path
+
+    def list(self):
+        """Volcados del más reciente al más antiguo"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                # Borrado por otro worker que comparte el directorio
+                continue
+            entries.append({'name': name, 'size': stat.st_size, 'created': stat.st_mtime})
+        return sorted(entries, key=lambda entry: entry['name'], reverse=True)
+
+    def open(self, name):
+        if os.path.basename(name) != name or not any(entry['name'] == name for entry in self.list()):
+            raise FileNotFoundError(name)
+        return open(os.path.join(self.directory, name), 'rb')
+
+
+profile_ring = ProfileRing()
+
+# Un perfil a la vez por proceso: acota el coste y, desde Python 3.12, cProfile
+# no admite dos perfiladores activos en el mismo proceso
+_profiling = threading.Lock()
+
+
+def run_profiled(label, func, *args, **kwargs):
+    """Ejecuta func en el hilo actual perfilándola y guarda el volcado en el anillo"""
+    if not _profiling.acquire(blocking=False):
+        return func(*args, **kwargs)
+    try:
+        return _run_profiled(label, func, *args, **kwargs)
+    finally:
+        _profiling.release()
+
+
+def _run_profiled(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    if PROFILE_MODE == 'sample':
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sampler.stop()
+            collapsed = sampler.collapsed()
+            path = profile_ring.write(label, 'folded', lambda path: _write_text(path, collapsed))
+            logger.info(f"Profiled {label} in {(time.perf_counter() - start) * 1000:.1f} ms: {path}")
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        path = profile_ring.write(label, 'prof', profiler.dump_stats)
+        logger.info(f"Profiled {label} in {(time.perf_counter() - start) * 1000:.1f} ms: {path}")
+
+
+def _write_text(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class ProfilingMiddleware:
+    """
+    Decide qué peticiones se perfilan. Bajo WSGI perfila la petición entera;
+    bajo ASGI marca el contexto y offload() perfila la vista en el hilo del
+    pool, que es donde se hace el trabajo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if PROFILE_SAMPLE_RATE <= 0 and not PROFILE_SECRET:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self._counter = itertools.count(1)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def should_profile(self, request):
+        if PROFILE_SAMPLE_RATE > 0 and next(self._counter) % PROFILE_SAMPLE_RATE == 0:
+            return True
+        return verify(PROFILE_SECRET, request.path, request.META.get(PROFILE_HEADER))
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+        return run_profiled(f'{request.method} {request.path}', self.get_response, request)
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        token = profile_label.set(f'{request.method} {request.path}')
+        try:
+            return await self.get_response(request)
+        finally:
+            profile_label.reset(token)
+
+
+def _authorized(request):
+    return verify(PROFILE_SECRET, request.path, request.META.get(PROFILE_HEADER))
+
+
+def profile_list_view(request):
+    """Volcados de todos los workers del contenedor (comparten PROFILE_DIR)"""
+    if not _authorized(request):
+        raise Http404
+    return JsonResponse({'items': profile_ring.list()})
+
+
+def profile_download_view(request, name):
+    if not _authorized(request):
+        raise Http404
+    try:
+        return FileResponse(profile_ring.open(name), as_attachment=True, filename=name)
+    except FileNotFoundError:
+        raise Http404
@@ -0,0 +1,284 @@
+"""
+Degradación controlada de las lecturas cuando DynamoDB falla o hace throttling.
+
+- CircuitBreaker: tras BREAKER_FAILURE_THRESHOLD fallos de disponibilidad
+  seguidos (throttling, 5xx, timeouts, errores de conexión) el circuito se
+  abre y las lecturas fallan al instante con CircuitOpenError durante
+  BREAKER_RESET_SECONDS. Después pasa a half-open: deja pasar
+  BREAKER_HALF_OPEN_CALLS llamadas de prueba y se cierra con la primera que
+  funciona o se vuelve a abrir si falla. InstrumentedClient lo consulta en
+  cada lectura y su estado se exporta en /metrics.
+- stale_on_error: guarda por proceso la última respuesta 200 de cada vista y
+  de los parámetros que declara (`params`; el resto de la query string no
+  cuenta), en un LRU acotado por entradas y por bytes. Las vistas con
+  parámetros arbitrarios (ids, texto libre) usan cache=False y no guardan
+  nada. Si la vista responde 5xx por un fallo de disponibilidad de DynamoDB
+  (no por un error de la propia petición) y hay una copia de menos de
+  STALE_MAX_AGE_SECONDS, la sirve marcada como obsoleta (X-Cache: STALE,
+  Warning: 110) y la refresca en segundo plano, una vez por URL. Con
+  READ_CACHE_FRESH_SECONDS / READ_CACHE_REVALIDATE_SECONDS > 0 se comporta
+  además como stale-while-revalidate en condiciones normales; por defecto
+  (0) las lecturas sanas siempre van a DynamoDB. Con STALE_MAX_AGE_SECONDS y
+  las dos anteriores a 0 no se guarda ninguna copia.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import BotoCoreError, ClientError
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics as prometheus
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_RESET_SECONDS = float(os.environ.get('BREAKER_RESET_SECONDS', '10'))
+BREAKER_HALF_OPEN_CALLS = int(os.environ.get('BREAKER_HALF_OPEN_CALLS', '1'))
+
+READ_CACHE_FRESH_SECONDS = float(os.environ.get('READ_CACHE_FRESH_SECONDS', '0'))
+READ_CACHE_REVALIDATE_SECONDS = float(os.environ.get('READ_CACHE_REVALIDATE_SECONDS', '0'))
+STALE_MAX_AGE_SECONDS = float(os.environ.get('STALE_MAX_AGE_SECONDS', '3600'))
+READ_CACHE_MAX_ENTRIES = int(os.environ.get('READ_CACHE_MAX_ENTRIES', '1024'))
+# Tamaño JSON total de las copias por worker; una respuesta de más de la
+# octava parte no se guarda, para que no desaloje a todas las demás
+READ_CACHE_MAX_BYTES = int(os.environ.get('READ_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+STALE_SERVING = STALE_MAX_AGE_SECONDS > 0 or READ_CACHE_FRESH_SECONDS + READ_CACHE_REVALIDATE_SECONDS > 0
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+UNAVAILABLE_CODES = frozenset({
+    'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded',
+    'InternalServerError', 'ServiceUnavailable',
+})
+
+
+# Fallos de disponibilidad vistos durante la vista en curso; los anota
+# InstrumentedClient y stale_on_error decide con ellos si sirve la copia
+unavailable_errors = contextvars.ContextVar('unavailable_errors', default=None)
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f'Circuit {name} is open')
+        self.retry_after = retry_after
+
+
+def is_unavailable(error):
+    """Errores que indican que DynamoDB no está disponible (no los de validación o de datos)"""
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code')
+        http_status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return code in UNAVAILABLE_CODES or http_status >= 500
+    return isinstance(error, (BotoCoreError, OSError))
+
+
+def note_unavailable(error):
+    errors = unavailable_errors.get()
+    if errors is not None and (isinstance(error, CircuitOpenError) or is_unavailable(error)):
+        errors.append(error)
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds=BREAKER_RESET_SECONDS, half_open_calls=BREAKER_HALF_OPEN_CALLS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_calls = half_open_calls
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = 0.0
+            self._probes = 0
+            self._transition(CLOSED)
+
+    @property
+    def state(self):
+        return self._state
+
+    def retry_after(self):
+        return max(self.reset_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def before_call(self):
+        """Lanza CircuitOpenError si la llamada no debe llegar a DynamoDB"""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    raise CircuitOpenError(self.name, self.retry_after())
+                self._probes = 0
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    raise CircuitOpenError(self.name, self.reset_seconds)
+                self._probes += 1
+
+    def record(self, error=None):
+        """Resultado de una llamada: None si respondió bien"""
+        with self._lock:
+            if error is None or not is_unavailable(error):
+                self._failures = 0
+                if self._state != CLOSED:
+                    self._transition(CLOSED)
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def _transition(self, state):
+        previous = getattr(self, '_state', None)
+        self._state = state
+        prometheus.observe_circuit_state(self.name, state, STATE_VALUES[state])
+        if previous is not None and previous != state:
+            logger.warning(f"Circuit {self.name} {previous} -> {state}")
+
+
+dynamodb_breaker = CircuitBreaker('dynamodb')
+
+
+class ResponseCache:
+    """Última respuesta 200 por clave, LRU acotado por entradas y bytes, con refresco en segundo plano"""
+
+    def __init__(self, max_entries=READ_CACHE_MAX_ENTRIES, max_bytes=READ_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def get(self, key):
+        """(datos, edad en segundos) o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        data, stored_at, _ = entry
+        return data, time.monotonic() - stored_at
+
+    def put(self, key, data):
+        size = len(json.dumps(data, default=str))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            if size > self.max_bytes // 8:
+                return
+            self._entries[key] = (data, time.monotonic(), size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def refresh(self, key, load):
+        """Relanza la vista fuera de la petición; como mucho un refresco en curso por clave"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                # Perezoso: con preload_app el pool se crea ya en cada worker
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='revalidate')
+        self._executor.submit(self._refresh, key, load)
+
+    def _refresh(self, key, load):
+        try:
+            response = load()
+            if response.status_code == status.HTTP_200_OK:
+                self.put(key, response.data)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key[1]} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+response_cache = ResponseCache()
+
+
+def _cached_response(data, age, cache_status):
+    headers = {'X-Cache': cache_status, 'Age': str(int(age))}
+    if cache_status == 'STALE':
+        headers['Warning'] = '110 - "Response is Stale"'
+    return Response(data, headers=headers)
+
+
+def stale_on_error(get=None, *, params=(), cache=True):
+    """
+    Decorador para el get de una APIView de lectura. La copia se guarda por
+    vista, ruta y los parámetros `params` de la query string; con
+    cache=False no se guarda nada y solo se responde 503 con el circuito abierto.
+    """
+    if get is None:
+        return functools.partial(stale_on_error, params=params, cache=cache)
+    store = cache and STALE_SERVING
+
+    @functools.wraps(get)
+    def wrapper(view, request, *args, **kwargs):
+        key = (type(view).__name__, request.path, tuple((name, request.GET.get(name)) for name in params))
+
+        def load():
+            return get(view, request, *args, **kwargs)
+
+        cached = response_cache.get(key) if store else None
+        if cached:
+            data, age = cached
+            if age < READ_CACHE_FRESH_SECONDS:
+                return _cached_response(data, age, 'HIT')
+            if age < READ_CACHE_FRESH_SECONDS + READ_CACHE_REVALIDATE_SECONDS:
+                response_cache.refresh(key, load)
+                prometheus.observe_stale(key[0], 'revalidate')
+                return _cached_response(data, age, 'STALE')
+
+        errors = []
+        token = unavailable_errors.set(errors)
+        try:
+            response = load()
+        finally:
+            unavailable_errors.reset(token)
+        if response.status_code == status.HTTP_200_OK:
+            if store:
+                response_cache.put(key, response.data)
+            return response
+        if response.status_code < 500 or not errors:
+            # Errores de la petición o de la vista: la copia no los arregla
+            return response
+
+        if cached and cached[1] < STALE_MAX_AGE_SECONDS:
+            response_cache.refresh(key, load)
+            prometheus.observe_stale(key[0], 'circuit_open' if dynamodb_breaker.state == OPEN else 'error')
+            return _cached_response(cached[0], cached[1], 'STALE')
+        if dynamodb_breaker.state == OPEN:
+            return Response(
+                {'error': 'DynamoDB is temporarily unavailable'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(max(int(dynamodb_breaker.retry_after()), 1))}
+            )
+        return response
+
+    return wrapper
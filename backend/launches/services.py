@@ -1,43 +1,453 @@
 import boto3
+import contextvars
+import functools
+import math
 import os
-from decimal import Decimal
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
 from typing import List, Dict, Optional, Any
 import logging
 
+from .instrumentation import InstrumentedClient
+from .metrics import observe_cache
+from .launch_codec import decode_value, deserialize_key, deserialize_launch, serialize_key
+
 logger = logging.getLogger(__name__)
 
-class DecimalEncoder:
+# BatchGetItem admite como máximo 100 claves por llamada
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+KEY_MAP_TTL_SECONDS = int(os.environ.get('KEY_MAP_TTL_SECONDS', '300'))
+# Espera tras una recarga fallida antes de volver a intentarla
+KEY_MAP_RETRY_SECONDS = int(os.environ.get('KEY_MAP_RETRY_SECONDS', '30'))
+# IDs desconocidos por petición batch que se resuelven con Query (el resto se da por inexistente)
+BATCH_MISS_QUERY_LIMIT = int(os.environ.get('BATCH_MISS_QUERY_LIMIT', '10'))
+# Registro de ejecuciones del ingester en la tabla de control (ver lambda/ledger.py)
+INGEST_RUN_PK = 'run'
+INGEST_RUN_STAGES = ('fetch', 'parse', 'transform', 'write')
+# Secciones de /api/dashboard/: se consultan en paralelo con un plazo común
+DASHBOARD_SECTION_TIMEOUT_SECONDS = float(os.environ.get('DASHBOARD_SECTION_TIMEOUT_SECONDS', '3'))
+DASHBOARD_MAX_WORKERS = int(os.environ.get('DASHBOARD_MAX_WORKERS', '6'))
+
+# Planificador de /api/filter/: GSI de la tabla de resúmenes por atributo de
+# igualdad, todos con launch_date como clave de ordenación (ver la pila CDK)
+FILTER_INDEXES = {
+    'status': 'status-date-index',
+    'rocket_name': 'rocket-date-index',
+}
+# Campos que devuelve /api/filter/ por cualquier camino: las claves más la
+# proyección INCLUDE de los GSI (sin last_updated, ver la pila CDK)
+FILTER_FIELDS = (
+    'launch_id', 'launch_date', 'mission_name', 'rocket_name', 'status', 'launch_date_unix',
+    'launchpad_name', 'payload_types', 'patch_image', 'flight_number',
+)
+# Desactivado hasta que existan y estén ACTIVE todos los GSI (la pila lo activa)
+FILTER_USE_INDEXES = os.environ.get('FILTER_USE_INDEXES', 'False').lower() == 'true'
+FILTER_PAGE_SIZE = int(os.environ.get('FILTER_PAGE_SIZE', '100'))
+# Tope de páginas por consulta para acotar el coste de predicados poco selectivos;
+# el camino del mapa de claves lee como mucho los mismos items
+FILTER_MAX_PAGES = int(os.environ.get('FILTER_MAX_PAGES', '20'))
+# Tamaño medio de un resumen, para comparar el coste en RCU de cada camino
+FILTER_ITEM_BYTES = int(os.environ.get('FILTER_ITEM_BYTES', '1024'))
+READ_UNIT_BYTES = 4096
+
+_dashboard_executor = None
+_dashboard_lock = threading.Lock()
+
+
+def dashboard_executor() -> ThreadPoolExecutor:
+    """Pool del proceso para las secciones del dashboard (perezoso: con preload_app se crea en cada worker)"""
+    global _dashboard_executor
+    with _dashboard_lock:
+        if _dashboard_executor is None:
+            _dashboard_executor = ThreadPoolExecutor(max_workers=DASHBOARD_MAX_WORKERS, thread_name_prefix='dashboard')
+        return _dashboard_executor
+
+# Secciones del dashboard en curso por clave: una carga idéntica que sigue
+# corriendo (p. ej. tras un timeout) se comparte en lugar de lanzar otra
+_inflight_sections: Dict[tuple, Any] = {}
+_inflight_lock = threading.Lock()
+
+
+def submit_section(key: tuple, load) -> Any:
+    """Future de la carga `key`, reutilizando la que ya esté en curso"""
+    with _inflight_lock:
+        future = _inflight_sections.get(key)
+        if future is not None and not future.done():
+            return future
+        # Un contexto por hilo: las lecturas siguen contando en las métricas de la petición
+        future = dashboard_executor().submit(contextvars.copy_context().run, load)
+        _inflight_sections[key] = future
+    # Fuera del lock: si ya terminó, el callback se ejecuta aquí mismo
+    future.add_done_callback(lambda done: _forget_section(key, done))
+    return future
+
+
+def _forget_section(key: tuple, future) -> None:
+    with _inflight_lock:
+        if _inflight_sections.get(key) is future:
+            del _inflight_sections[key]
+
+class LaunchKeyMap:
+    """
+    Mapa en memoria launch_id -> launch_date compartido por el proceso.
+    Permite construir la clave compuesta completa sin hacer un Query por ID.
+    """
+    def __init__(self, ttl_seconds: int = KEY_MAP_TTL_SECONDS, retry_seconds: int = KEY_MAP_RETRY_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._keys: Dict[str, str] = {}
+        self._loaded_at = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        # Una sola recarga (scan completo) a la vez por proceso
+        self._refresh_lock = threading.Lock()
+    
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.ttl_seconds
+    
+    def _needs_refresh(self) -> bool:
+        return self.is_stale() and time.monotonic() >= self._retry_at
+    
+    def refresh(self, service: 'DynamoDBService') -> None:
+        """
+        Recarga el mapa con un scan que solo proyecta los atributos clave.
+        Si falla, no se vuelve a intentar hasta pasados retry_seconds.
+        """
+        keys = {}
+        scan_params = {'ProjectionExpression': 'launch_id, launch_date'}
+        try:
+            while True:
+                response = service.scan_page(**scan_params)
+                for item in response.get('Items', []):
+                    keys[item['launch_id']] = item['launch_date']
+                
+                last_evaluated_key = response.get('LastEvaluatedKey')
+                if not last_evaluated_key:
+                    break
+                scan_params['ExclusiveStartKey'] = last_evaluated_key
+        except Exception:
+            with self._lock:
+                self._retry_at = time.monotonic() + self.retry_seconds
+            raise
+        
+        with self._lock:
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+            self._retry_at = 0.0
+        logger.info(f"Launch key map refreshed with {len(keys)} keys")
+    
+    def ensure_fresh(self, service: 'DynamoDBService') -> None:
+        """
+        Recarga el mapa si venció el TTL. Con el mapa ya cargado la recarga va
+        en segundo plano y mientras tanto se sigue sirviendo el anterior; solo
+        la primera carga bloquea, y las peticiones concurrentes la esperan.
+        """
+        if not self._needs_refresh():
+            return
+        if self._loaded_at:
+            if self._refresh_lock.acquire(blocking=False):
+                threading.Thread(
+                    target=self._refresh_in_background, args=(service,), name='key-map-refresh', daemon=True
+                ).start()
+            return
+        with self._refresh_lock:
+            # Otra petición pudo cargarlo (o fallar) mientras se esperaba
+            if self._needs_refresh():
+                self.refresh(service)
     
-    @staticmethod
-    def encode_decimal(obj):
-        if isinstance(obj, Decimal):
-            return float(obj) if obj % 1 != 0 else int(obj)
-        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+    def _refresh_in_background(self, service: 'DynamoDBService') -> None:
+        try:
+            self.refresh(service)
+        except Exception as e:
+            logger.warning(f"Launch key map refresh failed, retrying in {self.retry_seconds}s: {str(e)}")
+        finally:
+            self._refresh_lock.release()
+    
+    def remember(self, launch_id: str, launch_date: str) -> None:
+        with self._lock:
+            self._keys[launch_id] = launch_date
+    
+    def resolve(self, service: 'DynamoDBService', launch_ids: List[str]) -> Dict[str, str]:
+        """
+        Devuelve launch_id -> launch_date para los IDs conocidos. Solo se
+        recarga por TTL: un ID desconocido no fuerza otro scan (lo resuelve
+        quien llama con un Query), así que IDs inventados no cuestan scans.
+        """
+        self.ensure_fresh(service)
+        
+        keys = self._keys
+        resolved = {launch_id: keys[launch_id] for launch_id in launch_ids if launch_id in keys}
+        observe_cache('launch_key_map', len(resolved), len(launch_ids) - len(resolved))
+        return resolved
 
-class DynamoDBService:
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def keys_between(self, lower: Optional[str], upper: Optional[str],
+                     allow_stale: bool = False) -> Optional[List[Dict[str, str]]]:
+        """
+        Claves con launch_date en [lower, upper], de la más reciente a la más
+        antigua; None si el mapa no vale (vacío o, salvo allow_stale, vencido)
+        """
+        keys = self._keys
+        if not keys or (self.is_stale() and not allow_stale):
+            return None
+        return sorted(
+            ({'launch_id': launch_id, 'launch_date': launch_date} for launch_id, launch_date in keys.items()
+             if (lower is None or launch_date >= lower) and (upper is None or launch_date <= upper)),
+            key=lambda key: key['launch_date'], reverse=True
+        )
+
+launch_key_map = LaunchKeyMap()
+
+class PredicateStats:
+    """
+    Recuentos por estado, cohete y plataforma de la última muestra de
+    estadísticas; el planificador los usa para estimar la selectividad
+    """
+    ATTRIBUTES = ('status', 'rocket_name', 'launchpad_name')
+    
+    def __init__(self):
+        self.total = 0
+        self.counts: Dict[str, Dict[str, int]] = {}
+    
+    def observe(self, items: List[Dict]) -> None:
+        counts = {attribute: {} for attribute in self.ATTRIBUTES}
+        for item in items:
+            for attribute in self.ATTRIBUTES:
+                value = item.get(attribute)
+                counts[attribute][value] = counts[attribute].get(value, 0) + 1
+        self.counts, self.total = counts, len(items)
+    
+    def estimate(self, attribute: str, value: str) -> Optional[int]:
+        if not self.total:
+            return None
+        return self.counts.get(attribute, {}).get(value, 0)
+
+predicate_stats = PredicateStats()
+
+class LaunchQuery:
+    """Predicados combinados de /api/filter/; los que faltan valen None"""
+    EQUALITY = (('status', 'status'), ('rocket', 'rocket_name'), ('launchpad', 'launchpad_name'))
+    
+    def __init__(self, status: Optional[str] = None, rocket: Optional[str] = None, launchpad: Optional[str] = None,
+                 date_from: Optional[str] = None, date_to: Optional[str] = None,
+                 payload_type: Optional[str] = None, text: Optional[str] = None):
+        self.status = status
+        self.rocket = rocket
+        self.launchpad = launchpad
+        self.date_from = date_from
+        self.date_to = date_to
+        self.payload_type = payload_type
+        self.text = text
+    
+    def equalities(self) -> Dict[str, str]:
+        """Atributo -> valor de los predicados de igualdad presentes"""
+        return {
+            attribute: getattr(self, name) for name, attribute in self.EQUALITY if getattr(self, name)
+        }
+    
+    def date_bounds(self):
+        """Límites inclusivos sobre launch_date (ISO 8601), o None"""
+        lower = self.date_from or None
+        upper = f'{self.date_to}T23:59:59.999Z' if self.date_to else None
+        return lower, upper
+    
+    def matches(self, item: Dict) -> bool:
+        """Evaluación completa en memoria (lecturas sin FilterExpression)"""
+        if any(item.get(attribute) != value for attribute, value in self.equalities().items()):
+            return False
+        lower, upper = self.date_bounds()
+        launch_date = item.get('launch_date', '')
+        if (lower and launch_date < lower) or (upper and launch_date > upper):
+            return False
+        if self.payload_type and self.payload_type not in (item.get('payload_types') or ()):
+            return False
+        return self.matches_text(item)
+    
+    def matches_text(self, item: Dict) -> bool:
+        # Sin distinguir mayúsculas, como /api/search/: no se puede expresar en FilterExpression
+        return not self.text or self.text.lower() in item.get('mission_name', '').lower()
+    
+    def as_dict(self) -> Dict[str, Optional[str]]:
+        return {
+            'status': self.status, 'rocket': self.rocket, 'launchpad': self.launchpad,
+            'date_from': self.date_from, 'date_to': self.date_to,
+            'payload_type': self.payload_type, 'q': self.text,
+        }
+
+class QueryPlan:
+    """Camino de acceso elegido: 'index' (Query a un GSI), 'key_map' (BatchGetItem) o 'scan'"""
+    def __init__(self, access: str, estimate: Optional[int], attribute: Optional[str] = None):
+        self.access = access
+        self.estimate = estimate
+        self.attribute = attribute
+    
+    @property
+    def index_name(self) -> Optional[str]:
+        return FILTER_INDEXES.get(self.attribute)
+    
+    @property
+    def cost(self) -> float:
+        """
+        RCU estimadas (lecturas eventualmente consistentes). Query y Scan suman
+        el tamaño de los items antes de redondear a 4 KB; BatchGetItem redondea
+        cada item, así que nunca baja de 0.5 RCU por item.
+        """
+        if self.access == 'key_map':
+            return 0.5 * self.estimate * math.ceil(FILTER_ITEM_BYTES / READ_UNIT_BYTES)
+        return 0.5 * max(math.ceil(self.estimate * FILTER_ITEM_BYTES / READ_UNIT_BYTES), 1)
+
+def plan_query(query: LaunchQuery, key_map: LaunchKeyMap = None, stats: PredicateStats = None) -> QueryPlan:
+    """
+    Elige el camino más barato en RCU: un GSI por igualdad (con la
+    proporción de la última muestra de estadísticas), el mapa de claves en
+    memoria para rangos de fechas (recuento exacto, pero BatchGetItem cobra
+    cada item entero) o un scan de la tabla con todos los predicados en
+    FilterExpression. Así el mapa de claves solo se usa con rangos
+    selectivos: un rango que cubre casi toda la tabla sale más caro que el scan.
+    """
+    key_map = launch_key_map if key_map is None else key_map
+    stats = predicate_stats if stats is None else stats
+    lower, upper = query.date_bounds()
+    # Tamaño de la tabla: el mapa de claves es exacto; la muestra de
+    # estadísticas está acotada; sin ninguno, lo que permite leer el tope
+    table_items = max(len(key_map), stats.total) or FILTER_MAX_PAGES * FILTER_PAGE_SIZE
+    
+    candidates = []
+    in_range = key_map.keys_between(lower, upper) if lower or upper else None
+    if in_range is not None:
+        candidates.append(QueryPlan('key_map', len(in_range)))
+    
+    if FILTER_USE_INDEXES:
+        # Fracción del rango de fechas sobre el total, si el mapa la conoce
+        range_fraction = len(in_range) / max(len(key_map), 1) if in_range is not None else 1.0
+        for attribute, value in query.equalities().items():
+            if attribute not in FILTER_INDEXES:
+                continue
+            count = stats.estimate(attribute, value)
+            # Sin muestra se supone el peor caso, todo el rango: aun así el
+            # Query no lee más que el scan ni cobra por item como BatchGetItem
+            selectivity = count / stats.total if count is not None else 1.0
+            candidates.append(QueryPlan('index', int(table_items * selectivity * range_fraction), attribute))
+    
+    candidates.append(QueryPlan('scan', table_items))
+    # Entre costes iguales gana el primero (el scan va el último)
+    return min(candidates, key=lambda plan: plan.cost)
+
+def filter_expression(query: LaunchQuery, skip_attribute: Optional[str] = None, include_dates: bool = True) -> Dict[str, Any]:
+    """FilterExpression con los predicados que no resuelve la clave del camino elegido"""
+    conditions, names, values = [], {}, {}
+    for attribute, value in query.equalities().items():
+        if attribute == skip_attribute:
+            continue
+        names[f'#{attribute}'] = attribute
+        values[f':{attribute}'] = {'S': value}
+        conditions.append(f'#{attribute} = :{attribute}')
+    if include_dates:
+        lower, upper = query.date_bounds()
+        if lower or upper:
+            names['#launch_date'] = 'launch_date'
+        if lower:
+            values[':date_from'] = {'S': lower}
+            conditions.append('#launch_date >= :date_from')
+        if upper:
+            values[':date_to'] = {'S': upper}
+            conditions.append('#launch_date <= :date_to')
+    if query.payload_type:
+        names['#payload_types'] = 'payload_types'
+        values[':payload_type'] = {'S': query.payload_type}
+        conditions.append('contains(#payload_types, :payload_type)')
+    if not conditions:
+        return {}
+    return {
+        'FilterExpression': ' AND '.join(conditions),
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+    }
+
+class DynamoDBConnections:
+    """
+    Sesión y cliente DynamoDB de bajo nivel compartidos por el proceso (los
+    clientes boto3 son thread-safe). Con preload_app la sesión y sus modelos
+    se cargan una vez en el master y los workers los comparten copy-on-write;
+    reset() fuerza tras el fork un cliente nuevo con su propio pool HTTP.
+    """
     def __init__(self):
         self.table_name = os.environ.get('TABLE_NAME', 'spacex-launches')
+        self.details_table_name = os.environ.get('DETAILS_TABLE_NAME', 'spacex-launch-details')
+        self.control_table_name = os.environ.get('CONTROL_TABLE_NAME', 'spacex-ingest-control')
         self.region = os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')
+        self._session = None
+        self._client = None
+        self._lock = threading.Lock()
+    
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = boto3.session.Session(
+                    region_name=self.region,
+                    aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+                    aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY')
+                )
+            return self._session
+    
+    def client(self):
+        """Cliente DynamoDB del proceso"""
+        client = self._client
+        if client is None:
+            session = self._get_session()
+            with self._lock:
+                if self._client is None:
+                    self._client = session.client(
+                        'dynamodb',
+                        endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL')
+                    )
+                client = self._client
+        return client
+    
+    def reset(self) -> None:
+        """Descarta el cliente (y su pool HTTP); el siguiente uso crea otro"""
+        with self._lock:
+            self._client = None
+    
+    def warm_up(self, load_key_map: bool = False) -> None:
+        """Carga modelos boto3 y verifica la tabla antes de servir tráfico"""
+        try:
+            self.client().describe_table(TableName=self.table_name)
+            if load_key_map:
+                launch_key_map.refresh(DynamoDBService())
+            logger.info(f"DynamoDB connections warmed up for table: {self.table_name}")
+        except Exception as e:
+            logger.warning(f"DynamoDB warm-up failed: {str(e)}")
+
+dynamodb_connections = DynamoDBConnections()
+
+class DynamoDBService:
+    def __init__(self):
+        self.table_name = dynamodb_connections.table_name
+        self.details_table_name = dynamodb_connections.details_table_name
+        self.control_table_name = dynamodb_connections.control_table_name
+        self.region = dynamodb_connections.region
         
         try:
-            # Configurar cliente DynamoDB
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                region_name=self.region,
-                aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY')
-            )
-            self.table = self.dynamodb.Table(self.table_name)
-            
-            # Verificar conexión
-            self.table.table_status
-            logger.info(f"DynamoDB Service initialized for table: {self.table_name}")
+            # Cliente compartido; no hay llamadas de red al construir el servicio.
+            # El envoltorio registra las lecturas en las métricas de la petición
+            self.client = InstrumentedClient(dynamodb_connections.client())
             
         except Exception as e:
             logger.error(f"Error initializing DynamoDB: {str(e)}")
             raise
     
+    def scan_page(self, **scan_params) -> Dict[str, Any]:
+        """Scan de una página con los items ya decodificados a tipos nativos"""
+        response = self.client.scan(TableName=self.table_name, **scan_params)
+        response['Items'] = [deserialize_launch(item) for item in response.get('Items', [])]
+        return response
+    
     def get_all_launches(self, limit: int = 100, last_evaluated_key: Optional[Dict] = None) -> Dict[str, Any]:
         """Obtiene todos los lanzamientos con paginación"""
         try:
@@ -46,13 +456,14 @@ class DynamoDBService:
             }
             
             if last_evaluated_key:
-                scan_params['ExclusiveStartKey'] = last_evaluated_key
+                scan_params['ExclusiveStartKey'] = serialize_key(last_evaluated_key)
             
-            response = self.table.scan(**scan_params)
+            response = self.scan_page(**scan_params)
+            last_key = response.get('LastEvaluatedKey')
             
             return {
-                'items': response.get('Items', []),
-                'last_evaluated_key': response.get('LastEvaluatedKey'),
+                'items': response['Items'],
+                'last_evaluated_key': deserialize_key(last_key) if last_key else None,
                 'count': response.get('Count', 0),
                 'scanned_count': response.get('ScannedCount', 0)
             }
@@ -61,45 +472,252 @@ class DynamoDBService:
             raise
     
     def get_launch_by_id(self, launch_id: str) -> Optional[Dict]:
-        """Obtiene un lanzamiento por ID - VERSIÓN CORREGIDA"""
+        """Obtiene un lanzamiento completo (resumen + detalle) por ID"""
         try:
-            # IMPORTANTE: Usar query en lugar de get_item para clave compuesta
-            response = self.table.query(
-                KeyConditionExpression=boto3.dynamodb.conditions.Key('launch_id').eq(launch_id),
-                Limit=1
-            )
+            launch_date = launch_key_map.resolve(self, [launch_id]).get(launch_id)
+            if launch_date is not None:
+                # Un único BatchGetItem lee el resumen y el detalle (lecturas eventualmente consistentes)
+                launches = self._get_full_launches([{'launch_id': launch_id, 'launch_date': launch_date}])
+                if launch_id in launches:
+                    return launches[launch_id]
             
-            items = response.get('Items', [])
-            return items[0] if items else None
+            # ID desconocido o fecha cambiada: resolver la clave con Query
+            launch = self._query_launch_by_id(launch_id)
+            if launch is None:
+                return None
+            response = self.client.get_item(
+                TableName=self.details_table_name,
+                Key={'launch_id': {'S': launch_id}},
+                ConsistentRead=False
+            )
+            if response.get('Item'):
+                deserialize_launch(response['Item'], launch)
+            return launch
             
         except Exception as e:
             logger.error(f"Error getting launch by ID {launch_id}: {str(e)}")
+            raise
+    
+    def _query_launch_by_id(self, launch_id: str) -> Optional[Dict]:
+        """Query por clave de partición; necesario porque launch_date es la clave de ordenación"""
+        response = self.client.query(
+            TableName=self.table_name,
+            KeyConditionExpression='launch_id = :launch_id',
+            ExpressionAttributeValues={':launch_id': {'S': launch_id}},
+            Limit=1
+        )
+        
+        items = response.get('Items', [])
+        if not items:
             return None
+        item = deserialize_launch(items[0])
+        launch_key_map.remember(launch_id, item['launch_date'])
+        return item
     
-    def get_launches_by_status(self, status: str, limit: int = 50) -> List[Dict]:
-        """Obtiene lanzamientos por estado - VERSIÓN CORREGIDA"""
+    def get_launches_by_ids(self, launch_ids: List[str]) -> List[Dict]:
+        """Obtiene varios lanzamientos con BatchGetItem respetando el orden solicitado"""
         try:
-            # Usar expresión de filtro en scan
-            response = self.table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('status').eq(status),
-                Limit=limit
-            )
-            return response.get('Items', [])
+            unique_ids = list(dict.fromkeys(launch_ids))
+            launch_dates = launch_key_map.resolve(self, unique_ids)
+            # Lanzamientos nuevos desde la última recarga: Query por ID, acotado por petición
+            misses = [launch_id for launch_id in unique_ids if launch_id not in launch_dates]
+            for launch_id in misses[:BATCH_MISS_QUERY_LIMIT]:
+                launch = self._query_launch_by_id(launch_id)
+                if launch is not None:
+                    launch_dates[launch_id] = launch['launch_date']
+            keys = [
+                {'launch_id': launch_id, 'launch_date': launch_dates[launch_id]}
+                for launch_id in unique_ids if launch_id in launch_dates
+            ]
+            
+            found = {}
+            # Cada lanzamiento ocupa dos claves: resumen y detalle
+            chunk_size = BATCH_GET_MAX_KEYS // 2
+            for start in range(0, len(keys), chunk_size):
+                found.update(self._get_full_launches(keys[start:start + chunk_size]))
+            
+            return [found[launch_id] for launch_id in unique_ids if launch_id in found]
         except Exception as e:
-            logger.error(f"Error getting launches by status {status}: {str(e)}")
-            return []
+            logger.error(f"Error getting launches by IDs: {str(e)}")
+            raise
+    
+    def _get_full_launches(self, keys: List[Dict]) -> Dict[str, Any]:
+        """Lee resúmenes y detalles en el mismo BatchGetItem y los combina por launch_id"""
+        responses = self._batch_get_items({
+            self.table_name: {'Keys': [serialize_key(key) for key in keys]},
+            self.details_table_name: {'Keys': [{'launch_id': {'S': key['launch_id']}} for key in keys]},
+        })
+        
+        launches = {}
+        for item in responses.get(self.table_name, []):
+            launch = deserialize_launch(item)
+            launches[launch['launch_id']] = launch
+        for item in responses.get(self.details_table_name, []):
+            launch = launches.get(item['launch_id']['S'])
+            if launch is not None:
+                deserialize_launch(item, launch)
+        return launches
     
-    def get_launches_by_rocket(self, rocket_name: str, limit: int = 50) -> List[Dict]:
-        """Obtiene lanzamientos por cohete - VERSIÓN CORREGIDA"""
+    def _batch_get_items(self, request_items: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+        """Ejecuta un BatchGetItem reintentando las claves no procesadas"""
+        responses = {}
+        
+        for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+            response = self.client.batch_get_item(RequestItems=request_items)
+            for table_name, items in response.get('Responses', {}).items():
+                responses.setdefault(table_name, []).extend(items)
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                return responses
+            if attempt < BATCH_GET_MAX_RETRIES:
+                # Backoff exponencial ante throttling
+                time.sleep(0.05 * (2 ** attempt))
+        
+        unprocessed = sum(len(request.get('Keys', [])) for request in request_items.values())
+        raise RuntimeError(f"BatchGetItem left {unprocessed} unprocessed keys after {BATCH_GET_MAX_RETRIES} retries")
+    
+    def get_launches_by_status(self, status: str, limit: int = 50) -> List[Dict]:
+        """
+        Lanzamientos con un estado, del más antiguo al más reciente. Con los GSI
+        es un Query ordenado a status-date-index; sin ellos, un scan paginado
+        hasta reunir `limit` (DynamoDB aplica Limit antes que FilterExpression,
+        así que una sola página suele traer muy pocos) o FILTER_MAX_PAGES.
+        """
         try:
-            response = self.table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('rocket_name').eq(rocket_name),
-                Limit=limit
-            )
-            return response.get('Items', [])
+            if FILTER_USE_INDEXES:
+                response = self.client.query(
+                    TableName=self.table_name,
+                    IndexName=FILTER_INDEXES['status'],
+                    KeyConditionExpression='#status = :status',
+                    ExpressionAttributeNames={'#status': 'status'},
+                    ExpressionAttributeValues={':status': {'S': status}},
+                    Limit=limit
+                )
+                return [deserialize_launch(item) for item in response.get('Items', [])]
+            
+            items = []
+            scan_params = {
+                'FilterExpression': '#status = :status',
+                'ExpressionAttributeNames': {'#status': 'status'},
+                'ExpressionAttributeValues': {':status': {'S': status}},
+                'Limit': FILTER_PAGE_SIZE,
+            }
+            for _ in range(FILTER_MAX_PAGES):
+                response = self.scan_page(**scan_params)
+                items.extend(response.get('Items', []))
+                last_evaluated_key = response.get('LastEvaluatedKey')
+                if not last_evaluated_key or len(items) >= limit:
+                    break
+                scan_params['ExclusiveStartKey'] = last_evaluated_key
+            items.sort(key=lambda item: item.get('launch_date', ''))
+            return items[:limit]
         except Exception as e:
-            logger.error(f"Error getting launches by rocket {rocket_name}: {str(e)}")
-            return []
+            logger.error(f"Error getting launches by status {status}: {str(e)}")
+            raise
+    
+    def filter_launches(self, query: LaunchQuery, limit: int = 50) -> tuple:
+        """
+        Lanzamientos que cumplen todos los predicados, del más reciente al más
+        antiguo. Devuelve (items, plan) con el camino elegido y lo leído;
+        plan['truncated'] indica que se dejó de paginar antes de ver todos los
+        candidatos, así que puede haber más resultados (o más recientes).
+        """
+        plan = plan_query(query)
+        if plan.access == 'key_map':
+            items, pages, scanned, truncated = self._filter_by_key_map(query, limit)
+        else:
+            items, pages, scanned, truncated = self._filter_pages(query, plan, limit)
+        items.sort(key=lambda item: item.get('launch_date', ''), reverse=True)
+        return items[:limit], {
+            'access': plan.access,
+            'index': plan.index_name if plan.access == 'index' else None,
+            'estimated_items': plan.estimate,
+            'estimated_rcu': plan.cost,
+            'pages': pages,
+            'scanned': scanned,
+            'truncated': truncated,
+        }
+    
+    def _filter_pages(self, query: LaunchQuery, plan: QueryPlan, limit: int) -> tuple:
+        """Query al GSI o scan, página a página hasta reunir `limit` resultados"""
+        if plan.access == 'index':
+            params = {
+                'TableName': self.table_name,
+                'IndexName': plan.index_name,
+                'ScanIndexForward': False,
+                **filter_expression(query, skip_attribute=plan.attribute, include_dates=False),
+            }
+            names = {**params.pop('ExpressionAttributeNames', {}), '#key': plan.attribute}
+            values = {**params.pop('ExpressionAttributeValues', {}), ':key': {'S': query.equalities()[plan.attribute]}}
+            key_condition = '#key = :key'
+            lower, upper = query.date_bounds()
+            if lower or upper:
+                names['#launch_date'] = 'launch_date'
+            if lower and upper:
+                key_condition += ' AND #launch_date BETWEEN :date_from AND :date_to'
+            elif lower:
+                key_condition += ' AND #launch_date >= :date_from'
+            elif upper:
+                key_condition += ' AND #launch_date <= :date_to'
+            if lower:
+                values[':date_from'] = {'S': lower}
+            if upper:
+                values[':date_to'] = {'S': upper}
+            params.update(KeyConditionExpression=key_condition, ExpressionAttributeNames=names,
+                          ExpressionAttributeValues=values)
+            read_page = self.client.query
+        else:
+            params = {'TableName': self.table_name, **filter_expression(query)}
+            read_page = self.client.scan
+        params['Limit'] = FILTER_PAGE_SIZE
+        
+        items, pages, scanned = [], 0, 0
+        last_evaluated_key = None
+        while pages < FILTER_MAX_PAGES:
+            response = read_page(**params)
+            pages += 1
+            scanned += response.get('ScannedCount', 0)
+            for item in response.get('Items', []):
+                launch = deserialize_launch(item)
+                if query.matches_text(launch):
+                    items.append(launch)
+            
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key or len(items) >= limit:
+                break
+            params['ExclusiveStartKey'] = last_evaluated_key
+        # El índice va ordenado por fecha: con `limit` resultados ya están los más
+        # recientes. El scan no tiene orden, así que cualquier página sin leer cuenta
+        if plan.access == 'index':
+            truncated = bool(last_evaluated_key) and len(items) < limit
+        else:
+            truncated = bool(last_evaluated_key)
+        return items, pages, scanned, truncated
+    
+    def _filter_by_key_map(self, query: LaunchQuery, limit: int) -> tuple:
+        """
+        BatchGetItem de los resúmenes en el rango de fechas; el resto de
+        predicados en memoria. Lee como mucho FILTER_MAX_PAGES * FILTER_PAGE_SIZE
+        claves, igual que el scan.
+        """
+        lower, upper = query.date_bounds()
+        keys = launch_key_map.keys_between(lower, upper) or []
+        budget = min(len(keys), FILTER_MAX_PAGES * FILTER_PAGE_SIZE)
+        items, pages, scanned = [], 0, 0
+        for start in range(0, budget, BATCH_GET_MAX_KEYS):
+            chunk = keys[start:min(start + BATCH_GET_MAX_KEYS, budget)]
+            responses = self._batch_get_items({self.table_name: {'Keys': [serialize_key(key) for key in chunk]}})
+            pages += 1
+            scanned += len(chunk)
+            for item in responses.get(self.table_name, []):
+                launch = deserialize_launch(item)
+                if query.matches(launch):
+                    items.append(launch)
+            # Las claves van de más reciente a más antigua: los primeros `limit` ya son los buenos
+            if len(items) >= limit:
+                break
+        return items, pages, scanned, len(items) < limit and scanned < len(keys)
     
     def get_upcoming_launches(self, limit: int = 10) -> List[Dict]:
         """Obtiene próximos lanzamientos"""
@@ -118,7 +736,7 @@ class DynamoDBService:
                 if last_evaluated_key:
                     scan_params['ExclusiveStartKey'] = last_evaluated_key
                 
-                response = self.table.scan(**scan_params)
+                response = self.scan_page(**scan_params)
                 batch_items = response.get('Items', [])
                 items.extend(batch_items)
                 
@@ -126,6 +744,7 @@ class DynamoDBService:
                 if not last_evaluated_key:
                     break
             
+            predicate_stats.observe(items)
             total = len(items)
             successful = len([item for item in items if item.get('status') == 'success'])
             failed = len([item for item in items if item.get('status') == 'failed'])
@@ -148,20 +767,13 @@ class DynamoDBService:
                 'upcoming': upcoming,
                 'success_rate': round(success_rate, 2),
                 'rockets': rockets,
+                'rocket_breakdown': summarize_rockets(items),
                 'last_updated': datetime.utcnow().isoformat(),
                 'sample_size': len(items)  # Para debugging
             }
         except Exception as e:
             logger.error(f"Error getting launch statistics: {str(e)}")
-            return {
-                'total_launches': 0,
-                'successful': 0,
-                'failed': 0,
-                'upcoming': 0,
-                'success_rate': 0,
-                'rockets': {},
-                'error': str(e)
-            }
+            raise
     
     def search_launches(self, query: str, limit: int = 20) -> List[Dict]:
         """Busca lanzamientos por término en nombre de misión"""
@@ -174,7 +786,7 @@ class DynamoDBService:
                 if last_evaluated_key:
                     scan_params['ExclusiveStartKey'] = last_evaluated_key
                 
-                response = self.table.scan(**scan_params)
+                response = self.scan_page(**scan_params)
                 items = response.get('Items', [])
                 
                 # Filtrar localmente por query
@@ -191,23 +803,133 @@ class DynamoDBService:
             return all_items[:limit]
         except Exception as e:
             logger.error(f"Error searching launches: {str(e)}")
-            return []
+            raise
     
     def get_recent_launches(self, limit: int = 10) -> List[Dict]:
-        """Obtiene lanzamientos más recientes ordenados por fecha"""
+        """
+        Últimos lanzamientos ya ocurridos, del más reciente al más antiguo: las
+        `limit` claves anteriores a ahora según el orden por fecha del mapa de
+        claves, leídas con BatchGetItem
+        """
         try:
-            # Nota: Para ordenar por fecha necesitaríamos un GSI, por ahora usamos scan + sort local
-            response = self.table.scan(Limit=limit * 3)  # Escanear más para luego filtrar
-            items = response.get('Items', [])
-            
-            # Ordenar por fecha descendente
-            sorted_items = sorted(
-                items, 
-                key=lambda x: x.get('launch_date', ''), 
-                reverse=True
-            )
-            
-            return sorted_items[:limit]
+            launch_key_map.ensure_fresh(self)
+            now = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+            # Mientras se recarga en segundo plano vale el mapa anterior
+            keys = (launch_key_map.keys_between(None, now, allow_stale=True) or [])[:limit]
+            if not keys:
+                return []
+            responses = self._batch_get_items({self.table_name: {'Keys': [serialize_key(key) for key in keys]}})
+            items = [deserialize_launch(item) for item in responses.get(self.table_name, [])]
+            items.sort(key=lambda item: item.get('launch_date', ''), reverse=True)
+            return items
         except Exception as e:
             logger.error(f"Error getting recent launches: {str(e)}")
-            return []
\ No newline at end of file
+            raise
+    
+    def get_dashboard(self, recent_limit: int = 10, upcoming_limit: int = 10,
+                      timeout: float = DASHBOARD_SECTION_TIMEOUT_SECONDS) -> tuple:
+        """
+        Estadísticas, lanzamientos recientes y próximos consultados en paralelo.
+        Devuelve (secciones, errores): una sección que falla o no termina en
+        `timeout` segundos queda fuera de `secciones` y su motivo en `errores`.
+        """
+        loaders = {
+            'statistics': ((), self.get_launch_statistics),
+            'recent': ((recent_limit,), functools.partial(self.get_recent_launches, recent_limit)),
+            'upcoming': ((upcoming_limit,), functools.partial(self.get_upcoming_launches, upcoming_limit)),
+        }
+        futures = {
+            name: submit_section((self.table_name, name, *args), load)
+            for name, (args, load) in loaders.items()
+        }
+        deadline = time.monotonic() + timeout
+        sections, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                sections[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                # La consulta sigue en el pool (no se puede cancelar); las
+                # peticiones siguientes la esperan en vez de lanzar otra
+                errors[name] = f'Timed out after {timeout}s'
+                logger.warning(f"Dashboard section {name} timed out after {timeout}s")
+            except Exception as e:
+                errors[name] = str(e)
+                logger.error(f"Error getting dashboard section {name}: {str(e)}")
+        return sections, errors
+    
+    def get_ingest_runs(self, limit: int = 20) -> List[Dict]:
+        """Últimas ejecuciones del ingester, de la más reciente a la más antigua"""
+        response = self.client.query(
+            TableName=self.control_table_name,
+            KeyConditionExpression='pk = :pk',
+            ExpressionAttributeValues={':pk': {'S': INGEST_RUN_PK}},
+            ScanIndexForward=False,
+            Limit=limit
+        )
+        return [
+            {name: decode_value(value) for name, value in item.items() if name not in ('pk', 'sk', 'expires_at')}
+            for item in response.get('Items', [])
+        ]
+
+def summarize_rockets(items: List[Dict]) -> List[Dict[str, Any]]:
+    """Lanzamientos por cohete y estado, del más usado al menos"""
+    rockets = {}
+    for item in items:
+        counts = rockets.setdefault(item.get('rocket_name', 'Unknown'), dict.fromkeys(
+            ('total', 'successful', 'failed', 'upcoming'), 0
+        ))
+        counts['total'] += 1
+        status = {'success': 'successful', 'failed': 'failed', 'upcoming': 'upcoming'}.get(item.get('status'))
+        if status:
+            counts[status] += 1
+    breakdown = []
+    for rocket, counts in rockets.items():
+        completed = counts['total'] - counts['upcoming']
+        breakdown.append({
+            'rocket': rocket,
+            **counts,
+            'success_rate': round(counts['successful'] / completed * 100, 2) if completed else None,
+        })
+    return sorted(breakdown, key=lambda entry: (-entry['total'], entry['rocket']))
+
+
+def _percentile(sorted_values: List[float], quantile: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * quantile), len(sorted_values) - 1)]
+
+def summarize_ingest_runs(runs: List[Dict]) -> Dict[str, Any]:
+    """Agregados de las ejecuciones: resultados, duración, etapas, volumen y capacidad"""
+    outcomes = {}
+    for run in runs:
+        outcomes[run.get('outcome', 'unknown')] = outcomes.get(run.get('outcome', 'unknown'), 0) + 1
+    # Las ejecuciones que no llegaron a procesar nada no cuentan para duración ni éxito
+    worked = [run for run in runs if run.get('outcome') not in ('skipped', 'unchanged')]
+    durations = sorted(float(run.get('duration_ms', 0)) for run in worked)
+    processed = sum(run.get('total_processed', 0) for run in worked)
+    seconds = sum(durations) / 1000
+    
+    def total(name):
+        return sum(run.get(name, 0) for run in runs)
+    
+    return {
+        'runs': len(runs),
+        'outcomes': outcomes,
+        'success_rate': round(outcomes.get('ok', 0) / len(worked) * 100, 2) if worked else None,
+        'duration_ms': {
+            'avg': round(seconds * 1000 / len(durations), 1) if durations else None,
+            'p50': _percentile(durations, 0.50),
+            'p95': _percentile(durations, 0.95),
+        },
+        'stages_ms_avg': {
+            stage: round(sum(float(run.get('stages_ms', {}).get(stage, 0)) for run in worked) / len(worked), 1)
+            if worked else None
+            for stage in INGEST_RUN_STAGES
+        },
+        'launches_per_second': round(processed / seconds, 1) if seconds else None,
+        'bytes_downloaded': total('bytes_downloaded'),
+        'items_changed': total('items_changed'),
+        'retries': total('retries'),
+        'throttles': total('throttles'),
+        'wcu': round(total('wcu'), 1),
+    }
@@ -1,3 +1,914 @@
-from django.test import TestCase
+import os
+import runpy
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest.mock import patch, MagicMock
 
-# Create your tests here.
+from botocore.exceptions import ClientError
+
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import SimpleTestCase
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import admission, negotiation, profiling, resilience, services
+from .async_views import offload
+from .instrumentation import EndpointStats, RequestMetrics, percentile
+from .launch_codec import Compressed, Compression, Launch, deserialize_launch, serialize_detail, serialize_key, serialize_launch
+from .services import DynamoDBService, LaunchKeyMap
+from .views import LaunchDetailView
+
+
+def make_service(mock_client_factory):
+    """Crea un DynamoDBService con el cliente boto3 simulado"""
+    mock_client = MagicMock()
+    mock_client_factory.return_value = mock_client
+    return DynamoDBService(), mock_client
+
+
+def wire(*items):
+    """Items en formato wire, como los devuelve el cliente de bajo nivel"""
+    return [serialize_launch(item) for item in items]
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestBatchLookup(SimpleTestCase):
+
+    def setUp(self):
+        self.key_map = LaunchKeyMap()
+        patcher = patch.object(services, 'launch_key_map', self.key_map)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_key_map_refresh_projects_only_keys(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.scan.side_effect = [
+            {'Items': wire({'launch_id': 'a', 'launch_date': '2020'}),
+             'LastEvaluatedKey': serialize_key({'launch_id': 'a', 'launch_date': '2020'})},
+            {'Items': wire({'launch_id': 'b', 'launch_date': '2021'})},
+        ]
+
+        keys = self.key_map.resolve(service, ['a', 'b'])
+
+        self.assertEqual(keys, {'a': '2020', 'b': '2021'})
+        self.assertEqual(client.scan.call_args_list[0].kwargs['ProjectionExpression'], 'launch_id, launch_date')
+
+    def test_stale_key_map_refreshes_once_in_background(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        self.key_map._keys = {'a': '2020'}
+        self.key_map._loaded_at = time.monotonic() - self.key_map.ttl_seconds - 1
+        scanning, release = threading.Event(), threading.Event()
+
+        def scan(**params):
+            scanning.set()
+            release.wait(5)
+            return {'Items': wire({'launch_id': 'a', 'launch_date': '2021'})}
+        client.scan.side_effect = scan
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.key_map.resolve(service, ['a']), range(8)))
+
+        # Todas las peticiones sirven el mapa anterior sin esperar al scan
+        self.assertEqual(results, [{'a': '2020'}] * 8)
+        self.assertTrue(scanning.wait(5))
+        release.set()
+        # El hilo de recarga suelta el lock al terminar
+        self.assertTrue(self.key_map._refresh_lock.acquire(timeout=5))
+        self.key_map._refresh_lock.release()
+        self.assertEqual(self.key_map.resolve(service, ['a']), {'a': '2021'})
+        client.scan.assert_called_once()
+
+    def test_failed_key_map_refresh_backs_off(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.scan.side_effect = ClientError({'Error': {'Code': 'InternalServerError'}}, 'Scan')
+
+        with self.assertRaises(ClientError):
+            self.key_map.resolve(service, ['a'])
+        # Durante la espera no se reintenta: quien llama resuelve con Query
+        self.assertEqual(self.key_map.resolve(service, ['a']), {})
+        client.scan.assert_called_once()
+
+        self.key_map._retry_at = time.monotonic()
+        client.scan.side_effect = None
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2020'})}
+        self.assertEqual(self.key_map.resolve(service, ['a']), {'a': '2020'})
+        self.assertEqual(client.scan.call_count, 2)
+
+    @patch('launches.services.time.sleep')
+    def test_batch_get_chunks_retries_and_keeps_order(self, mock_sleep, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        ids = [f'id{n}' for n in range(150)]
+        client.scan.return_value = {'Items': wire(*({'launch_id': i, 'launch_date': '2020'} for i in ids))}
+        calls = []
+
+        def batch_get_item(RequestItems):
+            summary_keys = RequestItems['spacex-launches']['Keys']
+            detail_keys = RequestItems.get('spacex-launch-details', {}).get('Keys', [])
+            calls.append(len(summary_keys) + len(detail_keys))
+            details = [dict(key, details={'S': 'long text'}) for key in detail_keys]
+            if len(calls) == 1:
+                # Primer chunk: una clave de resumen queda sin procesar
+                return {
+                    'Responses': {'spacex-launches': summary_keys[1:], 'spacex-launch-details': details},
+                    'UnprocessedKeys': {'spacex-launches': {'Keys': summary_keys[:1]}}
+                }
+            return {'Responses': {'spacex-launches': list(reversed(summary_keys)), 'spacex-launch-details': details}}
+        client.batch_get_item.side_effect = batch_get_item
+        client.query.return_value = {'Items': []}
+
+        items = service.get_launches_by_ids(list(reversed(ids)) + ['unknown'])
+
+        self.assertEqual([item['launch_id'] for item in items], list(reversed(ids)))
+        self.assertEqual(items[0]['details'], 'long text')
+        # 3 chunks de 50 lanzamientos (100 claves) + 1 reintento de claves no procesadas
+        self.assertEqual(calls, [100, 1, 100, 100])
+        mock_sleep.assert_called_once()
+
+    def test_batch_view_reports_missing_ids(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2020'})}
+        client.batch_get_item.return_value = {
+            'Responses': {'spacex-launches': wire({'launch_id': 'a', 'launch_date': '2020'})}
+        }
+        client.query.return_value = {'Items': []}
+
+        response = APIClient().get('/api/launches/batch/?ids=a,b')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(response.json()['missing'], ['b'])
+
+    def test_unknown_ids_use_bounded_queries_instead_of_rescanning(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2020'})}
+        client.batch_get_item.return_value = {'Responses': {
+            'spacex-launches': wire({'launch_id': 'a', 'launch_date': '2020'}, {'launch_id': 'new', 'launch_date': '2024'})
+        }}
+        client.query.side_effect = lambda **params: {
+            'Items': wire({'launch_id': 'new', 'launch_date': '2024'})
+            if params['ExpressionAttributeValues'][':launch_id']['S'] == 'new' else []
+        }
+        random_ids = [f'random{n}' for n in range(services.BATCH_MISS_QUERY_LIMIT + 5)]
+
+        items = service.get_launches_by_ids(['a', 'new'] + random_ids)
+        service.get_launches_by_ids(random_ids)
+
+        self.assertEqual([item['launch_id'] for item in items], ['a', 'new'])
+        # Un único scan (la carga inicial del mapa) y Query solo hasta el límite por petición
+        client.scan.assert_called_once()
+        self.assertEqual(client.query.call_count, 2 * services.BATCH_MISS_QUERY_LIMIT)
+
+    def test_batch_view_requires_ids(self, mock_client_factory):
+        make_service(mock_client_factory)
+
+        response = APIClient().post('/api/launches/batch/', {'ids': 'a'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_point_lookup_reads_summary_and_detail_in_one_batch(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2020'})}
+        client.batch_get_item.return_value = {'Responses': {
+            'spacex-launches': wire({'launch_id': 'a', 'launch_date': '2020', 'status': 'success'}),
+            'spacex-launch-details': wire({'launch_id': 'a', 'details': 'long text'}),
+        }}
+
+        launch = service.get_launch_by_id('a')
+
+        self.assertEqual(launch.to_dict(), {
+            'launch_id': 'a', 'launch_date': '2020', 'status': 'success', 'details': 'long text'
+        })
+        client.batch_get_item.assert_called_once_with(RequestItems={
+            'spacex-launches': {'Keys': [{'launch_id': {'S': 'a'}, 'launch_date': {'S': '2020'}}]},
+            'spacex-launch-details': {'Keys': [{'launch_id': {'S': 'a'}}]},
+        })
+        client.query.assert_not_called()
+
+    def test_point_lookup_falls_back_to_query_for_unknown_id(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': []}
+        client.query.return_value = {'Items': wire({'launch_id': 'new', 'launch_date': '2024'})}
+        client.get_item.return_value = {'Item': serialize_launch({'launch_id': 'new', 'details': 'text'})}
+
+        launch = service.get_launch_by_id('new')
+
+        self.assertEqual(launch['launch_date'], '2024')
+        self.assertEqual(launch['details'], 'text')
+        client.batch_get_item.assert_not_called()
+        self.assertEqual(self.key_map.resolve(service, ['new']), {'new': '2024'})
+
+
+class TestLaunchCodec(SimpleTestCase):
+
+    def test_round_trip_uses_native_types(self):
+        launch = {
+            'launch_id': 'a',
+            'launch_date': '2020-01-01T00:00:00.000Z',
+            'launch_date_unix': 1577836800,
+            'flight_number': 7,
+            'payload_names': ['Sat 1', 'Sat 2'],
+            'details': None,
+            'extra': {'reused': True, 'mass': 1.5},
+        }
+
+        item = serialize_launch(launch)
+
+        self.assertEqual(item['flight_number'], {'N': '7'})
+        self.assertEqual(item['details'], {'NULL': True})
+        self.assertEqual(deserialize_launch(item).to_dict(), launch)
+
+    def test_decodes_items_written_by_resource_layer(self):
+        # Números como Decimal serializado y listas genéricas
+        item = {'flight_number': {'N': '12'}, 'payload_types': {'L': [{'S': 'Satellite'}]}}
+
+        self.assertEqual(deserialize_launch(item).to_dict(), {'flight_number': 12, 'payload_types': ['Satellite']})
+
+    def test_launch_record_interns_enum_fields_and_reads_like_a_dict(self):
+        first = deserialize_launch({'status': {'S': ''.join(['succ', 'ess'])}, 'launch_id': {'S': 'a'}})
+        second = Launch(status=''.join(['succ', 'ess']))
+
+        self.assertIs(first.status, second.status)
+        self.assertEqual(first['launch_id'], 'a')
+        self.assertIsNone(first.get('details'))
+        self.assertNotIn('details', first)
+        self.assertEqual(serialize_launch(first), {'launch_id': {'S': 'a'}, 'status': {'S': 'success'}})
+
+    def test_compressed_attributes_decode_lazily(self):
+        details = 'Long mission description. ' * 40
+        payloads = [f'Starlink group {n}' for n in range(30)]
+        compression = Compression(fields=['details', 'payload_names'])
+
+        item = serialize_detail(Launch(launch_id='a', details=details, payload_names=payloads), compression)
+        launch = deserialize_launch(item)
+
+        self.assertIn('B', item['details'])
+        self.assertIs(type(launch.details), Compressed)
+        # Fuera de la proyección no se descomprime
+        self.assertEqual(launch.to_dict(['launch_id']), {'launch_id': 'a'})
+        self.assertIs(type(launch.details), Compressed)
+        self.assertEqual(launch.to_dict(), {'launch_id': 'a', 'details': details, 'payload_names': payloads})
+        self.assertEqual(launch.details, details)
+
+    def test_shared_copy_matches_lambda(self):
+        here = os.path.dirname(__file__)
+        lambda_copy = os.path.join(here, '..', '..', 'lambda', 'launch_codec.py')
+        if not os.path.exists(lambda_copy):
+            self.skipTest('lambda/ is not available in this checkout')
+        with open(os.path.join(here, 'launch_codec.py')) as backend_file, open(lambda_copy) as lambda_file:
+            self.assertEqual(backend_file.read(), lambda_file.read())
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestAsyncViews(SimpleTestCase):
+
+    def test_offloaded_view_runs_outside_event_loop_thread(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': []}
+        threads = []
+        client.query.side_effect = lambda **kwargs: threads.append(threading.current_thread().name) or {
+            'Items': wire({'launch_id': 'a', 'launch_date': '2020'})
+        }
+
+        view = offload(LaunchDetailView.as_view())
+        response = async_to_sync(view)(APIRequestFactory().get('/api/launches/a/'), launch_id='a')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(threads[0].startswith('dynamodb'))
+        self.assertTrue(view.csrf_exempt)
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestInstrumentation(SimpleTestCase):
+
+    def setUp(self):
+        patcher = patch.object(services, 'launch_key_map', LaunchKeyMap())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_server_timing_reports_dynamodb_calls_and_capacity(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {
+            'Items': wire({'launch_id': 'a', 'launch_date': '2020', 'status': 'success'}),
+            'Count': 1, 'ScannedCount': 40,
+            'ConsumedCapacity': {'TableName': 'spacex-launches', 'CapacityUnits': 2.5},
+        }
+
+        with self.assertLogs('launches.access') as logs:
+            response = APIClient().get('/api/launches/?limit=1')
+
+        self.assertEqual(client.scan.call_args.kwargs['ReturnConsumedCapacity'], 'TOTAL')
+        self.assertRegex(response['Server-Timing'], r'^ddb;dur=[\d.]+;desc="calls=1 scanned=40 returned=1 rcu=2.5", app;dur=')
+        self.assertIn('"endpoint": "/api/launches/"', logs.output[0])
+
+    def test_metrics_endpoint_exposes_view_histograms(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': [], 'Count': 0, 'ScannedCount': 0}
+
+        APIClient().get('/api/search/?q=starlink')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{le="0.005",method="GET",view="SearchLaunchesView"}', body)
+        self.assertIn('dynamodb_call_duration_seconds_count{operation="scan"}', body)
+
+    def test_client_is_unchanged_outside_a_request(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': []}
+        client.query.return_value = {'Items': []}
+
+        service.get_launch_by_id('a')
+
+        self.assertNotIn('ReturnConsumedCapacity', client.query.call_args.kwargs)
+
+    def test_endpoint_histogram_percentiles(self, mock_client_factory):
+        stats = EndpointStats()
+        for milliseconds in [3] * 90 + [40] * 9 + [700]:
+            stats.observe('/api/search/', 200, milliseconds / 1000, RequestMetrics())
+
+        buckets = stats.snapshot()['/api/search/']['buckets']
+
+        self.assertEqual(percentile(buckets, 0.5), 5)
+        self.assertEqual(percentile(buckets, 0.95), 50)
+        self.assertEqual(percentile(buckets, 0.999), 1000)
+
+
+class TestProfiling(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.ring = profiling.ProfileRing(directory.name, max_files=2)
+        for name, value in (('profile_ring', self.ring), ('PROFILE_SECRET', 'secret'), ('PROFILE_SAMPLE_RATE', 0)):
+            patcher = patch.object(profiling, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def signed(self, path):
+        return profiling.sign('secret', path, int(time.time()) + 60)
+
+    def test_disabled_middleware_is_not_used(self):
+        with patch.object(profiling, 'PROFILE_SECRET', ''):
+            with self.assertRaises(MiddlewareNotUsed):
+                profiling.ProfilingMiddleware(lambda request: HttpResponse())
+
+    def test_signed_header_profiles_into_bounded_ring(self):
+        middleware = profiling.ProfilingMiddleware(lambda request: HttpResponse('ok'))
+        factory = APIRequestFactory()
+
+        middleware(factory.get('/api/search/', HTTP_X_DEBUG_PROFILE='9999999999:forged'))
+        self.assertEqual(self.ring.list(), [])
+
+        for _ in range(3):
+            response = middleware(factory.get('/api/search/', HTTP_X_DEBUG_PROFILE=self.signed('/api/search/')))
+
+        self.assertEqual(response.content, b'ok')
+        names = [entry['name'] for entry in self.ring.list()]
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[0].endswith('GET_api_search.prof'))
+
+    def test_profile_endpoints_require_signature(self):
+        self.ring.write('GET /api/launches/', 'folded', lambda path: open(path, 'w').close())
+        name = self.ring.list()[0]['name']
+
+        self.assertEqual(self.client.get('/api/profiles/').status_code, 404)
+        listing = self.client.get('/api/profiles/', HTTP_X_DEBUG_PROFILE=self.signed('/api/profiles/'))
+        download = self.client.get(f'/api/profiles/{name}', HTTP_X_DEBUG_PROFILE=self.signed(f'/api/profiles/{name}'))
+
+        self.assertEqual(listing.json()['items'][0]['name'], name)
+        self.assertEqual(download.status_code, 200)
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestIngestRuns(SimpleTestCase):
+
+    def run_item(self, started_at, outcome, duration_ms, total_processed):
+        return {
+            'pk': {'S': 'run'},
+            'sk': {'S': f'{started_at}#request'},
+            'run_id': {'S': 'request'},
+            'kind': {'S': 'incremental'},
+            'outcome': {'S': outcome},
+            'duration_ms': {'N': str(duration_ms)},
+            'stages_ms': {'M': {'fetch': {'N': '100'}, 'parse': {'N': '10'}, 'transform': {'N': '20'}, 'write': {'N': '300'}}},
+            'total_processed': {'N': str(total_processed)},
+            'bytes_downloaded': {'N': '5000'},
+            'items_changed': {'N': '1'},
+            'throttles': {'N': '0'},
+            'retries': {'N': '0'},
+            'wcu': {'N': '4.0'},
+            'expires_at': {'N': '1999999999'},
+        }
+
+    def test_lists_recent_runs_with_aggregates(self, mock_client_factory):
+        _, mock_client = make_service(mock_client_factory)
+        mock_client.query.return_value = {'Items': [
+            self.run_item('2025-01-02T00:00:00+00:00', 'ok', 2000, 100),
+            self.run_item('2025-01-01T00:00:00+00:00', 'unchanged', 50, 0),
+        ]}
+
+        response = APIClient().get('/api/ingest-runs/?limit=5')
+
+        self.assertEqual(response.status_code, 200)
+        params = mock_client.query.call_args.kwargs
+        self.assertEqual(params['TableName'], 'spacex-ingest-control')
+        self.assertFalse(params['ScanIndexForward'])
+        self.assertEqual(params['Limit'], 5)
+        runs = response.json()['runs']
+        self.assertEqual(runs[0]['stages_ms']['write'], 300)
+        self.assertNotIn('pk', runs[0])
+        aggregates = response.json()['aggregates']
+        self.assertEqual(aggregates['outcomes'], {'ok': 1, 'unchanged': 1})
+        # Las ejecuciones sin cambios no cuentan para duración ni éxito
+        self.assertEqual(aggregates['success_rate'], 100.0)
+        self.assertEqual(aggregates['duration_ms']['p50'], 2000.0)
+        self.assertEqual(aggregates['launches_per_second'], 50.0)
+        self.assertEqual(aggregates['bytes_downloaded'], 10000)
+
+
+def throttled():
+    return ClientError(
+        {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'slow down'},
+         'ResponseMetadata': {'HTTPStatusCode': 400}},
+        'Scan'
+    )
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestResilience(SimpleTestCase):
+
+    def setUp(self):
+        for cleanup in (resilience.response_cache.clear, resilience.dynamodb_breaker.reset):
+            cleanup()
+            self.addCleanup(cleanup)
+        patcher = patch.object(resilience.response_cache, 'refresh')
+        self.refresh = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_breaker_opens_fails_fast_and_closes_after_half_open_probe(self, mock_client_factory):
+        breaker = resilience.CircuitBreaker('test', failure_threshold=2, reset_seconds=10, half_open_calls=1)
+        with patch.object(resilience.time, 'monotonic', return_value=100.0):
+            breaker.record(throttled())
+            breaker.record(ValueError('not an availability error'))
+            breaker.record(throttled())
+            self.assertEqual(breaker.state, resilience.CLOSED)
+            breaker.record(throttled())
+            self.assertEqual(breaker.state, resilience.OPEN)
+            with self.assertRaises(resilience.CircuitOpenError):
+                breaker.before_call()
+        with patch.object(resilience.time, 'monotonic', return_value=111.0):
+            breaker.before_call()
+            self.assertEqual(breaker.state, resilience.HALF_OPEN)
+            # Solo una llamada de prueba a la vez
+            with self.assertRaises(resilience.CircuitOpenError):
+                breaker.before_call()
+            breaker.record()
+        self.assertEqual(breaker.state, resilience.CLOSED)
+
+    def test_serves_last_good_response_marked_stale_when_dynamodb_fails(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2030', 'status': 'upcoming'})}
+        fresh = APIClient().get('/api/upcoming/?limit=1')
+
+        client.scan.side_effect = throttled()
+        stale = APIClient().get('/api/upcoming/?limit=1')
+
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale['X-Cache'], 'STALE')
+        self.assertIn('110', stale['Warning'])
+        self.assertEqual(stale.json(), fresh.json())
+        self.refresh.assert_called_once()
+
+    def test_request_errors_are_not_masked_with_stale_copies(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2030', 'status': 'upcoming'})}
+        self.assertEqual(APIClient().get('/api/upcoming/?limit=1').status_code, 200)
+
+        # Fallo que no es de disponibilidad (validación): 500 tal cual, sin copia ni refresco
+        client.scan.side_effect = ClientError(
+            {'Error': {'Code': 'ValidationException', 'Message': 'bad'}, 'ResponseMetadata': {'HTTPStatusCode': 400}},
+            'Scan'
+        )
+        response = APIClient().get('/api/upcoming/?limit=1')
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn('X-Cache', response)
+
+        self.assertEqual(APIClient().get('/api/launches/?last_key={bad').status_code, 400)
+        self.assertEqual(APIClient().get('/api/upcoming/?limit=ten').status_code, 400)
+        self.refresh.assert_not_called()
+
+    def test_cache_keys_only_declared_params_and_skips_arbitrary_requests(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        launch = {'launch_id': 'a', 'launch_date': '2030', 'status': 'upcoming', 'mission_name': 'CRS'}
+        client.scan.return_value = {'Items': wire(launch)}
+        client.batch_get_item.return_value = {'Responses': {'spacex-launches': wire(launch)}}
+        client.query.return_value = {'Items': []}
+
+        with patch.object(services, 'launch_key_map', LaunchKeyMap()):
+            for noise in range(3):
+                APIClient().get(f'/api/upcoming/?limit=1&utm={noise}')
+            APIClient().get('/api/launches/batch/?ids=a,b')
+            APIClient().get('/api/search/?q=crs')
+
+        self.assertEqual(len(resilience.response_cache), 1)
+
+        # Sin copias obsoletas ni revalidación configuradas no se guarda nada
+        resilience.response_cache.clear()
+        with patch.object(resilience, 'STALE_SERVING', False):
+            get = resilience.stale_on_error(lambda view, request: Response({'ok': True}))
+        self.assertEqual(get(object(), APIRequestFactory().get('/api/statistics/')).status_code, 200)
+        self.assertEqual(len(resilience.response_cache), 0)
+
+    def test_response_cache_is_bounded_by_bytes(self, mock_client_factory):
+        cache = resilience.ResponseCache(max_entries=100, max_bytes=800)
+        for key in range(10):
+            cache.put(key, {'items': 'x' * 80})
+        # Más de max_bytes / 8: no se guarda
+        cache.put('big', {'items': 'x' * 200})
+
+        self.assertLessEqual(cache.size_bytes, 800)
+        self.assertIsNone(cache.get('big'))
+        self.assertIsNone(cache.get(0))
+        self.assertIsNotNone(cache.get(9))
+
+    def test_open_circuit_without_copy_returns_503_without_calling_dynamodb(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.side_effect = throttled()
+        for _ in range(resilience.BREAKER_FAILURE_THRESHOLD):
+            APIClient().get('/api/statistics/')
+        client.scan.reset_mock()
+
+        response = APIClient().get('/api/search/?q=crs')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        client.scan.assert_not_called()
+        self.assertIn('circuit_breaker_state{circuit="dynamodb"} 2.0', self.client.get('/metrics').content.decode())
+
+
+class TestAdmission(SimpleTestCase):
+
+    def test_token_bucket_rejects_with_retry_after(self):
+        with patch.object(admission.time, 'monotonic', return_value=100.0):
+            controller = admission.AdmissionController({'SearchLaunchesView': (4, 0.5, 2)})
+            for _ in range(2):
+                self.assertIsNone(controller.admit('SearchLaunchesView'))
+                controller.release('SearchLaunchesView', 0.1)
+            rejected = controller.admit('SearchLaunchesView')
+        self.assertEqual((rejected.status, rejected.reason, rejected.retry_after), (429, 'rate_limited', 2))
+
+    def test_shared_budget_queues_then_sheds(self):
+        controller = admission.AdmissionController(
+            {'SearchLaunchesView': (2, 100, 100), 'LaunchStatisticsView': (2, 100, 100)},
+            budget=2, queue_depth=1, queue_timeout=5
+        )
+        controller.admit('SearchLaunchesView')
+        controller.admit('SearchLaunchesView')
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(controller.admit('LaunchStatisticsView')))
+        waiter.start()
+        while not controller._waiting['LaunchStatisticsView']:
+            time.sleep(0.001)
+
+        # El presupuesto común está lleno y la cola de la vista también
+        rejected = controller.admit('LaunchStatisticsView')
+        self.assertEqual((rejected.status, rejected.reason), (503, 'queue_full'))
+        self.assertGreaterEqual(rejected.retry_after, 1)
+
+        controller.release('SearchLaunchesView', 0.2)
+        waiter.join(1)
+        self.assertEqual(results, [None])
+
+    def test_cheap_requests_keep_a_thread_while_expensive_queue_is_full(self):
+        threads = 4
+        controller = admission.AdmissionController(
+            {'SearchLaunchesView': (2, 100, 100), 'LaunchStatisticsView': (2, 100, 100)},
+            budget=2, queue_depth=threads - 2 - 1, queue_timeout=5
+        )
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+
+        def expensive(view):
+            rejected = controller.admit(view)
+            if rejected:
+                return rejected.status
+            gate.wait(5)
+            controller.release(view, 0.1)
+            return 200
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            # Dos en curso, uno en cola (de cualquier vista) y el resto rechazados al momento
+            views = ['SearchLaunchesView', 'SearchLaunchesView', 'LaunchStatisticsView'] + ['SearchLaunchesView'] * 3
+            futures = [pool.submit(expensive, view) for view in views]
+            cheap = pool.submit(lambda: 'ok')
+            self.assertEqual(cheap.result(timeout=1), 'ok')
+            gate.set()
+            statuses = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(sorted(statuses), [200, 200, 200, 503, 503, 503])
+
+    def test_uvicorn_limits_come_from_the_offload_pool(self):
+        config = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        environ = {'GUNICORN_WORKER_CLASS': 'uvicorn', 'WEB_CONCURRENCY': '1', 'ASYNC_API': 'True',
+                   'PROMETHEUS_MULTIPROC_DIR': directory.name}
+        with patch.dict(os.environ, environ):
+            os.environ.pop('WORKER_THREADS', None)
+            runpy.run_path(config)
+            # gunicorn no exporta su único hilo como si fuera el límite del worker
+            self.assertNotIn('WORKER_THREADS', os.environ)
+            threads, reserved, budget, queue_depth = admission.thread_limits()
+
+        # 16 hilos de DynamoDB, uno reservado; las esperas son corrutinas y no los ocupan
+        self.assertEqual((threads, reserved, budget, queue_depth), (16, 1, 2, 15))
+        self.assertEqual(admission.thread_limits({'WORKER_THREADS': '4'}), (4, 1, 2, 1))
+
+    @patch('launches.services.dynamodb_connections.client')
+    def test_middleware_sheds_expensive_views_only(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': []}
+        controller = admission.AdmissionController({'SearchLaunchesView': (1, 0.01, 1)})
+
+        with patch.object(admission, 'admission', controller):
+            self.assertEqual(APIClient().get('/api/search/?q=crs').status_code, 200)
+            shed = APIClient().get('/api/search/?q=crs')
+            self.assertEqual(APIClient().get('/health/').status_code, 200)
+
+        self.assertEqual(shed.status_code, 429)
+        self.assertGreaterEqual(int(shed['Retry-After']), 1)
+        self.assertIn(
+            'admission_rejected_total{reason="rate_limited",view="SearchLaunchesView"}',
+            self.client.get('/metrics').content.decode()
+        )
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestDashboard(SimpleTestCase):
+
+    def setUp(self):
+        resilience.response_cache.clear()
+        self.addCleanup(resilience.response_cache.clear)
+        patcher = patch.object(services, 'launch_key_map', LaunchKeyMap())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_returns_all_sections_in_one_response(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        items = wire(
+            {'launch_id': 'a', 'launch_date': '2020', 'status': 'success', 'rocket_name': 'Falcon 9'},
+            {'launch_id': 'b', 'launch_date': '2021', 'status': 'failed', 'rocket_name': 'Falcon 9'},
+            {'launch_id': 'c', 'launch_date': '2030', 'status': 'upcoming', 'rocket_name': 'Falcon Heavy'},
+            {'launch_id': 'd', 'launch_date': '2031', 'status': 'upcoming', 'rocket_name': 'Falcon 9'},
+        )
+
+        def scan(**params):
+            # Una respuesta nueva por llamada: scan_page decodifica los items en su sitio
+            status_filter = params.get('ExpressionAttributeValues', {}).get(':status')
+            return {'Items': [item for item in items if status_filter in (None, item['status'])]}
+        client.scan.side_effect = scan
+
+        def batch_get_item(RequestItems, **kwargs):
+            requested = {key['launch_id']['S'] for key in RequestItems['spacex-launches']['Keys']}
+            return {'Responses': {'spacex-launches': [item for item in items if item['launch_id']['S'] in requested]}}
+        client.batch_get_item.side_effect = batch_get_item
+
+        response = APIClient().get('/api/dashboard/?recent=2&upcoming=1')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['partial'])
+        self.assertEqual(data['statistics']['total_launches'], 4)
+        self.assertNotIn('rocket_breakdown', data['statistics'])
+        self.assertEqual(data['rockets'][0], {
+            'rocket': 'Falcon 9', 'total': 3, 'successful': 1, 'failed': 1, 'upcoming': 1, 'success_rate': 50.0
+        })
+        self.assertIsNone(data['rockets'][1]['success_rate'])
+        # Recientes: ya ocurridos, por fecha del mapa de claves; próximos: el más cercano
+        self.assertEqual([launch['launch_id'] for launch in data['recent']], ['b', 'a'])
+        self.assertEqual([launch['launch_id'] for launch in data['upcoming']], ['c'])
+        # Las lecturas de los hilos del pool cuentan en la petición (estadísticas,
+        # carga del mapa de claves, BatchGetItem de recientes y scan de próximos)
+        self.assertIn('calls=4', response['Server-Timing'])
+
+    def test_upcoming_uses_status_index_when_available(self, mock_client_factory):
+        service, client = make_service(mock_client_factory)
+        client.query.return_value = {'Items': wire({'launch_id': 'c', 'launch_date': '2030', 'status': 'upcoming'})}
+
+        with patch.object(services, 'FILTER_USE_INDEXES', True):
+            launches = service.get_upcoming_launches(limit=5)
+
+        self.assertEqual([launch['launch_id'] for launch in launches], ['c'])
+        params = client.query.call_args.kwargs
+        self.assertEqual((params['IndexName'], params['Limit']), ('status-date-index', 5))
+        self.assertNotIn('ScanIndexForward', params)
+        client.scan.assert_not_called()
+
+    def test_slow_or_failing_sections_give_partial_results(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.return_value = {'Items': wire({'launch_id': 'a', 'launch_date': '2020', 'status': 'success'})}
+        client.batch_get_item.return_value = {'Responses': {'spacex-launches': client.scan.return_value['Items']}}
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        with patch.object(services, 'DASHBOARD_SECTION_TIMEOUT_SECONDS', 0.05), \
+                patch.object(DynamoDBService, 'get_launch_statistics', side_effect=lambda: release.wait(5)), \
+                patch.object(DynamoDBService, 'get_upcoming_launches', side_effect=throttled()):
+            service = DynamoDBService()
+            sections, errors = service.get_dashboard(timeout=0.05)
+
+        self.assertEqual(list(sections), ['recent'])
+        self.assertEqual(set(errors), {'statistics', 'upcoming'})
+        self.assertIn('Timed out', errors['statistics'])
+
+    def test_sections_still_running_are_shared_not_resubmitted(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.scan.side_effect = lambda **params: {'Items': []}
+        release = threading.Event()
+        self.addCleanup(release.set)
+        slow_statistics = MagicMock(side_effect=lambda: release.wait(5) and {'total_launches': 0})
+
+        with patch.object(DynamoDBService, 'get_launch_statistics', slow_statistics):
+            service = DynamoDBService()
+            for _ in range(3):
+                _, errors = service.get_dashboard(timeout=0.02)
+                self.assertIn('statistics', errors)
+            pending = services._inflight_sections[(service.table_name, 'statistics')]
+            release.set()
+            # Cuando termina, la siguiente petición ya no la tiene en curso y carga de nuevo
+            pending.result(timeout=1)
+            sections, errors = service.get_dashboard(timeout=1)
+
+        self.assertEqual(sections['statistics'], {'total_launches': 0})
+        self.assertEqual(slow_statistics.call_count, 2)
+
+
+@patch('launches.services.dynamodb_connections.client')
+class TestFilterPlanner(SimpleTestCase):
+
+    def setUp(self):
+        resilience.response_cache.clear()
+        self.addCleanup(resilience.response_cache.clear)
+        self.stats = services.PredicateStats()
+        self.stats.observe(
+            [{'status': 'success', 'rocket_name': 'Falcon 9'}] * 90
+            + [{'status': 'upcoming', 'rocket_name': 'Falcon 9'}] * 5
+            + [{'status': 'failed', 'rocket_name': 'Falcon 1'}] * 5
+        )
+        self.key_map = LaunchKeyMap()
+        for patcher in (patch.object(services, 'predicate_stats', self.stats),
+                        patch.object(services, 'launch_key_map', self.key_map),
+                        patch.object(services, 'FILTER_USE_INDEXES', True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_picks_most_selective_access_path(self, mock_client_factory):
+        plan = services.plan_query(services.LaunchQuery(status='upcoming', rocket='Falcon 9'))
+        self.assertEqual((plan.access, plan.index_name, plan.estimate), ('index', 'status-date-index', 5))
+
+        plan = services.plan_query(services.LaunchQuery(status='success', rocket='Falcon 1'))
+        self.assertEqual(plan.index_name, 'rocket-date-index')
+
+        # Rango de fechas estrecho con el mapa de claves cargado: recuento exacto
+        self.key_map._keys = {f'id{year}': f'{year}-06-01T00:00:00.000Z' for year in range(2006, 2026)}
+        self.key_map._loaded_at = time.monotonic()
+        plan = services.plan_query(services.LaunchQuery(status='success', date_from='2020-01-01', date_to='2020-12-31'))
+        self.assertEqual((plan.access, plan.estimate), ('key_map', 1))
+
+        plan = services.plan_query(services.LaunchQuery(launchpad='KSC LC 39A'))
+        self.assertEqual(plan.access, 'scan')
+
+        # Sin los índices desplegados nunca se elige un GSI
+        with patch.object(services, 'FILTER_USE_INDEXES', False):
+            self.assertEqual(services.plan_query(services.LaunchQuery(status='upcoming')).access, 'scan')
+
+    def load_daily_keys(self, count):
+        """Mapa de claves cargado con un lanzamiento al día desde el 1 de enero de 2000"""
+        self.key_map._keys = {
+            f'id{day}': f'{date(2000, 1, 1) + timedelta(days=day)}T00:00:00.000Z' for day in range(count)
+        }
+        self.key_map._loaded_at = time.monotonic()
+
+    def test_key_map_only_for_selective_ranges(self, mock_client_factory):
+        self.stats.observe([])
+        self.load_daily_keys(1000)
+
+        # Toda la tabla: BatchGetItem cobra 0.5 RCU por item, más que el scan
+        plan = services.plan_query(services.LaunchQuery(date_from='2000-01-01', text='nomatch'))
+        self.assertEqual((plan.access, plan.estimate), ('scan', 1000))
+
+        plan = services.plan_query(services.LaunchQuery(date_from='2002-05-01', text='nomatch'))
+        self.assertEqual((plan.access, plan.estimate), ('key_map', 149))
+
+        # Sin muestra de estadísticas el índice no pierde contra el mapa de claves
+        plan = services.plan_query(services.LaunchQuery(status='success', date_from='2002-05-01'))
+        self.assertEqual((plan.access, plan.index_name), ('index', 'status-date-index'))
+
+    def test_key_map_path_is_capped_and_reports_truncation(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        self.stats.observe([])
+        self.load_daily_keys(1000)
+        client.batch_get_item.side_effect = lambda RequestItems, **kwargs: {'Responses': {'spacex-launches': wire(*(
+            {'launch_id': key['launch_id']['S'], 'launch_date': key['launch_date']['S'], 'mission_name': 'Demo'}
+            for key in RequestItems['spacex-launches']['Keys']
+        ))}}
+
+        with patch.object(services, 'FILTER_MAX_PAGES', 1):
+            data = APIClient().get('/api/filter/?from=2002-05-01&q=nomatch').json()
+
+        self.assertEqual(data['plan']['access'], 'key_map')
+        self.assertEqual((data['plan']['pages'], data['plan']['scanned']), (1, 100))
+        self.assertTrue(data['plan']['truncated'])
+        self.assertEqual(data['count'], 0)
+        self.assertEqual(client.batch_get_item.call_count, 1)
+
+    def test_combined_predicates_page_through_index_until_limit(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        launch = {'status': 'upcoming', 'rocket_name': 'Falcon 9', 'payload_types': ['Satellite']}
+        client.query.side_effect = [
+            {'Items': wire({**launch, 'launch_id': 'a', 'launch_date': '2031', 'mission_name': 'Starlink 1'},
+                           {**launch, 'launch_id': 'b', 'launch_date': '2030', 'mission_name': 'CRS-30'}),
+             'ScannedCount': 10, 'LastEvaluatedKey': {'launch_id': {'S': 'b'}}},
+            {'Items': wire({**launch, 'launch_id': 'c', 'launch_date': '2029', 'mission_name': 'crs-29'}),
+             'ScannedCount': 10},
+        ]
+
+        response = APIClient().get(
+            '/api/filter/?status=upcoming&rocket=Falcon%209&payload_type=Satellite&q=CRS&from=2029-01-01&limit=2'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([item['launch_id'] for item in data['items']], ['b', 'c'])
+        self.assertEqual(data['plan']['index'], 'status-date-index')
+        self.assertEqual((data['plan']['pages'], data['plan']['scanned']), (2, 20))
+        self.assertFalse(data['plan']['truncated'])
+        params = client.query.call_args_list[0].kwargs
+        self.assertEqual(params['KeyConditionExpression'], '#key = :key AND #launch_date >= :date_from')
+        self.assertEqual(
+            params['FilterExpression'], '#rocket_name = :rocket_name AND contains(#payload_types, :payload_type)'
+        )
+        self.assertEqual(client.query.call_args_list[1].kwargs['ExclusiveStartKey'], {'launch_id': {'S': 'b'}})
+        client.scan.assert_not_called()
+
+    def test_page_cap_marks_plan_as_truncated(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        page = {'Items': wire({'launch_id': 'a', 'launch_date': '2020', 'status': 'success',
+                               'launchpad': 'KSC LC 39A', 'mission_name': 'Demo', 'last_updated': 'now'}),
+                'ScannedCount': 100, 'LastEvaluatedKey': {'launch_id': {'S': 'a'}}}
+        client.query.side_effect = lambda **kwargs: dict(page)
+        client.scan.side_effect = lambda **kwargs: dict(page)
+
+        with patch.object(services, 'FILTER_MAX_PAGES', 2):
+            indexed = APIClient().get('/api/filter/?status=success&limit=5').json()
+            scanned = APIClient().get('/api/filter/?launchpad=KSC%20LC%2039A&limit=1').json()
+
+        # Query al índice: quedaban páginas y no se llegó a `limit`
+        self.assertEqual((indexed['plan']['access'], indexed['plan']['pages']), ('index', 2))
+        self.assertTrue(indexed['plan']['truncated'])
+        # Scan: aunque haya `limit` resultados, las páginas sin leer pueden tener otros más recientes
+        self.assertEqual((scanned['plan']['access'], scanned['count']), ('scan', 1))
+        self.assertTrue(scanned['plan']['truncated'])
+        # Mismos campos que por el GSI, que no proyecta last_updated
+        self.assertNotIn('last_updated', scanned['items'][0])
+
+    def test_requires_a_predicate_and_valid_dates(self, mock_client_factory):
+        make_service(mock_client_factory)
+        self.assertEqual(APIClient().get('/api/filter/').status_code, 400)
+        self.assertEqual(APIClient().get('/api/filter/?status=success&from=yesterday').status_code, 400)
+
+    def test_dates_are_normalized_before_querying(self, mock_client_factory):
+        _, client = make_service(mock_client_factory)
+        client.query.return_value = {'Items': [], 'ScannedCount': 0}
+
+        response = APIClient().get('/api/filter/?status=success&from=20200101&to=2020-W53-4')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['filters']['date_from'], response.json()['filters']['date_to']),
+                         ('2020-01-01', '2020-12-31'))
+        values = client.query.call_args.kwargs['ExpressionAttributeValues']
+        self.assertEqual(values[':date_from'], {'S': '2020-01-01'})
+        self.assertEqual(values[':date_to'], {'S': '2020-12-31T23:59:59.999Z'})
+
+
+class TestNegotiation(SimpleTestCase):
+
+    def test_api_profile_negotiation_keeps_swagger_formats(self):
+        from spacex_site import urls
+
+        # Con API_PROFILE=True es la clase por defecto de todas las vistas DRF
+        with patch.object(urls.schema_view, 'content_negotiation_class', negotiation.FirstRendererNegotiation):
+            spec = self.client.get('/swagger.json')
+            openapi_format = self.client.get('/swagger/?format=openapi')
+            ui = self.client.get('/swagger/')
+
+        self.assertEqual(spec.status_code, 200)
+        self.assertTrue(spec['Content-Type'].startswith('application/json'))
+        self.assertIn('paths', spec.json())
+        self.assertTrue(openapi_format['Content-Type'].startswith('application/openapi+json'))
+        self.assertTrue(ui['Content-Type'].startswith('text/html'))
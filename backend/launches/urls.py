@@ -1,11 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .async_views import offload
+from .profiling import profile_download_view, profile_list_view
+
+
+def as_view(view_class):
+    """Vista síncrona bajo WSGI; vista async con hilos acotados bajo ASGI"""
+    view = view_class.as_view()
+    return offload(view) if settings.ASYNC_API else view
+
 
 urlpatterns = [
-    path('launches/', views.LaunchListView.as_view(), name='launch-list'),
-    path('launches/<str:launch_id>/', views.LaunchDetailView.as_view(), name='launch-detail'),
-    path('statistics/', views.LaunchStatisticsView.as_view(), name='launch-statistics'),
-    path('filter/', views.LaunchFilterView.as_view(), name='launch-filter'),
-    path('upcoming/', views.UpcomingLaunchesView.as_view(), name='upcoming-launches'),
-    path('search/', views.SearchLaunchesView.as_view(), name='search-launches'),
+    path('launches/', as_view(views.LaunchListView), name='launch-list'),
+    path('launches/batch/', as_view(views.LaunchBatchView), name='launch-batch'),
+    path('launches/<str:launch_id>/', as_view(views.LaunchDetailView), name='launch-detail'),
+    path('statistics/', as_view(views.LaunchStatisticsView), name='launch-statistics'),
+    path('filter/', as_view(views.LaunchFilterView), name='launch-filter'),
+    path('upcoming/', as_view(views.UpcomingLaunchesView), name='upcoming-launches'),
+    path('search/', as_view(views.SearchLaunchesView), name='search-launches'),
+    path('dashboard/', as_view(views.DashboardView), name='dashboard'),
+    path('ingest-runs/', as_view(views.IngestRunsView), name='ingest-runs'),
+    path('profiles/', profile_list_view, name='profile-list'),
+    path('profiles/<str:name>', profile_download_view, name='profile-download'),
 ]
@@ -1,10 +1,33 @@
 import json
+from datetime import date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .services import DynamoDBService, DecimalEncoder
+from .resilience import stale_on_error
+from .services import FILTER_FIELDS, DynamoDBService, LaunchQuery, summarize_ingest_runs
+
+# Máximo de IDs aceptados por petición en el endpoint batch
+MAX_BATCH_IDS = 500
+# Máximo de ejecuciones del ingester por petición
+MAX_INGEST_RUNS = 100
+# Máximo de resultados de /api/filter/
+MAX_FILTER_RESULTS = 100
+# Máximo de lanzamientos recientes / próximos en el dashboard
+MAX_DASHBOARD_ITEMS = 50
+
+FIELDS_PARAMETER = openapi.Parameter(
+    'fields', 
+    openapi.IN_QUERY, 
+    description="Campos a devolver separados por comas (por defecto todos)", 
+    type=openapi.TYPE_STRING
+)
+
+def requested_fields(request):
+    """Proyección pedida con ?fields=; los campos comprimidos fuera de ella no se expanden"""
+    fields = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    return fields or None
 
 class LaunchListView(APIView):
     """
@@ -31,25 +54,28 @@ class LaunchListView(APIView):
         ],
         responses={200: 'Lista de lanzamientos'}
     )
+    @stale_on_error(params=('limit', 'last_key'))
     def get(self, request):
-        limit = min(int(request.GET.get('limit', 20)), 100)  # Máximo 100 items
-        last_key = request.GET.get('last_key')
-        
         try:
+            limit = min(int(request.GET.get('limit', 20)), 100)  # Máximo 100 items
+            last_key = request.GET.get('last_key')
             if last_key:
                 # Decodificar last_key desde string JSON
                 last_key = json.loads(last_key)
-            
+                if not isinstance(last_key, dict):
+                    raise ValueError('last_key must be a JSON object')
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer and last_key a JSON object'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
             result = self.db_service.get_all_launches(limit=limit, last_evaluated_key=last_key)
             
-            # Serializar items usando el encoder personalizado
-            serialized_items = []
-            for item in result['items']:
-                serialized_item = json.loads(json.dumps(item, default=DecimalEncoder.encode_decimal))
-                serialized_items.append(serialized_item)
-            
+            # Los items ya llegan con tipos nativos desde launch_codec
             response_data = {
-                'items': serialized_items,
+                'items': [launch.to_dict() for launch in result['items']],
                 'count': result['count'],
                 'scanned_count': result['scanned_count'],
                 'last_evaluated_key': result['last_evaluated_key']
@@ -71,11 +97,13 @@ class LaunchDetailView(APIView):
         self.db_service = DynamoDBService()
     
     @swagger_auto_schema(
+        manual_parameters=[FIELDS_PARAMETER],
         responses={
             200: 'Detalles del lanzamiento',
             404: 'Lanzamiento no encontrado'
         }
     )
+    @stale_on_error(params=('fields',))
     def get(self, request, launch_id):
         try:
             launch = self.db_service.get_launch_by_id(launch_id)
@@ -85,9 +113,7 @@ class LaunchDetailView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Serializar usando el encoder personalizado
-            serialized_launch = json.loads(json.dumps(launch, default=DecimalEncoder.encode_decimal))
-            return Response(serialized_launch)
+            return Response(launch.to_dict(requested_fields(request)))
             
         except Exception as e:
             return Response(
@@ -95,6 +121,78 @@ class LaunchDetailView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class LaunchBatchView(APIView):
+    """
+    Obtiene varios lanzamientos en una sola petición
+    """
+    def __init__(self):
+        self.db_service = DynamoDBService()
+    
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'ids', 
+                openapi.IN_QUERY, 
+                description=f"IDs de lanzamiento separados por comas (max {MAX_BATCH_IDS})", 
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            FIELDS_PARAMETER,
+        ],
+        responses={200: 'Lanzamientos solicitados', 400: 'Parámetros inválidos'}
+    )
+    @stale_on_error(cache=False)
+    def get(self, request):
+        ids = [launch_id.strip() for launch_id in request.GET.get('ids', '').split(',') if launch_id.strip()]
+        return self._get_batch(ids, requested_fields(request))
+    
+    @swagger_auto_schema(
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING))
+            },
+            required=['ids']
+        ),
+        responses={200: 'Lanzamientos solicitados', 400: 'Parámetros inválidos'}
+    )
+    def post(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(launch_id, str) for launch_id in ids):
+            return Response(
+                {'error': 'Body must be a JSON object with an "ids" list of strings'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self._get_batch(ids)
+    
+    def _get_batch(self, ids, fields=None):
+        if not ids:
+            return Response(
+                {'error': 'At least one launch ID is required'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > MAX_BATCH_IDS:
+            return Response(
+                {'error': f'A maximum of {MAX_BATCH_IDS} launch IDs is allowed per request'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            launches = self.db_service.get_launches_by_ids(ids)
+            
+            found_ids = {launch['launch_id'] for launch in launches}
+            return Response({
+                'items': [launch.to_dict(fields) for launch in launches],
+                'count': len(launches),
+                'missing': [launch_id for launch_id in dict.fromkeys(ids) if launch_id not in found_ids]
+            })
+            
+        except Exception as e:
+            return Response(
+                {'error': f'Error retrieving launches: {str(e)}'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class LaunchStatisticsView(APIView):
     """
     Obtiene estadísticas de lanzamientos
@@ -105,6 +203,7 @@ class LaunchStatisticsView(APIView):
     @swagger_auto_schema(
         responses={200: 'Estadísticas de lanzamientos'}
     )
+    @stale_on_error
     def get(self, request):
         try:
             stats = self.db_service.get_launch_statistics()
@@ -117,7 +216,7 @@ class LaunchStatisticsView(APIView):
 
 class LaunchFilterView(APIView):
     """
-    Filtra lanzamientos por estado o cohete
+    Filtra lanzamientos combinando estado, cohete, plataforma, rango de fechas, tipo de payload y texto
     """
     def __init__(self):
         self.db_service = DynamoDBService()
@@ -136,45 +235,86 @@ class LaunchFilterView(APIView):
                 description="Filtrar por nombre de cohete", 
                 type=openapi.TYPE_STRING
             ),
+            openapi.Parameter(
+                'launchpad', 
+                openapi.IN_QUERY, 
+                description="Filtrar por plataforma de lanzamiento", 
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'from', 
+                openapi.IN_QUERY, 
+                description="Fecha mínima de lanzamiento (YYYY-MM-DD, inclusive)", 
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'to', 
+                openapi.IN_QUERY, 
+                description="Fecha máxima de lanzamiento (YYYY-MM-DD, inclusive)", 
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'payload_type', 
+                openapi.IN_QUERY, 
+                description="Filtrar por tipo de payload (Satellite, Dragon 2.0, ...)", 
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'q', 
+                openapi.IN_QUERY, 
+                description="Texto en el nombre de la misión", 
+                type=openapi.TYPE_STRING
+            ),
             openapi.Parameter(
                 'limit', 
                 openapi.IN_QUERY, 
-                description="Límite de resultados", 
+                description=f"Límite de resultados (max {MAX_FILTER_RESULTS})", 
                 type=openapi.TYPE_INTEGER,
                 default=50
             ),
         ],
-        responses={200: 'Lanzamientos filtrados'}
+        responses={200: 'Lanzamientos filtrados y plan de la consulta'}
     )
+    @stale_on_error(cache=False)
     def get(self, request):
-        status_filter = request.GET.get('status')
-        rocket_filter = request.GET.get('rocket')
-        limit = int(request.GET.get('limit', 50))
+        try:
+            limit = min(int(request.GET.get('limit', 50)), MAX_FILTER_RESULTS)
+            # fromisoformat también acepta 20200101 o 2020-W01-1: se normaliza a
+            # YYYY-MM-DD, que es lo que se compara con launch_date en DynamoDB
+            date_from, date_to = (
+                date.fromisoformat(value).isoformat() if value else None
+                for value in (request.GET.get('from'), request.GET.get('to'))
+            )
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer and from/to dates in YYYY-MM-DD format'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        query = LaunchQuery(
+            status=request.GET.get('status'),
+            rocket=request.GET.get('rocket'),
+            launchpad=request.GET.get('launchpad'),
+            date_from=date_from,
+            date_to=date_to,
+            payload_type=request.GET.get('payload_type'),
+            text=request.GET.get('q'),
+        )
+        filters = query.as_dict()
+        if not any(filters.values()):
+            return Response(
+                {'error': f'Must provide at least one filter parameter: {", ".join(filters)}'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
-            if status_filter:
-                launches = self.db_service.get_launches_by_status(status_filter, limit=limit)
-            elif rocket_filter:
-                launches = self.db_service.get_launches_by_rocket(rocket_filter, limit=limit)
-            else:
-                return Response(
-                    {'error': 'Must provide status or rocket filter parameter'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Serializar items
-            serialized_launches = []
-            for launch in launches:
-                serialized_launch = json.loads(json.dumps(launch, default=DecimalEncoder.encode_decimal))
-                serialized_launches.append(serialized_launch)
+            launches, plan = self.db_service.filter_launches(query, limit=limit)
             
             return Response({
-                'items': serialized_launches, 
-                'count': len(serialized_launches),
-                'filters': {
-                    'status': status_filter,
-                    'rocket': rocket_filter
-                }
+                'items': [launch.to_dict(FILTER_FIELDS) for launch in launches], 
+                'count': len(launches),
+                'filters': filters,
+                'plan': plan
             })
             
         except Exception as e:
@@ -202,21 +342,19 @@ class UpcomingLaunchesView(APIView):
         ],
         responses={200: 'Próximos lanzamientos'}
     )
+    @stale_on_error(params=('limit',))
     def get(self, request):
-        limit = int(request.GET.get('limit', 10))
+        try:
+            limit = int(request.GET.get('limit', 10))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             launches = self.db_service.get_upcoming_launches(limit=limit)
             
-            # Serializar items
-            serialized_launches = []
-            for launch in launches:
-                serialized_launch = json.loads(json.dumps(launch, default=DecimalEncoder.encode_decimal))
-                serialized_launches.append(serialized_launch)
-            
             return Response({
-                'items': serialized_launches,
-                'count': len(serialized_launches)
+                'items': [launch.to_dict() for launch in launches],
+                'count': len(launches)
             })
             
         except Exception as e:
@@ -251,9 +389,13 @@ class SearchLaunchesView(APIView):
         ],
         responses={200: 'Resultados de búsqueda'}
     )
+    @stale_on_error(cache=False)
     def get(self, request):
         query = request.GET.get('q')
-        limit = int(request.GET.get('limit', 20))
+        try:
+            limit = int(request.GET.get('limit', 20))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         
         if not query:
             return Response(
@@ -264,15 +406,9 @@ class SearchLaunchesView(APIView):
         try:
             launches = self.db_service.search_launches(query, limit=limit)
             
-            # Serializar items
-            serialized_launches = []
-            for launch in launches:
-                serialized_launch = json.loads(json.dumps(launch, default=DecimalEncoder.encode_decimal))
-                serialized_launches.append(serialized_launch)
-            
             return Response({
-                'items': serialized_launches,
-                'count': len(serialized_launches),
+                'items': [launch.to_dict() for launch in launches],
+                'count': len(launches),
                 'query': query
             })
             
@@ -281,3 +417,103 @@ class SearchLaunchesView(APIView):
                 {'error': f'Error searching launches: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+class IngestRunsView(APIView):
+    """
+    Últimas ejecuciones del ingester con sus agregados
+    """
+    def __init__(self):
+        self.db_service = DynamoDBService()
+    
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'limit', 
+                openapi.IN_QUERY, 
+                description=f"Número de ejecuciones (max {MAX_INGEST_RUNS})", 
+                type=openapi.TYPE_INTEGER,
+                default=20
+            ),
+        ],
+        responses={200: 'Ejecuciones del ingester y agregados'}
+    )
+    @stale_on_error(params=('limit',))
+    def get(self, request):
+        try:
+            limit = min(int(request.GET.get('limit', 20)), MAX_INGEST_RUNS)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            runs = self.db_service.get_ingest_runs(limit)
+            return Response({
+                'runs': runs,
+                'aggregates': summarize_ingest_runs(runs)
+            })
+        except Exception as e:
+            return Response(
+                {'error': f'Error retrieving ingest runs: {str(e)}'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+class DashboardView(APIView):
+    """
+    Estadísticas, lanzamientos recientes, próximos y desglose por cohete en una sola respuesta
+    """
+    def __init__(self):
+        self.db_service = DynamoDBService()
+    
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'recent', 
+                openapi.IN_QUERY, 
+                description=f"Lanzamientos recientes (max {MAX_DASHBOARD_ITEMS})", 
+                type=openapi.TYPE_INTEGER,
+                default=10
+            ),
+            openapi.Parameter(
+                'upcoming', 
+                openapi.IN_QUERY, 
+                description=f"Próximos lanzamientos (max {MAX_DASHBOARD_ITEMS})", 
+                type=openapi.TYPE_INTEGER,
+                default=10
+            ),
+        ],
+        responses={200: 'Secciones del dashboard; partial=true si alguna falló o no llegó a tiempo'}
+    )
+    @stale_on_error(params=('recent', 'upcoming'))
+    def get(self, request):
+        try:
+            recent_limit = min(int(request.GET.get('recent', 10)), MAX_DASHBOARD_ITEMS)
+            upcoming_limit = min(int(request.GET.get('upcoming', 10)), MAX_DASHBOARD_ITEMS)
+        except ValueError:
+            return Response({'error': 'recent and upcoming must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        sections, errors = self.db_service.get_dashboard(recent_limit, upcoming_limit)
+        if not sections:
+            return Response(
+                {'error': 'Error retrieving dashboard', 'errors': errors}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        statistics = sections.get('statistics')
+        if statistics is not None:
+            statistics = dict(statistics)
+            rockets = statistics.pop('rocket_breakdown')
+        else:
+            rockets = None
+        
+        def launches(name):
+            if name not in sections:
+                return None
+            return [launch.to_dict() for launch in sections[name]]
+        
+        return Response({
+            'statistics': statistics,
+            'rockets': rockets,
+            'recent': launches('recent'),
+            'upcoming': launches('upcoming'),
+            'partial': bool(errors),
+            'errors': errors,
+        })
@@ -0,0 +1,5 @@
+"""
+Pruebas de carga del backend contra DynamoDB Local (o cualquier endpoint
+compatible): siembra de datos sintéticos, arranque bajo gunicorn y
+ejecución de una mezcla configurable de peticiones sobre la API.
+"""
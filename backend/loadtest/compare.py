@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""
+Compara dos resultados de loadtest.run (por ejemplo, dos commits).
+
+    cd backend && python -m loadtest.compare loadtest/results/abc1234.json loadtest/results/def5678.json
+"""
+import argparse
+import json
+
+
+def delta(before, after):
+    if before in (None, 0) or after is None:
+        return '-'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before['revision']} -> {after['revision']}")
+    print(f"{'endpoint':<11} {'req/s':>16} {'p50 ms':>16} {'p99 ms':>16} {'RCU/req':>16}")
+    for kind, result in after['endpoints'].items():
+        previous = before['endpoints'].get(kind)
+        if previous is None:
+            continue
+        cells = [
+            f"{result[name]} ({delta(previous[name], result[name])})"
+            for name in ('rps', 'p50_ms', 'p99_ms', 'rcu_per_request')
+        ]
+        print(f"{kind:<11} " + ' '.join(f'{cell:>16}' for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
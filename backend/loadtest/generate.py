@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Generador determinista de lanzamientos con el esquema v4 de la API de SpaceX
+(con rocket, launchpad y payloads poblados, como los consume
+transform_launch_data) y de los items ya transformados por la Lambda.
+
+Las distribuciones imitan el histórico real: mayoría de Falcon 9, tasa de
+éxito por cohete, lanzamientos futuros a partir de REFERENCE_DATE, de uno a
+varios payloads y longitudes de `details` log-normales (con huecos nulos).
+La misma semilla produce siempre los mismos datos.
+
+    cd backend && python -m loadtest.generate --items 1000 --raw raw.jsonl --transformed items.jsonl
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fecha que separa lanzamientos pasados y futuros (fija para que sea reproducible)
+REFERENCE_DATE = 1735689600  # 2025-01-01T00:00:00Z
+FIRST_LAUNCH = 1143239400    # 2006-03-24, primer Falcon 1
+LAST_LAUNCH = 1893456000     # 2030-01-01
+LAST_UPDATED = '2025-01-01T00:00:00+00:00'
+
+# (id, nombre, peso, tasa de éxito)
+ROCKETS = (
+    ('5e9d0d95eda69955f709d1eb', 'Falcon 1', 0.02, 0.40),
+    ('5e9d0d95eda69973a809d1ec', 'Falcon 9', 0.90, 0.99),
+    ('5e9d0d95eda69974db09d1ed', 'Falcon Heavy', 0.03, 0.95),
+    ('5e9d0d96eda699382d09d1ee', 'Starship', 0.05, 0.60),
+)
+LAUNCHPADS = (
+    ('5e9e4501f5090910d4566f83', 'VAFB SLC 3W', 'Vandenberg Space Force Base Space Launch Complex 3W', 0.01),
+    ('5e9e4501f509094ba4566f84', 'CCSFS SLC 40', 'Cape Canaveral Space Force Station Space Launch Complex 40', 0.50),
+    ('5e9e4502f5090927f8566f85', 'STLS', 'SpaceX South Texas Launch Site', 0.05),
+    ('5e9e4502f5090995de566f86', 'Kwajalein Atoll', 'Kwajalein Atoll Omelek Island', 0.02),
+    ('5e9e4502f509092b78566f87', 'VAFB SLC 4E', 'Vandenberg Space Force Base Space Launch Complex 4E', 0.17),
+    ('5e9e4502f509094188566f88', 'KSC LC 39A', 'Kennedy Space Center Historic Launch Complex 39A', 0.25),
+)
+PAYLOAD_TYPES = (('Satellite', 0.85), ('Dragon 1.1', 0.05), ('Crew Dragon', 0.04), ('Dragon 2.0', 0.04), ('Lander', 0.02))
+MISSION_PREFIXES = (('Starlink', 0.55), ('CRS', 0.06), ('Crew', 0.04), ('Transporter', 0.03), ('GPS III', 0.03),
+                    ('SES', 0.05), ('Iridium NEXT', 0.04), ('NROL', 0.03), ('Bandwagon', 0.02), ('Demo', 0.15))
+STATUSES = ('success', 'failed', 'upcoming', 'unknown')
+
+_ROCKET_WEIGHTS = [rocket[2] for rocket in ROCKETS]
+_LAUNCHPAD_WEIGHTS = [launchpad[3] for launchpad in LAUNCHPADS]
+
+SENTENCES = (
+    'The booster landed on the droneship Of Course I Still Love You.',
+    'The second stage deployed the payload into a low Earth orbit.',
+    'Static fire was completed ahead of the launch window.',
+    'The fairing halves were recovered by the support vessel.',
+    'This mission was the first to reuse a flight-proven first stage.',
+    'The launch was scrubbed once because of upper-level winds.',
+    'Telemetry confirmed nominal performance through stage separation.',
+    'The payload will raise its orbit using onboard electric propulsion.',
+)
+
+
+def launch_id(n, seed):
+    """ID de 24 hex del lanzamiento n; se recalcula sin generar el dataset"""
+    return hashlib.sha1(f'{seed}:{n}'.encode()).hexdigest()[:24]
+
+
+def _details(rng):
+    if rng.random() < 0.2:
+        return None
+    # Mediana ~250 caracteres, cola hasta varios KB
+    length = min(int(math.exp(rng.gauss(5.5, 0.9))), 8000)
+    text = []
+    while sum(len(sentence) + 1 for sentence in text) < length:
+        text.append(rng.choice(SENTENCES))
+    return ' '.join(text)
+
+
+def raw_launch(n, count, seed):
+    """Lanzamiento n de `count` con el esquema v4 poblado"""
+    rng = random.Random(f'{seed}:{n}')
+    date_unix = FIRST_LAUNCH + (LAST_LAUNCH - FIRST_LAUNCH) * n // max(count, 1) + rng.randint(0, 3600)
+    rocket_id, rocket_name, _, success_rate = rng.choices(ROCKETS, weights=_ROCKET_WEIGHTS)[0]
+    pad_id, pad_name, pad_full_name, _ = rng.choices(LAUNCHPADS, weights=_LAUNCHPAD_WEIGHTS)[0]
+    prefix = rng.choices([name for name, _ in MISSION_PREFIXES], weights=[weight for _, weight in MISSION_PREFIXES])[0]
+    upcoming = date_unix > REFERENCE_DATE
+    success = None if upcoming else (rng.random() < success_rate if rng.random() > 0.01 else None)
+    payload_count = 1 if rng.random() < 0.85 else rng.randint(2, 6)
+    identifier = launch_id(n, seed)
+
+    payloads = []
+    for index in range(payload_count):
+        payload_type = rng.choices([name for name, _ in PAYLOAD_TYPES], weights=[weight for _, weight in PAYLOAD_TYPES])[0]
+        payloads.append({
+            'id': hashlib.sha1(f'{identifier}:payload:{index}'.encode()).hexdigest()[:24],
+            'name': f'{prefix} {n}' + (f'-{index + 1}' if payload_count > 1 else ''),
+            'type': payload_type,
+            'reused': rng.random() < 0.1,
+            'customers': ['SpaceX'] if prefix == 'Starlink' else [f'Customer {rng.randint(1, 200)}'],
+            'orbit': rng.choice(('LEO', 'VLEO', 'SSO', 'GTO', 'ISS', 'PO', 'MEO')),
+            'mass_kg': round(rng.uniform(50, 16000), 1),
+        })
+
+    return {
+        'id': identifier,
+        'flight_number': n + 1,
+        'name': f'{prefix} {n}',
+        'date_utc': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(date_unix)),
+        'date_unix': date_unix,
+        'date_local': time.strftime('%Y-%m-%dT%H:%M:%S-04:00', time.gmtime(date_unix - 4 * 3600)),
+        'date_precision': 'hour' if not upcoming else rng.choice(('hour', 'day', 'month')),
+        'static_fire_date_utc': None,
+        'window': rng.choice((0, 0, 60, 3600)),
+        'upcoming': upcoming,
+        'success': success,
+        'failures': [] if success is not False else [{'time': rng.randint(1, 600), 'altitude': None, 'reason': 'engine failure'}],
+        'details': _details(rng),
+        'rocket': {'id': rocket_id, 'name': rocket_name},
+        'launchpad': {'id': pad_id, 'name': pad_name, 'full_name': pad_full_name},
+        'payloads': payloads,
+        'crew': [],
+        'ships': [],
+        'capsules': [],
+        'cores': [{'core': None, 'flight': rng.randint(1, 20), 'reused': rng.random() < 0.6, 'landing_success': success}],
+        'fairings': {'reused': rng.random() < 0.5, 'recovery_attempt': rng.random() < 0.7, 'recovered': None, 'ships': []},
+        'links': {
+            'patch': {
+                'small': f'https://images2.imgbox.com/{identifier[:2]}/{identifier[2:4]}/{identifier[4:12]}_o.png',
+                'large': f'https://images2.imgbox.com/{identifier[:2]}/{identifier[2:4]}/{identifier[12:20]}_o.png',
+            },
+            'reddit': {'campaign': None, 'launch': None, 'media': None, 'recovery': None},
+            'flickr': {'small': [], 'original': []},
+            'presskit': None,
+            'webcast': None if upcoming else f'https://youtu.be/{identifier[:11]}',
+            'youtube_id': None if upcoming else identifier[:11],
+            'article': None if upcoming or rng.random() < 0.3 else f'https://spaceflightnow.com/launch/{identifier}/',
+            'wikipedia': f'https://en.wikipedia.org/wiki/{prefix.replace(" ", "_")}',
+        },
+        'auto_update': True,
+        'tbd': False,
+        'net': False,
+    }
+
+
+def raw_launches(count, seed=42):
+    for n in range(count):
+        yield raw_launch(n, count, seed)
+
+
+def _transformer():
+    """transform_launch_data de la Lambda, para que los items sean exactamente los que escribe"""
+    lambda_dir = os.path.join(REPO_DIR, 'lambda')
+    if lambda_dir not in sys.path:
+        sys.path.append(lambda_dir)
+    os.environ.setdefault('TABLE_NAME', 'spacex-launches')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    from lambda_function import SpaceXDataProcessor
+    return SpaceXDataProcessor().transform_launch_data
+
+
+def launches(count, seed=42):
+    """Items transformados (Launch) listos para serialize_summary/serialize_detail"""
+    transform = _transformer()
+    for raw in raw_launches(count, seed):
+        launch = transform(raw)
+        launch['last_updated'] = LAST_UPDATED
+        yield launch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--raw', help='fichero JSON Lines con los lanzamientos v4')
+    parser.add_argument('--transformed', help='fichero JSON Lines con los items transformados')
+    args = parser.parse_args()
+
+    if args.raw:
+        with open(args.raw, 'w') as f:
+            for raw in raw_launches(args.items, args.seed):
+                f.write(json.dumps(raw) + '\n')
+    if args.transformed:
+        with open(args.transformed, 'w') as f:
+            for launch in launches(args.items, args.seed):
+                f.write(json.dumps(launch.to_dict()) + '\n')
+    if not (args.raw or args.transformed):
+        for launch in launches(args.items, args.seed):
+            print(json.dumps(launch.to_dict()))
+
+
+if __name__ == '__main__':
+    main()
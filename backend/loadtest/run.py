@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+"""
+Prueba de carga del backend: siembra DynamoDB Local con el dataset de
+loadtest.generate, arranca gunicorn con gunicorn.conf.py apuntando a ella y
+ejecuta una mezcla de peticiones sobre todos los endpoints de
+launches/urls.py. Informa por endpoint de req/s,
+p50/p95/p99, tasa de error y RCU por petición (de la cabecera Server-Timing)
+y guarda el resultado en loadtest/results/<git sha>.json.
+
+    docker run -p 8001:8000 amazon/dynamodb-local
+    cd backend && python -m loadtest.run --items 10000 --concurrency 32 --duration 30
+    cd backend && python -m loadtest.run --skip-seed --mix detail=70,batch=30
+    cd backend && python -m loadtest.compare loadtest/results/<sha-a>.json loadtest/results/<sha-b>.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from . import generate, seed as seeding
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'loadtest', 'results')
+
+DEFAULT_MIX = 'list=20,detail=25,batch=5,statistics=5,dashboard=5,filter=15,upcoming=10,search=15'
+SEARCH_TERMS = ('starlink', 'crs', 'crew', 'transporter', 'falcon heavy', 'nonexistent')
+RCU_PATTERN = re.compile(r'rcu=([\d.]+)')
+
+
+def request_path(kind, rng, ids):
+    """Ruta de una petición del tipo `kind` con parámetros aleatorios"""
+    if kind == 'list':
+        return '/api/launches/?limit=20'
+    if kind == 'detail':
+        return f'/api/launches/{rng.choice(ids)}/'
+    if kind == 'batch':
+        return '/api/launches/batch/?ids=' + ','.join(rng.sample(ids, min(20, len(ids))))
+    if kind == 'statistics':
+        return '/api/statistics/'
+    if kind == 'dashboard':
+        return '/api/dashboard/?recent=5&upcoming=5'
+    if kind == 'filter':
+        if rng.random() < 0.5:
+            return f'/api/filter/?status={rng.choice(generate.STATUSES)}&limit=50'
+        return '/api/filter/?' + urllib.parse.urlencode({'rocket': rng.choice(generate.ROCKETS)[1], 'limit': 50})
+    if kind == 'upcoming':
+        return '/api/upcoming/?limit=10'
+    if kind == 'search':
+        return '/api/search/?' + urllib.parse.urlencode({'q': rng.choice(SEARCH_TERMS), 'limit': 20})
+    raise ValueError(f'Unknown request kind: {kind}')
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        request_path(kind.strip(), random.Random(0), ['x'])  # valida el tipo
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, quantile):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(int(len(sorted_values) * quantile), len(sorted_values) - 1)], 2)
+
+
+def drive(host, port, mix, ids, concurrency, duration, seed, timeout=30):
+    """Mantiene `concurrency` clientes keep-alive durante `duration` segundos"""
+    samples = {kind: [] for kind in mix}
+    lock = threading.Lock()
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        local = {kind: [] for kind in kinds}
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            path = request_path(kind, rng, ids)
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                match = RCU_PATTERN.search(response.getheader('Server-Timing') or '')
+                rcu = float(match.group(1)) if match else None
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=timeout)
+                status, rcu = None, None
+            local[kind].append(((time.perf_counter() - start) * 1000, status, rcu))
+        connection.close()
+        with lock:
+            for kind, values in local.items():
+                samples[kind].extend(values)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return samples
+
+
+def summarize(samples, duration):
+    endpoints = {}
+    for kind, values in samples.items():
+        latencies = sorted(latency for latency, status, _ in values if status and status < 400)
+        errors = sum(1 for _, status, _ in values if not status or status >= 400)
+        rcus = [rcu for _, _, rcu in values if rcu is not None]
+        endpoints[kind] = {
+            'requests': len(values),
+            'rps': round(len(values) / duration, 1),
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+            'error_rate': round(errors / len(values), 4) if values else 0.0,
+            'rcu_per_request': round(sum(rcus) / len(rcus), 3) if rcus else None,
+        }
+    everything = [value for values in samples.values() for value in values]
+    total = summarize({'total': everything}, duration)['total'] if everything and len(samples) > 1 else None
+    if total:
+        endpoints['total'] = total
+    return endpoints
+
+
+def git_revision():
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=BACKEND_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return f'{sha}-dirty' if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def wait_until_healthy(base_url, timeout=60):
+    host, port = base_url
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=2)
+            connection.request('GET', '/health/')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError('gunicorn did not become healthy')
+
+
+def start_server(args):
+    env = dict(
+        os.environ,
+        TABLE_NAME=args.table_name,
+        DETAILS_TABLE_NAME=args.details_table_name,
+        DYNAMODB_ENDPOINT_URL=args.endpoint_url,
+        AWS_ACCESS_KEY_ID='local',
+        AWS_SECRET_ACCESS_KEY='local',
+        AWS_DEFAULT_REGION='us-east-1',
+        API_PROFILE='True',
+        DEBUG='False',
+        WARM_KEY_MAP='True',
+        ACCESS_LOG_LEVEL='WARNING',
+        GUNICORN_BIND=f'127.0.0.1:{args.port}',
+    )
+    server = subprocess.Popen(
+        ['gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_healthy(('127.0.0.1', args.port))
+    except RuntimeError:
+        server.terminate()
+        raise
+    return server
+
+
+def print_report(endpoints):
+    print(f"{'endpoint':<11} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'RCU/req':>8}")
+    for kind, result in endpoints.items():
+        cells = [result[name] if result[name] is not None else '-' for name in ('p50_ms', 'p95_ms', 'p99_ms')]
+        rcu = result['rcu_per_request'] if result['rcu_per_request'] is not None else '-'
+        print(f"{kind:<11} {result['requests']:>9} {result['rps']:>8} {cells[0]:>8} {cells[1]:>8} {cells[2]:>8} "
+              f"{result['error_rate'] * 100:>6.2f}% {rcu:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint-url', default='http://localhost:8001', help='DynamoDB Local')
+    parser.add_argument('--table-name', default='spacex-launches')
+    parser.add_argument('--details-table-name', default='spacex-launch-details')
+    parser.add_argument('--items', type=int, default=1000, help='lanzamientos sintéticos (hasta 1M)')
+    parser.add_argument('--skip-seed', action='store_true', help='reutiliza los datos ya sembrados con --items y --seed')
+    parser.add_argument('--seed-workers', type=int, default=8, help='hilos de BatchWriteItem al sembrar')
+    parser.add_argument('--url', help='backend ya arrancado (no se inicia gunicorn)')
+    parser.add_argument('--port', type=int, default=8020)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='pesos por tipo de petición')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--timeout', type=float, default=30.0, help='segundos por petición antes de contarla como error')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--label', help='sufijo del fichero de resultados')
+    args = parser.parse_args()
+
+    if args.items > 1_000_000:
+        parser.error('--items is limited to 1,000,000')
+    mix = parse_mix(args.mix)
+
+    if not args.skip_seed and not args.url:
+        client = seeding.local_client(args.endpoint_url, max_pool_connections=args.seed_workers)
+        seeding.create_tables(client, args.table_name, args.details_table_name, reset=True)
+        start = time.perf_counter()
+        seeding.seed(client, args.table_name, args.details_table_name,
+                     generate.launches(args.items, args.seed), workers=args.seed_workers)
+        print(f'Seeded {args.items} launches in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+    ids = [generate.launch_id(n, args.seed) for n in range(args.items)]
+
+    server = None
+    if args.url:
+        parsed = urllib.parse.urlsplit(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        server = start_server(args)
+        host, port = '127.0.0.1', args.port
+
+    try:
+        if args.warmup:
+            drive(host, port, mix, ids, args.concurrency, args.warmup, args.seed + 1, args.timeout)
+        samples = drive(host, port, mix, ids, args.concurrency, args.duration, args.seed, args.timeout)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    endpoints = summarize(samples, args.duration)
+    print_report(endpoints)
+
+    revision = git_revision()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{revision}{'-' + args.label if args.label else ''}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'config': {
+                'items': args.items, 'mix': mix, 'concurrency': args.concurrency, 'duration': args.duration,
+                'server': args.url or {k: v for k, v in os.environ.items() if k.startswith('GUNICORN_') or k == 'WEB_CONCURRENCY'},
+            },
+            'endpoints': endpoints,
+        }, f, indent=2)
+    print(f'Results saved to {path}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Crea las tablas de resumen y detalle en DynamoDB Local y las siembra con el
+dataset determinista de loadtest.generate, escrito con el mismo codec que usa
+la Lambda. La escritura usa BatchWriteItem desde varios hilos en paralelo.
+
+    docker run -p 8001:8000 amazon/dynamodb-local
+    cd backend && python -m loadtest.seed --items 100000 --workers 16
+"""
+import argparse
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+from launches.launch_codec import serialize_detail, serialize_summary
+
+from . import generate
+
+# BatchWriteItem admite como máximo 25 peticiones por llamada; cada
+# lanzamiento son dos (resumen y detalle)
+BATCH_WRITE_MAX_ITEMS = 25
+LAUNCHES_PER_BATCH = BATCH_WRITE_MAX_ITEMS // 2
+
+
+def local_client(endpoint_url, region='us-east-1', max_pool_connections=10):
+    return boto3.client(
+        'dynamodb',
+        endpoint_url=endpoint_url,
+        region_name=region,
+        aws_access_key_id='local',
+        aws_secret_access_key='local',
+        config=Config(max_pool_connections=max_pool_connections, retries={'max_attempts': 10, 'mode': 'adaptive'})
+    )
+
+
+def create_tables(client, table_name, details_table_name, reset=False):
+    """Crea las tablas con el esquema de la pila CDK (las borra antes con reset)"""
+    schemas = {
+        table_name: (('launch_id', 'HASH'), ('launch_date', 'RANGE')),
+        details_table_name: (('launch_id', 'HASH'),),
+    }
+    existing = set(client.list_tables()['TableNames'])
+    for name, keys in schemas.items():
+        if name in existing:
+            if not reset:
+                continue
+            client.delete_table(TableName=name)
+            client.get_waiter('table_not_exists').wait(TableName=name)
+        client.create_table(
+            TableName=name,
+            KeySchema=[{'AttributeName': attribute, 'KeyType': kind} for attribute, kind in keys],
+            AttributeDefinitions=[{'AttributeName': attribute, 'AttributeType': 'S'} for attribute, _ in keys],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        client.get_waiter('table_exists').wait(TableName=name)
+
+
+def batch_write(client, request_items, max_retries=8):
+    """BatchWriteItem reintentando UnprocessedItems con backoff; devuelve las WCU consumidas"""
+    capacity = 0.0
+    for attempt in range(max_retries + 1):
+        response = client.batch_write_item(RequestItems=request_items, ReturnConsumedCapacity='TOTAL')
+        capacity += sum(entry.get('CapacityUnits', 0) for entry in response.get('ConsumedCapacity', []))
+        request_items = response.get('UnprocessedItems') or {}
+        if not request_items:
+            return capacity
+        time.sleep(min(0.05 * 2 ** attempt, 2.0))
+    raise RuntimeError(f'BatchWriteItem left unprocessed items after {max_retries} retries')
+
+
+def seed(client, table_name, details_table_name, launches, workers=8):
+    """
+    Escribe resumen y detalle de cada lanzamiento con `workers` hilos. Como
+    mucho hay 2 lotes pendientes por hilo, así que el dataset se genera a la
+    vez que se escribe sin tenerlo entero en memoria. Devuelve (items, WCU).
+    """
+    pending = threading.BoundedSemaphore(workers * 2)
+    totals = {'launches': 0, 'capacity': 0.0}
+    lock = threading.Lock()
+
+    def write(chunk):
+        try:
+            capacity = batch_write(client, {
+                table_name: [{'PutRequest': {'Item': serialize_summary(launch)}} for launch in chunk],
+                details_table_name: [{'PutRequest': {'Item': serialize_detail(launch)}} for launch in chunk],
+            })
+            with lock:
+                totals['launches'] += len(chunk)
+                totals['capacity'] += capacity
+        finally:
+            pending.release()
+
+    launches = iter(launches)
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='seed') as pool:
+        while True:
+            chunk = list(itertools.islice(launches, LAUNCHES_PER_BATCH))
+            if not chunk:
+                break
+            pending.acquire()
+            futures.append(pool.submit(write, chunk))
+            # Propaga pronto los errores y no acumula futures completados
+            if len(futures) >= workers * 8:
+                for future in futures:
+                    future.result()
+                futures = []
+        for future in futures:
+            future.result()
+    return totals['launches'], totals['capacity']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint-url', default='http://localhost:8001')
+    parser.add_argument('--table-name', default='spacex-launches')
+    parser.add_argument('--details-table-name', default='spacex-launch-details')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    client = local_client(args.endpoint_url, max_pool_connections=args.workers)
+    create_tables(client, args.table_name, args.details_table_name, reset=True)
+    start = time.perf_counter()
+    count, capacity = seed(client, args.table_name, args.details_table_name,
+                           generate.launches(args.items, args.seed), workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f'Seeded {count} launches in {elapsed:.1f}s ({count / elapsed:.0f} launches/s, {capacity:.0f} WCU)')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spacex_site.settings')
+# Bajo ASGI la API usa vistas async que delegan DynamoDB a un pool acotado
+os.environ.setdefault('ASYNC_API', 'True')
 
 application = get_asgi_application()
@@ -16,6 +16,13 @@ DEBUG = os.environ.get('DEBUG','True').lower() == 'true'
 
 ALLOWED_HOSTS = ["*"]
 
+# Perfil API: el servicio desplegado solo expone la API JSON, Swagger y
+# /health/, así que se omiten admin, sesiones, auth, mensajes, CSRF y la BD
+API_PROFILE = os.environ.get('API_PROFILE', 'False').lower() == 'true'
+
+# Vistas async para la API (se activa por defecto al arrancar con asgi.py)
+ASYNC_API = os.environ.get('ASYNC_API', 'False').lower() == 'true'
+
 
 # Application definition
 
@@ -32,8 +39,20 @@ INSTALLED_APPS = [
     'launches',
 ]
 
+if API_PROFILE:
+    INSTALLED_APPS = [
+        'django.contrib.staticfiles',
+        'rest_framework',
+        'corsheaders',
+        'drf_yasg',
+        'launches',
+    ]
+
 MIDDLEWARE = [
+    'launches.instrumentation.PerformanceMiddleware',
+    'launches.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'launches.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -44,6 +63,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if API_PROFILE:
+    MIDDLEWARE = [
+        'launches.instrumentation.PerformanceMiddleware',
+        'launches.profiling.ProfilingMiddleware',
+        'corsheaders.middleware.CorsMiddleware',
+        'launches.admission.AdmissionControlMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
+
 ROOT_URLCONF = 'spacex_site.urls'
 
 TEMPLATES = [
@@ -61,7 +91,13 @@ TEMPLATES = [
     },
 ]
 
+if API_PROFILE:
+    TEMPLATES[0]['OPTIONS']['context_processors'] = [
+        'django.template.context_processors.request',
+    ]
+
 WSGI_APPLICATION = 'spacex_site.wsgi.application'
+ASGI_APPLICATION = 'spacex_site.asgi.application'
 
 
 # Database
@@ -74,6 +110,9 @@ DATABASES = {
     }
 }
 
+if API_PROFILE:
+    DATABASES = {}
+
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -86,6 +125,44 @@ REST_FRAMEWORK = {
     ]
 }
 
+if API_PROFILE:
+    REST_FRAMEWORK.update({
+        # Sin autenticación: evita cargar django.contrib.auth en cada petición
+        'DEFAULT_AUTHENTICATION_CLASSES': [],
+        'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+        'UNAUTHENTICATED_USER': None,
+        'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'launches.negotiation.FirstRendererNegotiation',
+    })
+
+# Access log JSON (launches.access) e histogramas por endpoint (launches.metrics)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'json': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'launches': {
+            'handlers': ['console'],
+            'level': os.environ.get('LOG_LEVEL', 'INFO'),
+        },
+        'launches.access': {
+            'handlers': ['json'],
+            'level': os.environ.get('ACCESS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'launches.metrics': {
+            'handlers': ['json'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
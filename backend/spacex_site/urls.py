@@ -1,9 +1,10 @@
-from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import path, include, re_path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from django.http import JsonResponse
+from launches.metrics import metrics_view
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -17,14 +18,22 @@ schema_view = get_schema_view(
     permission_classes=(permissions.AllowAny,),
 )
 
+def health(request):
+    return JsonResponse({'status': 'healthy'})
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('launches.urls')),
     # Swagger URLs
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    # El grupo format elige el renderer (.json o .yaml); sin él drf_yasg sirve YAML
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     #Heald  check 
-    path('health/', lambda request :JsonResponse({'status':'healthy'})),
+    path('health/', health),
+    # Métricas Prometheus (agregadas entre workers de gunicorn)
+    path('metrics', metrics_view),
 ]
 
+if not settings.API_PROFILE:
+    from django.contrib import admin
+    urlpatterns.append(path('admin/', admin.site.urls))
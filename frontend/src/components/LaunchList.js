@@ -7,23 +7,40 @@ const LaunchList = () => {
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({
     status: '',
-    rocket: ''
+    rocket: '',
+    q: '',
+    from: '',
+    to: ''
   });
 
   useEffect(() => {
-    fetchLaunches();
-  }, []);
+    let cancelled = false;
+    const fetchLaunches = async () => {
+      const params = Object.fromEntries(
+        Object.entries(filters).filter(([, value]) => value)
+      );
+      try {
+        // Con filtros, el backend los combina y pagina hasta completar el límite
+        const response = Object.keys(params).length
+          ? await axios.get('/api/filter/', { params: { ...params, limit: 50 } })
+          : await axios.get('/api/launches/?limit=50');
+        if (!cancelled) setLaunches(response.data.items || []);
+      } catch (error) {
+        console.error('Error fetching launches:', error);
+        if (!cancelled) setLaunches([]);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    };
 
-  const fetchLaunches = async () => {
-    try {
-      const response = await axios.get('/api/launches/?limit=50');
-      setLaunches(response.data.items || []);
-    } catch (error) {
-      console.error('Error fetching launches:', error);
-    } finally {
-      setLoading(false);
-    }
-  };
+    // Con filtros, espera a que el usuario deje de escribir antes de consultar
+    const hasFilters = Object.values(filters).some(Boolean);
+    const timer = setTimeout(fetchLaunches, hasFilters ? 300 : 0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [filters]);
 
   const getStatusColor = (status) => {
     switch (status) {
@@ -51,12 +68,6 @@ const LaunchList = () => {
     }
   };
 
-  const filteredLaunches = launches.filter(launch => {
-    if (filters.status && launch.status !== filters.status) return false;
-    if (filters.rocket && !launch.rocket_name?.toLowerCase().includes(filters.rocket.toLowerCase())) return false;
-    return true;
-  });
-
   if (loading) {
     return (
       <div className="flex justify-center items-center h-64">
@@ -83,22 +94,47 @@ const LaunchList = () => {
             <option value="upcoming">Próximos</option>
           </select>
           
-          <input
-            type="text"
-            placeholder="Filtrar por cohete..."
+          <select
             value={filters.rocket}
             onChange={(e) => setFilters({...filters, rocket: e.target.value})}
+            className="px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+          >
+            <option value="">Todos los cohetes</option>
+            <option value="Falcon 1">Falcon 1</option>
+            <option value="Falcon 9">Falcon 9</option>
+            <option value="Falcon Heavy">Falcon Heavy</option>
+          </select>
+          
+          <input
+            type="date"
+            value={filters.from}
+            onChange={(e) => setFilters({...filters, from: e.target.value})}
+            className="px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+          />
+          
+          <input
+            type="date"
+            value={filters.to}
+            onChange={(e) => setFilters({...filters, to: e.target.value})}
+            className="px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+          />
+          
+          <input
+            type="text"
+            placeholder="Buscar misión..."
+            value={filters.q}
+            onChange={(e) => setFilters({...filters, q: e.target.value})}
             className="px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent flex-grow"
           />
         </div>
         
         <p className="text-gray-600">
-          Mostrando {filteredLaunches.length} de {launches.length} lanzamientos
+          Mostrando {launches.length} lanzamientos
         </p>
       </div>
 
       <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-3">
-        {filteredLaunches.map((launch) => (
+        {launches.map((launch) => (
           <div key={launch.launch_id} className="bg-white rounded-lg shadow-md hover:shadow-lg transition-shadow">
             <div className="p-6">
               {launch.patch_image && (
@@ -144,7 +180,7 @@ const LaunchList = () => {
         ))}
       </div>
 
-      {filteredLaunches.length === 0 && (
+      {launches.length === 0 && (
         <div className="text-center py-12">
           <p className="text-gray-500 text-lg">No se encontraron lanzamientos con los filtros aplicados.</p>
         </div>
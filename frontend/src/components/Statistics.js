@@ -1,28 +1,54 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
+import { Link } from 'react-router-dom';
+
+const LaunchSection = ({ title, launches }) => (
+  <div className="bg-white p-6 rounded-lg shadow">
+    <h3 className="text-xl font-semibold text-gray-900 mb-4">{title}</h3>
+    {launches === null ? (
+      <p className="text-gray-500">Sección no disponible en este momento</p>
+    ) : (
+      <ul className="divide-y divide-gray-200">
+        {launches.map((launch) => (
+          <li key={launch.launch_id} className="py-2 flex justify-between">
+            <Link to={`/launch/${launch.launch_id}`} className="text-blue-600 hover:text-blue-800 font-medium">
+              {launch.mission_name}
+            </Link>
+            <span className="text-gray-600 text-sm">
+              {launch.rocket_name} · {new Date(launch.launch_date).toLocaleDateString()}
+            </span>
+          </li>
+        ))}
+      </ul>
+    )}
+  </div>
+);
 
 const Statistics = () => {
-  const [stats, setStats] = useState(null);
+  const [dashboard, setDashboard] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    const fetchStatistics = async () => {
+    const fetchDashboard = async () => {
       try {
         setLoading(true);
-        const response = await axios.get('/api/statistics/');
-        setStats(response.data);
+        // Una sola petición: estadísticas, desglose por cohete, recientes y próximos
+        const response = await axios.get('/api/dashboard/', { params: { recent: 5, upcoming: 5 } });
+        setDashboard(response.data);
       } catch (err) {
         setError('Error cargando estadísticas');
-        console.error('Error fetching statistics:', err);
+        console.error('Error fetching dashboard:', err);
       } finally {
         setLoading(false);
       }
     };
 
-    fetchStatistics();
+    fetchDashboard();
   }, []);
 
+  const stats = dashboard?.statistics;
+
   if (loading) {
     return (
       <div className="flex justify-center items-center h-64">
@@ -42,7 +68,7 @@ const Statistics = () => {
     );
   }
 
-  if (!stats) {
+  if (!dashboard) {
     return (
       <div className="text-center py-12">
         <p className="text-gray-500">No hay datos estadísticos disponibles</p>
@@ -50,6 +76,25 @@ const Statistics = () => {
     );
   }
 
+  const launchSections = (
+    <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
+      <LaunchSection title="Próximos lanzamientos" launches={dashboard.upcoming} />
+      <LaunchSection title="Lanzamientos recientes" launches={dashboard.recent} />
+    </div>
+  );
+
+  // Respuesta parcial sin estadísticas: se muestran el resto de secciones
+  if (!stats) {
+    return (
+      <div className="space-y-8">
+        <div className="text-center py-6">
+          <p className="text-gray-500">No hay datos estadísticos disponibles</p>
+        </div>
+        {launchSections}
+      </div>
+    );
+  }
+
   // Calcular porcentajes para la barra de progreso
   const totalCompleted = stats.total_launches - stats.upcoming;
   const successPercentage = totalCompleted > 0 ? (stats.successful / totalCompleted) * 100 : 0;
@@ -120,31 +165,32 @@ const Statistics = () => {
         )}
 
         {/* Estadísticas por cohete */}
-        {stats.rockets && Object.keys(stats.rockets).length > 0 && (
+        {dashboard.rockets && dashboard.rockets.length > 0 && (
           <div>
             <h3 className="text-xl font-semibold text-gray-900 mb-4">Lanzamientos por Cohete</h3>
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
-              {Object.entries(stats.rockets)
-                .sort(([,a], [,b]) => b - a)
-                .map(([rocket, count]) => (
-                  <div key={rocket} className="bg-gray-50 p-4 rounded-lg border">
-                    <div className="flex justify-between items-center">
-                      <span className="font-medium text-gray-900">{rocket}</span>
-                      <span className="bg-blue-100 text-blue-800 px-2 py-1 rounded-full text-sm font-medium">
-                        {count}
-                      </span>
-                    </div>
-                    <div className="w-full bg-gray-200 rounded-full h-2 mt-2">
-                      <div 
-                        className="bg-blue-600 h-2 rounded-full transition-all duration-500 ease-out"
-                        style={{ width: `${(count / stats.total_launches) * 100}%` }}
-                      ></div>
-                    </div>
-                    <div className="text-right text-xs text-gray-500 mt-1">
-                      {((count / stats.total_launches) * 100).toFixed(1)}%
-                    </div>
+              {dashboard.rockets.map((rocket) => (
+                <div key={rocket.rocket} className="bg-gray-50 p-4 rounded-lg border">
+                  <div className="flex justify-between items-center">
+                    <span className="font-medium text-gray-900">{rocket.rocket}</span>
+                    <span className="bg-blue-100 text-blue-800 px-2 py-1 rounded-full text-sm font-medium">
+                      {rocket.total}
+                    </span>
+                  </div>
+                  <div className="w-full bg-gray-200 rounded-full h-2 mt-2">
+                    <div 
+                      className="bg-blue-600 h-2 rounded-full transition-all duration-500 ease-out"
+                      style={{ width: `${(rocket.total / stats.total_launches) * 100}%` }}
+                    ></div>
                   </div>
-                ))}
+                  <div className="flex justify-between text-xs text-gray-500 mt-1">
+                    <span>
+                      {rocket.success_rate !== null ? `Éxito ${rocket.success_rate.toFixed(1)}%` : 'Sin completar'}
+                    </span>
+                    <span>{((rocket.total / stats.total_launches) * 100).toFixed(1)}%</span>
+                  </div>
+                </div>
+              ))}
             </div>
           </div>
         )}
@@ -159,6 +205,8 @@ const Statistics = () => {
           </p>
         </div>
       </div>
+
+      {launchSections}
     </div>
   );
 };
@@ -35,6 +35,73 @@ class SpaceXStack(Stack):
             removal_policy=RemovalPolicy.DESTROY
         )
         
+        # Índices del planificador de /api/filter/ (FILTER_INDEXES en el
+        # backend): igualdad por estado o cohete, ordenados por fecha.
+        # DynamoDB solo crea un GSI por actualización de la tabla, así que se
+        # añaden de uno en uno con el contexto filter_indexes (cdk.json): 1 en
+        # un despliegue y 2 en el siguiente, con el primero ya ACTIVE.
+        filter_indexes = (("status-date-index", "status"), ("rocket-date-index", "rocket_name"))
+        # Solo los atributos del resumen que devuelve /api/filter/; sin
+        # last_updated, que cambia en cada escritura y obligaría a reescribir
+        # el índice aunque el lanzamiento no haya cambiado. El backend
+        # devuelve estos mismos campos por los tres caminos (FILTER_FIELDS)
+        filter_projection = [
+            "mission_name", "rocket_name", "status", "launch_date_unix",
+            "launchpad_name", "payload_types", "patch_image", "flight_number",
+        ]
+        enabled_indexes = int(self.node.try_get_context("filter_indexes") or 0)
+        for index_name, attribute in filter_indexes[:enabled_indexes]:
+            launches_table.add_global_secondary_index(
+                index_name=index_name,
+                partition_key=dynamodb.Attribute(name=attribute, type=dynamodb.AttributeType.STRING),
+                sort_key=dynamodb.Attribute(name="launch_date", type=dynamodb.AttributeType.STRING),
+                projection_type=dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=[name for name in filter_projection if name != attribute]
+            )
+        # El backend solo consulta los índices cuando existen todos
+        self.filter_indexes_ready = enabled_indexes >= len(filter_indexes)
+        
+        # Tabla de detalles: campos grandes (details, URLs, payloads) fuera del
+        # resumen para que listados y scans no paguen RCU por ellos
+        details_table = dynamodb.Table(
+            self, "SpaceXLaunchDetailsTable",
+            table_name="spacex-launch-details",
+            partition_key=dynamodb.Attribute(
+                name="launch_id",
+                type=dynamodb.AttributeType.STRING
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        
+        # Tabla de control del ingester (validadores HTTP y estado operativo)
+        control_table = dynamodb.Table(
+            self, "SpaceXIngestControlTable",
+            table_name="spacex-ingest-control",
+            partition_key=dynamodb.Attribute(
+                name="pk",
+                type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="sk",
+                type=dynamodb.AttributeType.STRING
+            ),
+            time_to_live_attribute="expires_at",
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        
+        # Rol con el que EventBridge Scheduler invoca la Lambda en las
+        # ejecuciones programadas por ella misma (scheduling.py)
+        scheduler_role = iam.Role(
+            self, "IngestSchedulerRole",
+            assumed_by=iam.ServicePrincipal("scheduler.amazonaws.com")
+        )
+        scheduler_role.add_to_policy(iam.PolicyStatement(
+            actions=["lambda:InvokeFunction"],
+            resources=[f"arn:aws:lambda:{self.region}:{self.account}:function:spacex-data-processor"]
+        ))
+        
         # 2. Lambda Function
         spacex_lambda = lambda_.Function(
             self, "SpaceXDataProcessor",
@@ -44,29 +111,50 @@ class SpaceXStack(Stack):
             code=lambda_.Code.from_asset("../lambda"),
             timeout=Duration.minutes(5),
             environment={
-                "TABLE_NAME": launches_table.table_name
+                "TABLE_NAME": launches_table.table_name,
+                "DETAILS_TABLE_NAME": details_table.table_name,
+                "CONTROL_TABLE_NAME": control_table.table_name,
+                "SCHEDULER_ROLE_ARN": scheduler_role.role_arn,
+                "COMPRESSED_ATTRIBUTES": "details,payload_names"
             }
         )
         
         # Permisos para Lambda
         launches_table.grant_read_write_data(spacex_lambda)
+        details_table.grant_read_write_data(spacex_lambda)
+        control_table.grant_read_write_data(spacex_lambda)
+        # Reinvocación asíncrona para reanudar un checkpoint; el ARN se construye
+        # a mano porque grant_invoke sobre sí misma crea una dependencia circular
+        spacex_lambda.add_to_role_policy(iam.PolicyStatement(
+            actions=["lambda:InvokeFunction"],
+            resources=[f"arn:aws:lambda:{self.region}:{self.account}:function:spacex-data-processor"]
+        ))
+        spacex_lambda.add_to_role_policy(iam.PolicyStatement(
+            actions=["scheduler:CreateSchedule", "scheduler:UpdateSchedule"],
+            resources=[f"arn:aws:scheduler:{self.region}:{self.account}:schedule/default/spacex-ingest-next"]
+        ))
+        scheduler_role.grant_pass_role(spacex_lambda.role)
         
-        # 3. EventBridge Rule (cada 6 horas)
+        # 3. EventBridge Rule de respaldo: la Lambda programa su siguiente
+        # ejecución según los próximos lanzamientos; esta regla solo la
+        # relanza si esa cadena se interrumpe
         rule = events.Rule(
             self, "ScheduledRule",
-            schedule=events.Schedule.rate(Duration.hours(6))
+            schedule=events.Schedule.rate(Duration.days(1))
         )
         rule.add_target(targets.LambdaFunction(spacex_lambda))
         
         # 4. Setup ECS Infrastructure
-        self._setup_ecs_infrastructure(launches_table)
+        self._setup_ecs_infrastructure(launches_table, details_table, control_table)
         
         # Outputs
         from aws_cdk import CfnOutput
         CfnOutput(self, "TableName", value=launches_table.table_name)
+        CfnOutput(self, "DetailsTableName", value=details_table.table_name)
+        CfnOutput(self, "ControlTableName", value=control_table.table_name)
         CfnOutput(self, "LambdaFunctionName", value=spacex_lambda.function_name)
 
-    def _setup_ecs_infrastructure(self, table):
+    def _setup_ecs_infrastructure(self, table, details_table, control_table):
         """Configura la infraestructura ECS para la aplicación web"""
         
         # VPC
@@ -123,6 +211,9 @@ class SpaceXStack(Stack):
             description="Role for Backend ECS Task"
         )
         table.grant_read_data(backend_task_role)
+        details_table.grant_read_data(backend_task_role)
+        # Solo lectura: /api/ingest-runs/ consulta el registro de ejecuciones
+        control_table.grant_read_data(backend_task_role)
         
         # Backend Task Definition
         backend_task_definition = ecs.FargateTaskDefinition(
@@ -139,8 +230,14 @@ class SpaceXStack(Stack):
             image=ecs.ContainerImage.from_asset("../backend"),
             environment={
                 "TABLE_NAME": table.table_name,
+                "DETAILS_TABLE_NAME": details_table.table_name,
+                "CONTROL_TABLE_NAME": control_table.table_name,
                 "DEBUG": "False",
-                "AWS_DEFAULT_REGION": "us-east-1"
+                "API_PROFILE": "True",
+                "FILTER_USE_INDEXES": str(self.filter_indexes_ready),
+                "AWS_DEFAULT_REGION": "us-east-1",
+                # vCPUs de la tarea para dimensionar los workers de gunicorn
+                "CPU_QUOTA": str(backend_task_definition.cpu / 1024)
             },
             logging=ecs.LogDriver.aws_logs(stream_prefix="Backend")
         )
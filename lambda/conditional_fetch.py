@@ -0,0 +1,83 @@
+"""
+Descarga condicional de la API de SpaceX.
+
+Se guardan el ETag, el Last-Modified y un hash SHA-256 del cuerpo de la
+última respuesta procesada, en /tmp (contenedor caliente) y en la tabla de
+control (arranques en frío). La siguiente descarga envía If-None-Match /
+If-Modified-Since; un 304 o un cuerpo con el mismo hash significa que no hay
+nada que procesar. También se negocia compresión gzip (y brotli si el paquete
+brotli está instalado).
+"""
+import hashlib
+import json
+import logging
+import os
+
+from urllib3.util import make_headers
+
+logger = logging.getLogger()
+
+STATE_PATH = os.environ.get('FETCH_STATE_PATH', '/tmp/spacex-fetch-state.json')
+STATE_PK = 'fetch'
+
+# gzip/deflate siempre; br (y zstd) cuando urllib3 puede decodificarlos
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+
+def body_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def request_headers(state):
+    headers = {'Accept-Encoding': ACCEPT_ENCODING}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    return headers
+
+
+def response_state(response, digest):
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'body_hash': digest,
+    }
+
+
+def load_state(control, url):
+    """Estado de la última descarga procesada; {} si no hay ninguno"""
+    try:
+        with open(STATE_PATH) as f:
+            cached = json.load(f)
+        if cached.get('url') == url:
+            return cached
+    except (OSError, ValueError):
+        pass
+    try:
+        item = control.get(STATE_PK, url, consistent=False)
+    except Exception as e:
+        # Sin estado se hace una descarga completa: nunca bloquea la ingesta
+        logger.warning(f"Could not load fetch state: {str(e)}")
+        return {}
+    if not item:
+        return {}
+    state = {name: item.get(name) for name in ('etag', 'last_modified', 'body_hash')}
+    _write_cache(url, state)
+    return dict(state, url=url)
+
+
+def save_state(control, url, state):
+    _write_cache(url, state)
+    try:
+        control.put(STATE_PK, url, {name: value for name, value in state.items() if name != 'url'})
+    except Exception as e:
+        logger.warning(f"Could not save fetch state: {str(e)}")
+
+
+def _write_cache(url, state):
+    try:
+        with open(STATE_PATH, 'w') as f:
+            json.dump(dict(state, url=url), f)
+    except OSError as e:
+        logger.warning(f"Could not cache fetch state in {STATE_PATH}: {str(e)}")
@@ -0,0 +1,81 @@
+"""
+Métricas de la ingesta en CloudWatch Embedded Metric Format.
+
+Al final de cada invocación se escribe en stdout una sola línea JSON con las
+métricas de la entrada del registro de ejecuciones (ledger.py); CloudWatch
+Logs la convierte en métricas del namespace EMF_NAMESPACE sin llamadas a la
+API ni librerías adicionales. La dimensión RunKind separa ejecuciones
+completas, incrementales, fan-out y shards; el conjunto vacío publica
+además el agregado de todas.
+"""
+import json
+import logging
+import os
+import sys
+import time
+
+EMF_ENABLED = os.environ.get('EMF_ENABLED', 'True').lower() == 'true'
+EMF_NAMESPACE = os.environ.get('EMF_NAMESPACE', 'SpaceX/Ingest')
+DIMENSIONS = [['RunKind'], []]
+
+logger = logging.getLogger()
+
+
+def _percentile(sorted_values, quantile):
+    return sorted_values[min(int(len(sorted_values) * quantile), len(sorted_values) - 1)]
+
+
+def metrics_document(entry, write_latencies_ms=()):
+    """Documento EMF de una ejecución a partir de su entrada del registro"""
+    duration_seconds = entry['duration_ms'] / 1000
+    metrics = {
+        'Duration': (entry['duration_ms'], 'Milliseconds'),
+        'FetchLatency': (entry['stages_ms']['fetch'], 'Milliseconds'),
+        'PayloadBytes': (entry['bytes_downloaded'], 'Bytes'),
+        'LaunchesProcessed': (entry['total_processed'], 'Count'),
+        'LaunchesPerSecond': (
+            round(entry['total_processed'] / duration_seconds, 2) if duration_seconds else 0, 'Count/Second'
+        ),
+        'ItemsChanged': (entry['items_changed'], 'Count'),
+        'UnprocessedItems': (entry['failed_upserts'], 'Count'),
+        'Throttles': (entry['throttles'], 'Count'),
+        'Retries': (entry['retries'], 'Count'),
+        'ConsumedWCU': (entry['wcu'], 'Count'),
+        'Errors': (1 if entry['outcome'] == 'error' else 0, 'Count'),
+    }
+    latencies = sorted(write_latencies_ms)
+    if latencies:
+        for name, quantile in (('WriteLatencyP50', 0.50), ('WriteLatencyP95', 0.95), ('WriteLatencyP99', 0.99)):
+            metrics[name] = (round(_percentile(latencies, quantile), 2), 'Milliseconds')
+
+    document = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': EMF_NAMESPACE,
+                'Dimensions': DIMENSIONS,
+                'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()],
+            }],
+        },
+        'RunKind': entry['kind'],
+        # Propiedades: se pueden consultar en Logs Insights pero no son dimensiones
+        'RunId': entry['run_id'],
+        'Outcome': entry['outcome'],
+    }
+    document.update({name: value for name, (value, _) in metrics.items()})
+    return document
+
+
+def emit(entry, write_latencies_ms=(), stream=None):
+    """Una línea por invocación; nunca interrumpe la ingesta"""
+    if not EMF_ENABLED:
+        return None
+    try:
+        document = metrics_document(entry, write_latencies_ms)
+        stream = stream or sys.stdout
+        stream.write(json.dumps(document, separators=(',', ':')) + '\n')
+        stream.flush()
+        return document
+    except Exception as e:
+        logger.warning(f"Could not emit ingest metrics: {str(e)}")
+        return None
@@ -0,0 +1,157 @@
+"""
+Reparto de un resync completo entre varias invocaciones en paralelo.
+
+El coordinador pide a /v4/launches/query el número total de lanzamientos,
+lo divide en páginas de SHARD_PAGE_SIZE (cada página es un shard) y las
+reparte con un dispatcher:
+
+- ThreadDispatcher: hilos dentro del mismo proceso (local y pruebas),
+  FANOUT_WORKERS a la vez.
+- LambdaDispatcher: invocaciones de spacex-data-processor con el evento
+  {"shard": {...}}, todas a la vez (hasta FANOUT_MAX_INVOCATIONS).
+
+Cada worker descarga su página ya poblada (rocket, launchpad, payloads), la
+transforma y escribe, y devuelve sus contadores; el coordinador los suma.
+El coordinador solo espera hasta su propio plazo menos
+FANOUT_SAFETY_MARGIN_SECONDS, para que siempre le quede tiempo de sumar los
+resultados, liberar el lease y escribir el registro de la ejecución; los
+shards sin resultado para entonces cuentan como fallidos (timed_out_shards).
+"""
+import contextvars
+import json
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import boto3
+import requests
+from botocore.config import Config
+
+import ledger
+
+logger = logging.getLogger()
+
+SHARD_PAGE_SIZE = int(os.environ.get('SHARD_PAGE_SIZE', '100'))
+FANOUT_WORKERS = int(os.environ.get('FANOUT_WORKERS', '4'))
+FANOUT_MAX_INVOCATIONS = int(os.environ.get('FANOUT_MAX_INVOCATIONS', '50'))
+FANOUT_SAFETY_MARGIN_SECONDS = float(os.environ.get('FANOUT_SAFETY_MARGIN_SECONDS', '20'))
+# thread | lambda; por defecto lambda cuando se ejecuta dentro de AWS Lambda
+FANOUT_DISPATCHER = os.environ.get(
+    'FANOUT_DISPATCHER', 'lambda' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else 'thread'
+)
+POPULATE = ['rocket', 'launchpad', 'payloads']
+COUNTERS = ('total_processed', 'successful_upserts', 'failed_upserts')
+# Resultado de un shard que no terminó antes del plazo del coordinador
+TIMED_OUT = object()
+
+
+def query_url(api_url):
+    return api_url.rstrip('/') + '/query'
+
+
+def fetch_page(api_url, page, limit, populate=True, timeout=30):
+    """Página `page` (desde 1) del endpoint de consulta, ordenada por flight_number"""
+    response = requests.post(query_url(api_url), json={
+        'query': {},
+        'options': {
+            'page': page,
+            'limit': limit,
+            'sort': {'flight_number': 'asc'},
+            'populate': POPULATE if populate else [],
+        }
+    }, timeout=timeout)
+    response.raise_for_status()
+    ledger.add_bytes(len(response.content))
+    with ledger.stage('parse'):
+        return json.loads(response.content)
+
+
+def plan_shards(api_url, page_size=SHARD_PAGE_SIZE):
+    total = fetch_page(api_url, 1, 1, populate=False)['totalDocs']
+    return [{'page': page, 'limit': page_size} for page in range(1, math.ceil(total / page_size) + 1)]
+
+
+def wait_seconds(context, margin=FANOUT_SAFETY_MARGIN_SECONDS):
+    """Cuánto puede esperar el coordinador a los shards; None fuera de Lambda"""
+    if context is None:
+        return None
+    return max(context.get_remaining_time_in_millis() / 1000 - margin, 0)
+
+
+def aggregate(results):
+    """
+    Suma los contadores de los shards. Un shard que falla o no termina a
+    tiempo cuenta como fallido; los segundos, además, en timed_out_shards
+    (una invocación síncrona sigue corriendo aunque el coordinador deje de esperarla).
+    """
+    summary = {name: 0 for name in COUNTERS}
+    summary['shards'] = len(results)
+    summary['failed_shards'] = 0
+    summary['timed_out_shards'] = 0
+    for result in results:
+        if result is TIMED_OUT:
+            summary['timed_out_shards'] += 1
+        if result is None or result is TIMED_OUT:
+            summary['failed_shards'] += 1
+            continue
+        for name in COUNTERS:
+            summary[name] += result.get(name, 0)
+    return summary
+
+
+class ThreadDispatcher:
+    def __init__(self, worker, max_workers=FANOUT_WORKERS):
+        self.worker = worker
+        self.max_workers = max_workers
+
+    def _run(self, shard):
+        try:
+            return self.worker(shard)
+        except Exception as e:
+            logger.error(f"Shard {shard} failed: {str(e)}")
+            return None
+
+    def dispatch(self, shards, timeout=None):
+        """Resultados en el orden de `shards`; TIMED_OUT para los que no terminan en `timeout` segundos"""
+        if not shards:
+            return []
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards)), thread_name_prefix='shard')
+        # Un contexto por shard: las escrituras de los hilos cuentan en el registro de la ejecución
+        futures = [pool.submit(contextvars.copy_context().run, self._run, shard) for shard in shards]
+        done, _ = wait(futures, timeout=timeout)
+        # Sin esperar a los que siguen: los que no empezaron se cancelan
+        pool.shutdown(wait=False, cancel_futures=True)
+        if len(done) < len(futures):
+            logger.warning(f"{len(futures) - len(done)} of {len(futures)} shards did not finish within {timeout}s")
+        return [future.result() if future in done else TIMED_OUT for future in futures]
+
+
+class LambdaDispatcher(ThreadDispatcher):
+    """Cada hilo espera a una invocación síncrona del worker para recoger su resultado"""
+
+    def __init__(self, function_name, max_workers=FANOUT_MAX_INVOCATIONS, client=None, timeout=None):
+        super().__init__(self._invoke, max_workers)
+        self.function_name = function_name
+        # Ninguna lectura espera más allá del plazo del coordinador
+        self.client = client or boto3.client('lambda', config=Config(
+            read_timeout=max(math.ceil(timeout), 1) if timeout is not None else 900,
+            retries={'max_attempts': 0}, max_pool_connections=max_workers
+        ))
+
+    def _invoke(self, shard):
+        response = self.client.invoke(
+            FunctionName=self.function_name,
+            InvocationType='RequestResponse',
+            Payload=json.dumps({'shard': shard}).encode()
+        )
+        payload = json.loads(response['Payload'].read())
+        if response.get('FunctionError') or payload.get('statusCode') != 200:
+            raise RuntimeError(f"worker returned {payload}")
+        return json.loads(payload['body'])['result']
+
+
+def dispatcher(worker, function_name=None, timeout=None):
+    if FANOUT_DISPATCHER == 'lambda' and function_name:
+        return LambdaDispatcher(function_name, timeout=timeout)
+    return ThreadDispatcher(worker)
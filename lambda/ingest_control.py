@@ -0,0 +1,77 @@
+"""
+Tabla de control del ingester (spacex-ingest-control).
+
+Guarda el estado operativo de la Lambda, separado de los datos de
+lanzamientos: validadores de la última descarga, checkpoints, leases y el
+registro de ejecuciones. Clave compuesta pk + sk (cadenas) y TTL en el
+atributo expires_at. Los valores se codifican con las conversiones genéricas
+de launch_codec.
+"""
+import os
+import time
+
+from botocore.exceptions import ClientError
+
+from launch_codec import decode_value, encode_value
+
+CONTROL_TABLE_NAME = os.environ.get('CONTROL_TABLE_NAME', 'spacex-ingest-control')
+
+
+class ControlTable:
+    def __init__(self, client, table_name=CONTROL_TABLE_NAME):
+        self.client = client
+        self.table_name = table_name
+
+    @staticmethod
+    def _key(pk, sk):
+        return {'pk': {'S': pk}, 'sk': {'S': sk}}
+
+    @staticmethod
+    def _decode(item):
+        return {name: decode_value(attribute) for name, attribute in item.items()}
+
+    def get(self, pk, sk, consistent=True):
+        """Item como dict nativo, o None si no existe"""
+        response = self.client.get_item(TableName=self.table_name, Key=self._key(pk, sk), ConsistentRead=consistent)
+        item = response.get('Item')
+        return self._decode(item) if item else None
+
+    def put(self, pk, sk, attributes, ttl_seconds=None, condition=None, values=None, names=None):
+        """
+        Escribe el item completo. Con `condition` devuelve False si la
+        condición no se cumple en lugar de lanzar la excepción.
+        """
+        item = self._key(pk, sk)
+        item.update({name: encode_value(value) for name, value in attributes.items()})
+        if ttl_seconds is not None:
+            item['expires_at'] = {'N': str(int(time.time() + ttl_seconds))}
+        params = {'TableName': self.table_name, 'Item': item}
+        if condition:
+            params['ConditionExpression'] = condition
+        if values:
+            params['ExpressionAttributeValues'] = {name: encode_value(value) for name, value in values.items()}
+        if names:
+            params['ExpressionAttributeNames'] = names
+        try:
+            self.client.put_item(**params)
+        except ClientError as e:
+            if condition and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+    def delete(self, pk, sk, condition=None, values=None, names=None):
+        params = {'TableName': self.table_name, 'Key': self._key(pk, sk)}
+        if condition:
+            params['ConditionExpression'] = condition
+        if values:
+            params['ExpressionAttributeValues'] = {name: encode_value(value) for name, value in values.items()}
+        if names:
+            params['ExpressionAttributeNames'] = names
+        try:
+            self.client.delete_item(**params)
+        except ClientError as e:
+            if condition and e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
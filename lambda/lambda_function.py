@@ -3,31 +3,91 @@ import json
 import boto3
 import requests
 from datetime import datetime, timezone
-from decimal import Decimal
 import logging
+import uuid
+import time
+
+import checkpoint
+import conditional_fetch
+import emf
+import fanout
+import ledger
+import scheduling
+from ingest_control import ControlTable
+from lease import LEASE_WAIT_SECONDS, Lease
+from profiling import profile_handler
+from launch_codec import Compression, Launch, serialize_detail, serialize_summary
 
 # Configuración de logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Clients de AWS
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
+# Clients de AWS (cliente de bajo nivel: los items se codifican con launch_codec)
+TABLE_NAME = os.environ['TABLE_NAME']
+DETAILS_TABLE_NAME = os.environ.get('DETAILS_TABLE_NAME', 'spacex-launch-details')
+# Los throttles de cada respuesta se cuentan en el registro de la ejecución
+dynamodb = ledger.instrument(boto3.client('dynamodb'))
+
+REQUEST_TIMEOUT_SECONDS = int(os.environ.get('REQUEST_TIMEOUT_SECONDS', '30'))
+WRITE_OPTIONS = {'ReturnValues': 'ALL_OLD', 'ReturnConsumedCapacity': 'TOTAL'}
+
+# Atributos de detalle que se guardan comprimidos (Binary con marcador de códec)
+COMPRESSION = Compression(
+    fields=[name for name in os.environ.get('COMPRESSED_ATTRIBUTES', 'details,payload_names').split(',') if name],
+    min_bytes=int(os.environ.get('COMPRESSION_MIN_BYTES', '256')),
+    codec=os.environ.get('COMPRESSION_CODEC', 'zlib'),
+)
+
+def control_table():
+    """Tabla de control con el cliente actual del módulo"""
+    return ControlTable(dynamodb)
 
 class SpaceXDataProcessor:
     def __init__(self):
         self.spacex_api_url = os.environ.get('SPACEX_API_URL', 'https://api.spacexdata.com/v4/launches')
+        # Validadores de la descarga en curso; se guardan solo si la ingesta termina bien
+        self.pending_fetch_state = None
+        # Fechas upcoming de la última descarga (None si no ha habido cambios)
+        self.upcoming = None
     
-    def fetch_launches_data(self):
-        """Obtiene datos de lanzamientos desde SpaceX API"""
+    def fetch_launches_data(self, conditional=True):
+        """
+        Obtiene datos de lanzamientos desde SpaceX API. Devuelve None si no
+        han cambiado desde la última ejecución procesada (304 o mismo hash).
+        """
         try:
-            response = requests.get(self.spacex_api_url)
+            state = conditional_fetch.load_state(control_table(), self.spacex_api_url) if conditional else {}
+            headers = conditional_fetch.request_headers(state)
+            ledger.set_kind('incremental' if len(headers) > 1 else 'full')
+            with ledger.stage('fetch'):
+                response = requests.get(self.spacex_api_url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+                body = response.content
+            ledger.add_bytes(len(body))
+            if response.status_code == 304:
+                logger.info("SpaceX data not modified (304)")
+                return None
             response.raise_for_status()
-            return response.json()
+            
+            new_state = conditional_fetch.response_state(response, conditional_fetch.body_hash(body))
+            if new_state['body_hash'] == state.get('body_hash'):
+                logger.info("SpaceX data unchanged (same body hash)")
+                if new_state != {name: state.get(name) for name in new_state}:
+                    conditional_fetch.save_state(control_table(), self.spacex_api_url, new_state)
+                return None
+            
+            self.pending_fetch_state = new_state
+            with ledger.stage('parse'):
+                return json.loads(body)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching SpaceX data: {str(e)}")
             raise
     
+    def commit_fetch_state(self):
+        """Recuerda la descarga procesada para las peticiones condicionales siguientes"""
+        if self.pending_fetch_state:
+            conditional_fetch.save_state(control_table(), self.spacex_api_url, self.pending_fetch_state)
+            self.pending_fetch_state = None
+    
     def transform_launch_data(self, launch):
         """Transforma los datos del lanzamiento al formato requerido"""
         try:
@@ -76,25 +136,25 @@ class SpaceXDataProcessor:
             article_url = links.get('article', '')
             wikipedia_url = links.get('wikipedia', '')
             
-            transformed_data = {
-                'launch_id': launch_id,
-                'mission_name': mission_name,
-                'rocket_name': rocket_name,
-                'launch_date': launch_date_utc,
-                'launch_date_unix': Decimal(str(launch_date_unix)),
-                'status': status,
-                'launchpad_name': launchpad_name,
-                'launchpad_full_name': launchpad_full_name,
-                'payload_names': payload_names,
-                'payload_types': payload_types,
-                'patch_image': patch_image,
-                'webcast_url': webcast_url,
-                'article_url': article_url,
-                'wikipedia_url': wikipedia_url,
-                'details': launch.get('details', ''),
-                'flight_number': Decimal(str(launch.get('flight_number', 0))),
-                'last_updated': datetime.now(timezone.utc).isoformat()
-            }
+            transformed_data = Launch(
+                launch_id=launch_id,
+                mission_name=mission_name,
+                rocket_name=rocket_name,
+                launch_date=launch_date_utc,
+                launch_date_unix=int(launch_date_unix or 0),
+                status=status,
+                launchpad_name=launchpad_name,
+                launchpad_full_name=launchpad_full_name,
+                payload_names=payload_names,
+                payload_types=payload_types,
+                patch_image=patch_image,
+                webcast_url=webcast_url,
+                article_url=article_url,
+                wikipedia_url=wikipedia_url,
+                details=launch.get('details', ''),
+                flight_number=int(launch.get('flight_number') or 0),
+                last_updated=datetime.now(timezone.utc).isoformat()
+            )
             
             return transformed_data
             
@@ -108,43 +168,195 @@ class SpaceXDataProcessor:
             if not launch_data:
                 return False
                 
-            response = table.put_item(Item=launch_data)
+            detail = serialize_detail(launch_data, COMPRESSION)
+            summary = serialize_summary(launch_data)
+            # ALL_OLD no consume capacidad extra y permite contar los items que cambian de verdad
+            with ledger.stage('write'):
+                # Primero el detalle: un resumen nunca apunta a un detalle inexistente
+                response = dynamodb.put_item(TableName=DETAILS_TABLE_NAME, Item=detail, **WRITE_OPTIONS)
+                changed = ledger.record_write(response, detail)
+                response = dynamodb.put_item(TableName=TABLE_NAME, Item=summary, **WRITE_OPTIONS)
+                changed = ledger.record_write(response, summary) or changed
+            ledger.record_change(changed)
             return True
         except Exception as e:
             logger.error(f"Error upserting launch data: {str(e)}")
             return False
     
-    def process_launches(self):
-        """Procesa todos los lanzamientos"""
+    def process_launches(self, context=None):
+        """
+        Procesa todos los lanzamientos. Con `context` vigila el tiempo
+        restante: antes de agotarlo guarda un checkpoint y la ingesta continúa
+        en otra invocación (ver checkpoint.py).
+        """
         try:
-            launches = self.fetch_launches_data()
-            processed_count = 0
-            success_count = 0
+            control = control_table()
+            saved = checkpoint.load(control, self.spacex_api_url)
+            # Con un backfill a medias hace falta el cuerpo aunque no haya cambiado
+            launches = self.fetch_launches_data(conditional=saved is None)
+            if launches is None:
+                # Sin cambios: ni transformación ni escrituras
+                return {
+                    'total_processed': 0,
+                    'successful_upserts': 0,
+                    'failed_upserts': 0,
+                    'unchanged': True
+                }
             
-            for launch in launches:
+            self.upcoming = scheduling.upcoming_times(launches)
+            scheduling.save_upcoming(control, self.spacex_api_url, self.upcoming)
+            
+            digest = self.pending_fetch_state['body_hash']
+            if saved and saved.get('body_hash') != digest:
+                logger.info("SpaceX data changed since the checkpoint; restarting the ingest")
+                saved = None
+            cursor = saved['cursor'] if saved else ''
+            processed_count = int(saved['total_processed']) if saved else 0
+            success_count = int(saved['successful_upserts']) if saved else 0
+            invocations = int(saved['invocations']) + 1 if saved else 1
+            
+            def save_checkpoint():
+                checkpoint.save(control, self.spacex_api_url, {
+                    'body_hash': digest,
+                    'cursor': cursor,
+                    'total_processed': processed_count,
+                    'successful_upserts': success_count,
+                    'invocations': invocations
+                })
+            
+            pending = [launch for launch in checkpoint.ordered(launches) if (launch.get('id') or '') > cursor]
+            for index, launch in enumerate(pending):
+                # Al menos un lanzamiento por invocación para avanzar siempre
+                if index and checkpoint.out_of_time(context):
+                    save_checkpoint()
+                    return {
+                        'total_processed': processed_count,
+                        'successful_upserts': success_count,
+                        'failed_upserts': processed_count - success_count,
+                        'complete': False,
+                        'remaining': len(pending) - index
+                    }
+                
                 processed_count += 1
-                transformed_data = self.transform_launch_data(launch)
+                with ledger.stage('transform'):
+                    transformed_data = self.transform_launch_data(launch)
                 
                 if transformed_data and self.upsert_launch_data(transformed_data):
                     success_count += 1
+                cursor = launch.get('id') or ''
+                if (index + 1) % checkpoint.CHECKPOINT_EVERY == 0:
+                    save_checkpoint()
+            
+            if saved or len(pending) >= checkpoint.CHECKPOINT_EVERY:
+                checkpoint.clear(control, self.spacex_api_url)
+            # Con fallos se repite la descarga completa en la próxima ejecución
+            if success_count == processed_count:
+                self.commit_fetch_state()
             
             return {
                 'total_processed': processed_count,
                 'successful_upserts': success_count,
-                'failed_upserts': processed_count - success_count
+                'failed_upserts': processed_count - success_count,
+                'complete': True,
+                'invocations': invocations
             }
             
         except Exception as e:
             logger.error(f"Error processing launches: {str(e)}")
             raise
 
+    def schedule_next_run(self, context=None):
+        """Programa la próxima ejecución; si falla sigue activa la regla de respaldo"""
+        try:
+            upcoming = self.upcoming
+            if upcoming is None:
+                upcoming = scheduling.load_upcoming(control_table(), self.spacex_api_url)
+            run_at = scheduling.compute_next_run(time.time(), upcoming)
+            scheduling.reschedule(run_at, context.invoked_function_arn if context is not None else None)
+            return run_at
+        except Exception as e:
+            logger.warning(f"Could not schedule the next run: {str(e)}")
+            return None
+    
+    def process_shard(self, shard):
+        """Worker del fan-out: descarga, transforma y escribe una página"""
+        page = fanout.fetch_page(self.spacex_api_url, shard['page'], shard['limit'], timeout=REQUEST_TIMEOUT_SECONDS)
+        processed_count = 0
+        success_count = 0
+        for launch in page['docs']:
+            processed_count += 1
+            with ledger.stage('transform'):
+                transformed_data = self.transform_launch_data(launch)
+            if transformed_data and self.upsert_launch_data(transformed_data):
+                success_count += 1
+        return {
+            'total_processed': processed_count,
+            'successful_upserts': success_count,
+            'failed_upserts': processed_count - success_count
+        }
+    
+    def fan_out(self, context=None, page_size=None):
+        """Coordinador del resync completo: reparte páginas entre workers y suma sus resultados"""
+        shards = fanout.plan_shards(self.spacex_api_url, page_size or fanout.SHARD_PAGE_SIZE)
+        function_name = context.invoked_function_arn if context is not None else None
+        timeout = fanout.wait_seconds(context)
+        results = fanout.dispatcher(self.process_shard, function_name, timeout).dispatch(shards, timeout)
+        summary = fanout.aggregate(results)
+        logger.info(f"Fan-out finished: {summary}")
+        return summary
+
+def run_ingest(processor, event, owner, context):
+    """Ingesta (o coordinador del fan-out) bajo el lease de ejecución única"""
+    run_lease = Lease(control_table(), owner)
+    if not run_lease.acquire(context):
+        wait = int(event.get('wait', LEASE_WAIT_SECONDS))
+        shared = run_lease.wait_for_result(wait) if wait else None
+        if shared is not None:
+            logger.info("Reusing the result of the concurrent ingest run")
+            return dict(shared, shared=True)
+        logger.info("Another ingest run holds the lease; skipping")
+        return {'skipped': True, 'reason': 'lease_held'}
+    
+    result = None
+    try:
+        if event.get('fanout'):
+            result = processor.fan_out(context, event.get('page_size'))
+        else:
+            # Procesar lanzamientos (reanuda el checkpoint si lo hay)
+            result = processor.process_launches(context)
+    finally:
+        try:
+            run_lease.release(result)
+        except Exception as e:
+            # Si no se libera, caduca por expires_at
+            logger.warning(f"Could not release the ingest lease: {str(e)}")
+    
+    if not result.get('complete', True):
+        # Tras liberar el lease, para que la reanudación pueda tomarlo
+        result['resumed_by_invoke'] = checkpoint.resume(context)
+    elif not event.get('fanout'):
+        # Una ingesta a medias la programa la invocación que la termine
+        result['next_run'] = processor.schedule_next_run(context)
+    return result
+
+@profile_handler
 def lambda_handler(event, context):
     """Handler principal de Lambda"""
     processor = SpaceXDataProcessor()
+    run = ledger.RunLedger(context.aws_request_id if context is not None else f'local-{uuid.uuid4()}')
+    token = ledger.current_run.set(run)
+    result, error = None, None
     
     try:
-        # Procesar lanzamientos
-        result = processor.process_launches()
+        event = event if isinstance(event, dict) else {}
+        if 'shard' in event:
+            # Los shards forman parte de la ejecución que tiene el lease
+            run.kind = 'shard'
+            result = processor.process_shard(event['shard'])
+        else:
+            if event.get('fanout'):
+                run.kind = 'fanout'
+            result = run_ingest(processor, event, run.run_id, context)
         
         response = {
             'statusCode': 200,
@@ -163,6 +375,7 @@ def lambda_handler(event, context):
         return response
         
     except Exception as e:
+        error = e
         logger.error(f"Lambda execution failed: {str(e)}")
         
         return {
@@ -176,3 +389,7 @@ def lambda_handler(event, context):
                 'details': str(e)
             })
         }
+    finally:
+        ledger.current_run.reset(token)
+        entry = ledger.save(control_table(), run, result, error)
+        emf.emit(entry, run.write_latencies_ms)
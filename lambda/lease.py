@@ -0,0 +1,90 @@
+"""
+Lease de ejecución única para la ingesta.
+
+Antes de procesar, la invocación escribe pk='lease', sk='ingest' con una
+escritura condicional (no existe o ha caducado) y un expires_at que cubre
+su tiempo restante más LEASE_MARGIN_SECONDS. Las invocaciones concurrentes
+(invoke manual, reintentos, el schedule) no lo consiguen y terminan sin
+escribir nada; con LEASE_WAIT_SECONDS > 0 (o el evento {"wait": N}) esperan
+a que termine la que lo tiene y devuelven su resultado.
+
+Al terminar, el propietario guarda su resultado (pk='lease-result') y borra
+el lease solo si sigue siendo suyo. Si la invocación muere, el lease caduca
+solo: la condición compara expires_at con la hora actual, sin depender de
+cuándo borre DynamoDB el item por TTL.
+"""
+import logging
+import os
+import time
+
+logger = logging.getLogger()
+
+LEASE_PK = 'lease'
+RESULT_PK = 'lease-result'
+LEASE_MARGIN_SECONDS = int(os.environ.get('LEASE_MARGIN_SECONDS', '60'))
+# Duración sin contexto de Lambda (ejecuciones locales)
+LEASE_DEFAULT_SECONDS = int(os.environ.get('LEASE_DEFAULT_SECONDS', '900'))
+LEASE_WAIT_SECONDS = int(os.environ.get('LEASE_WAIT_SECONDS', '0'))
+LEASE_POLL_SECONDS = float(os.environ.get('LEASE_POLL_SECONDS', '2'))
+RESULT_TTL_SECONDS = 3600
+
+OWNER_NAMES = {'#owner': 'owner'}
+
+
+class Lease:
+    def __init__(self, control, owner, name='ingest'):
+        self.control = control
+        self.owner = owner
+        self.name = name
+
+    def acquire(self, context=None):
+        now = int(time.time())
+        if context is not None:
+            duration = context.get_remaining_time_in_millis() // 1000 + LEASE_MARGIN_SECONDS
+        else:
+            duration = LEASE_DEFAULT_SECONDS
+        return self.control.put(
+            LEASE_PK, self.name, {'owner': self.owner, 'acquired_at': now},
+            ttl_seconds=duration,
+            condition='attribute_not_exists(pk) OR expires_at < :now',
+            values={':now': now}
+        )
+
+    def release(self, result=None):
+        """Publica el resultado para quien esté esperando y libera el lease si sigue siendo nuestro"""
+        if result is not None:
+            self.control.put(RESULT_PK, self.name, {
+                'owner': self.owner, 'result': result, 'finished_at': int(time.time())
+            }, ttl_seconds=RESULT_TTL_SECONDS)
+        released = self.control.delete(
+            LEASE_PK, self.name, condition='#owner = :owner', values={':owner': self.owner}, names=OWNER_NAMES
+        )
+        if not released:
+            logger.warning(f"Lease {self.name} expired before release; another run may have taken it")
+        return released
+
+    def holder(self):
+        item = self.control.get(LEASE_PK, self.name)
+        if item and item.get('expires_at', 0) >= time.time():
+            return item
+        return None
+
+    def wait_for_result(self, timeout):
+        """
+        Espera a que el propietario actual termine y devuelve su resultado, o
+        None si no termina a tiempo o no dejó resultado.
+        """
+        holder = self.holder()
+        deadline = time.monotonic() + timeout
+        while holder:
+            current = self.holder()
+            if not current or current['owner'] != holder['owner']:
+                break
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(LEASE_POLL_SECONDS)
+        finished = self.control.get(RESULT_PK, self.name)
+        # Sin holder visible el lease se acaba de liberar: vale el último resultado
+        if finished and (not holder or finished['owner'] == holder['owner']):
+            return finished['result']
+        return None
@@ -0,0 +1,155 @@
+"""
+Registro de ejecuciones de la ingesta.
+
+Cada invocación de lambda_handler deja un item en la tabla de control
+(pk='run', sk='<inicio ISO>#<request id>', con TTL de RUN_LEDGER_TTL_DAYS)
+con el resultado, la duración por etapa (fetch, parse, transform, write),
+los bytes descargados, los items que cambiaron de verdad, los reintentos y
+throttles de DynamoDB y las WCU consumidas. El backend lo expone en
+/api/ingest-runs/.
+
+La ejecución en curso vive en un ContextVar; fuera de una ejecución (o en
+hilos que no la heredan) las funciones de registro no hacen nada.
+"""
+import contextvars
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger()
+
+RUN_PK = 'run'
+RUN_TTL_SECONDS = int(os.environ.get('RUN_LEDGER_TTL_DAYS', '30')) * 24 * 3600
+STAGES = ('fetch', 'parse', 'transform', 'write')
+THROTTLE_CODES = frozenset({
+    'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded'
+})
+# Atributos que cambian en cada escritura aunque el lanzamiento sea el mismo
+VOLATILE_ATTRIBUTES = frozenset({'last_updated'})
+
+current_run = contextvars.ContextVar('current_run', default=None)
+
+
+class RunLedger:
+    def __init__(self, run_id, kind='full'):
+        self.run_id = run_id
+        self.kind = kind
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.bytes_downloaded = 0
+        self.items_changed = 0
+        self.retries = 0
+        self.throttles = 0
+        self.wcu = 0.0
+        # Latencia de cada upsert (resumen + detalle) para los percentiles de emf.py
+        self.write_latencies_ms = []
+
+    def entry(self, result=None, error=None):
+        result = result or {}
+        if error is not None:
+            outcome = 'error'
+        elif result.get('skipped'):
+            outcome = 'skipped'
+        elif result.get('unchanged'):
+            outcome = 'unchanged'
+        elif result.get('complete') is False:
+            outcome = 'checkpointed'
+        elif result.get('failed_upserts') or result.get('failed_shards'):
+            outcome = 'partial'
+        else:
+            outcome = 'ok'
+        return {
+            'run_id': self.run_id,
+            'kind': self.kind,
+            'outcome': outcome,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round((time.perf_counter() - self._start) * 1000, 1),
+            'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
+            'bytes_downloaded': self.bytes_downloaded,
+            'total_processed': result.get('total_processed', 0),
+            'successful_upserts': result.get('successful_upserts', 0),
+            'failed_upserts': result.get('failed_upserts', 0),
+            'items_changed': self.items_changed,
+            'retries': self.retries,
+            'throttles': self.throttles,
+            'wcu': round(self.wcu, 1),
+            'error': str(error) if error is not None else None,
+        }
+
+
+@contextmanager
+def stage(name):
+    run = current_run.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if run is not None:
+            elapsed = time.perf_counter() - start
+            run.stages[name] += elapsed
+            if name == 'write':
+                run.write_latencies_ms.append(elapsed * 1000)
+
+
+def set_kind(kind):
+    run = current_run.get()
+    if run is not None:
+        run.kind = kind
+
+
+def add_bytes(count):
+    run = current_run.get()
+    if run is not None:
+        run.bytes_downloaded += count
+
+
+def record_write(response, item):
+    """
+    Acumula WCU y reintentos de un PutItem con ReturnValues=ALL_OLD y
+    devuelve si el item escrito difiere del anterior
+    """
+    run = current_run.get()
+    if run is None:
+        return False
+    run.wcu += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+    run.retries += response.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+    old = response.get('Attributes')
+    if not old:
+        return True
+    return _stable(old) != _stable(item)
+
+
+def _stable(item):
+    return {name: value for name, value in item.items() if name not in VOLATILE_ATTRIBUTES}
+
+
+def record_change(changed):
+    run = current_run.get()
+    if run is not None and changed:
+        run.items_changed += 1
+
+
+def count_throttles(response=None, **kwargs):
+    """Handler de botocore (needs-retry): cuenta cada respuesta con throttling, reintentada o no"""
+    run = current_run.get()
+    if run is not None and response is not None:
+        if response[1].get('Error', {}).get('Code') in THROTTLE_CODES:
+            run.throttles += 1
+
+
+def instrument(client):
+    client.meta.events.register('needs-retry.dynamodb', count_throttles)
+    return client
+
+
+def save(control, run, result=None, error=None):
+    """Guarda la entrada de la ejecución; un fallo nunca afecta a la ingesta"""
+    entry = run.entry(result, error)
+    try:
+        control.put(RUN_PK, f"{entry['started_at']}#{run.run_id}", entry, ttl_seconds=RUN_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not record the ingest run: {str(e)}")
+    return entry
@@ -0,0 +1,90 @@
+"""
+Perfilado bajo demanda de lambda_handler.
+
+Se perfila 1 de cada PROFILE_SAMPLE_RATE invocaciones, o las invocaciones
+manuales cuyo evento trae {"debug_profile": "<expira_unix>:<firma>"} con
+firma HMAC-SHA256 de "<expira_unix>:lambda_handler" bajo PROFILE_SECRET.
+
+El volcado pstats se guarda en un anillo acotado en PROFILE_DIR (/tmp) y las
+funciones más costosas se escriben en el log, porque /tmp no sobrevive al
+entorno de ejecución. Sin PROFILE_SAMPLE_RATE ni PROFILE_SECRET el decorador
+devuelve el handler sin envolver.
+"""
+import cProfile
+import functools
+import hashlib
+import hmac
+import io
+import itertools
+import logging
+import os
+import pstats
+import time
+
+logger = logging.getLogger()
+
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_SECRET = os.environ.get('PROFILE_SECRET', '')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/profiles')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '10'))
+PROFILE_TOP_FUNCTIONS = int(os.environ.get('PROFILE_TOP_FUNCTIONS', '25'))
+
+PROFILE_SCOPE = 'lambda_handler'
+
+
+def sign(secret, expires, scope=PROFILE_SCOPE):
+    digest = hmac.new(secret.encode(), f'{expires}:{scope}'.encode(), hashlib.sha256).hexdigest()
+    return f'{expires}:{digest}'
+
+
+def verify(secret, value, scope=PROFILE_SCOPE):
+    if not secret or not isinstance(value, str):
+        return False
+    expires, _, _ = value.partition(':')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign(secret, expires, scope), value)
+
+
+def write_profile(profiler, request_id):
+    """Guarda el volcado en el anillo de PROFILE_DIR y devuelve su ruta"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f'{time.time_ns() // 1000}-{request_id}.prof')
+    profiler.dump_stats(path)
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True)[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
+    return path
+
+
+def profile_handler(handler):
+    """Decorador de lambda_handler; sin configuración no añade ningún coste"""
+    if PROFILE_SAMPLE_RATE <= 0 and not PROFILE_SECRET:
+        return handler
+
+    counter = itertools.count(1)
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        sampled = PROFILE_SAMPLE_RATE > 0 and next(counter) % PROFILE_SAMPLE_RATE == 0
+        requested = isinstance(event, dict) and verify(PROFILE_SECRET, event.get('debug_profile'))
+        if not (sampled or requested):
+            return handler(event, context)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(handler, event, context)
+        finally:
+            request_id = getattr(context, 'aws_request_id', 'local')
+            path = write_profile(profiler, request_id)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            logger.info(
+                f"Profiled invocation {request_id} in {(time.perf_counter() - start) * 1000:.1f} ms "
+                f"({path}):\n{summary.getvalue()}"
+            )
+
+    return wrapper
@@ -0,0 +1,94 @@
+"""
+Programación adaptativa de la ingesta.
+
+compute_next_run decide, sin efectos secundarios, cuándo toca la próxima
+ejecución según las fechas de los lanzamientos `upcoming`: cada
+DENSE_INTERVAL_SECONDS dentro de la ventana [lanzamiento - WINDOW_BEFORE,
+lanzamiento + WINDOW_AFTER] (el estado sigue en upcoming horas después del
+despegue), al inicio de la ventana del siguiente lanzamiento y, como mucho,
+cada SPARSE_INTERVAL_SECONDS en semanas tranquilas.
+
+La decisión se aplica con una programación puntual de EventBridge Scheduler
+(SCHEDULE_NAME) que se crea o actualiza en cada ejecución; la regla
+periódica de la pila queda como respaldo por si la cadena se rompe. Sin
+SCHEDULER_ROLE_ARN solo se registra la decisión.
+"""
+import json
+import logging
+import os
+import time
+
+import boto3
+
+logger = logging.getLogger()
+
+DENSE_INTERVAL_SECONDS = int(os.environ.get('DENSE_INTERVAL_SECONDS', '600'))
+SPARSE_INTERVAL_SECONDS = int(os.environ.get('SPARSE_INTERVAL_SECONDS', str(12 * 3600)))
+MIN_INTERVAL_SECONDS = int(os.environ.get('MIN_INTERVAL_SECONDS', '300'))
+WINDOW_BEFORE_SECONDS = int(os.environ.get('WINDOW_BEFORE_SECONDS', '3600'))
+WINDOW_AFTER_SECONDS = int(os.environ.get('WINDOW_AFTER_SECONDS', str(6 * 3600)))
+
+SCHEDULE_NAME = os.environ.get('SCHEDULE_NAME', 'spacex-ingest-next')
+SCHEDULER_ROLE_ARN = os.environ.get('SCHEDULER_ROLE_ARN', '')
+UPCOMING_PK = 'upcoming'
+MAX_UPCOMING = 50
+
+_scheduler_client = None
+
+
+def compute_next_run(now, upcoming, dense=DENSE_INTERVAL_SECONDS, sparse=SPARSE_INTERVAL_SECONDS,
+                     before=WINDOW_BEFORE_SECONDS, after=WINDOW_AFTER_SECONDS, minimum=MIN_INTERVAL_SECONDS):
+    """Instante unix de la próxima ejecución a partir de los launch_date_unix upcoming"""
+    candidates = [now + sparse]
+    for launch_time in upcoming:
+        if launch_time - before <= now <= launch_time + after:
+            candidates.append(now + dense)
+        elif launch_time - before > now:
+            candidates.append(launch_time - before)
+    return int(max(min(candidates), now + minimum))
+
+
+def upcoming_times(launches, now=None):
+    """Fechas de los lanzamientos upcoming que aún pueden afectar a la programación"""
+    now = time.time() if now is None else now
+    times = sorted(
+        int(launch.get('date_unix') or 0) for launch in launches
+        if launch.get('upcoming') and int(launch.get('date_unix') or 0) + WINDOW_AFTER_SECONDS >= now
+    )
+    return times[:MAX_UPCOMING]
+
+
+def load_upcoming(control, url):
+    item = control.get(UPCOMING_PK, url, consistent=False)
+    return [int(value) for value in item['times']] if item else []
+
+
+def save_upcoming(control, url, times):
+    control.put(UPCOMING_PK, url, {'times': times})
+
+
+def reschedule(run_at, function_arn):
+    """Crea o mueve la programación puntual que invoca la función en `run_at`"""
+    global _scheduler_client
+    if not SCHEDULER_ROLE_ARN or not function_arn:
+        logger.info(f"Next run computed for {run_at} (scheduler not configured)")
+        return False
+    if _scheduler_client is None:
+        _scheduler_client = boto3.client('scheduler')
+    params = {
+        'Name': SCHEDULE_NAME,
+        'ScheduleExpression': f"at({time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(run_at))})",
+        'ScheduleExpressionTimezone': 'UTC',
+        'FlexibleTimeWindow': {'Mode': 'OFF'},
+        'Target': {
+            'Arn': function_arn,
+            'RoleArn': SCHEDULER_ROLE_ARN,
+            'Input': json.dumps({'source': 'adaptive-schedule'})
+        }
+    }
+    try:
+        _scheduler_client.update_schedule(**params)
+    except _scheduler_client.exceptions.ResourceNotFoundException:
+        _scheduler_client.create_schedule(**params)
+    logger.info(f"Next run scheduled for {run_at}")
+    return True
@@ -7,6 +7,20 @@ import sys
 # Agregar el directorio lambda al path
 sys.path.append(os.path.dirname(__file__))
 
+import contextlib
+import io
+import tempfile
+import threading
+import time
+
+import checkpoint
+import conditional_fetch
+import emf
+import fanout
+import ledger
+import lease
+import profiling
+import scheduling
 from lambda_function import SpaceXDataProcessor, lambda_handler
 
 class TestSpaceXDataProcessor(unittest.TestCase):
@@ -33,17 +47,65 @@ class TestSpaceXDataProcessor(unittest.TestCase):
             'flight_number': 1
         }
     
+    def fetch_response(self, status_code=200, body=None, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.content = json.dumps([self.sample_launch]).encode() if body is None else body
+        response.headers = headers or {'ETag': '"v1"'}
+        response.raise_for_status.return_value = None
+        return response
+    
+    def patch_fetch_state(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        state_path = patch.object(conditional_fetch, 'STATE_PATH', os.path.join(directory.name, 'state.json'))
+        state_path.start()
+        self.addCleanup(state_path.stop)
+    
+    @patch('lambda_function.dynamodb')
     @patch('lambda_function.requests.get')
-    def test_fetch_launches_data_success(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.json.return_value = [self.sample_launch]
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+    def test_fetch_launches_data_success(self, mock_get, mock_dynamodb):
+        self.patch_fetch_state()
+        mock_dynamodb.get_item.return_value = {}
+        mock_get.return_value = self.fetch_response()
         
         result = self.processor.fetch_launches_data()
         
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]['name'], 'Test Mission')
+        self.assertEqual(self.processor.pending_fetch_state['etag'], '"v1"')
+        self.assertNotIn('If-None-Match', mock_get.call_args.kwargs['headers'])
+    
+    @patch('lambda_function.dynamodb')
+    @patch('lambda_function.requests.get')
+    def test_not_modified_skips_processing(self, mock_get, mock_dynamodb):
+        self.patch_fetch_state()
+        mock_dynamodb.get_item.return_value = {}
+        mock_get.return_value = self.fetch_response()
+        self.processor.process_launches()
+        mock_dynamodb.reset_mock()
+        
+        mock_get.return_value = self.fetch_response(status_code=304, body=b'')
+        result = SpaceXDataProcessor().process_launches()
+        
+        self.assertTrue(result['unchanged'])
+        self.assertEqual(mock_get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        mock_dynamodb.put_item.assert_not_called()
+    
+    @patch('lambda_function.dynamodb')
+    @patch('lambda_function.requests.get')
+    def test_same_body_hash_skips_processing(self, mock_get, mock_dynamodb):
+        self.patch_fetch_state()
+        mock_dynamodb.get_item.return_value = {}
+        # Sin validadores HTTP: solo el hash detecta que no hay cambios
+        mock_get.return_value = self.fetch_response(headers={})
+        self.processor.process_launches()
+        mock_dynamodb.reset_mock()
+        
+        result = SpaceXDataProcessor().process_launches()
+        
+        self.assertTrue(result['unchanged'])
+        mock_dynamodb.put_item.assert_not_called()
     
     def test_transform_launch_data_success(self):
         transformed = self.processor.transform_launch_data(self.sample_launch)
@@ -61,15 +123,210 @@ class TestSpaceXDataProcessor(unittest.TestCase):
         transformed = self.processor.transform_launch_data(upcoming_launch)
         self.assertEqual(transformed['status'], 'upcoming')
     
-    @patch('lambda_function.table')
-    def test_upsert_launch_data_success(self, mock_table):
-        mock_table.put_item.return_value = {}
+    @patch('lambda_function.dynamodb')
+    def test_upsert_launch_data_success(self, mock_dynamodb):
+        mock_dynamodb.put_item.return_value = {}
         
         result = self.processor.upsert_launch_data({'launch_id': 'test123'})
         self.assertTrue(result)
+    
+    @patch('lambda_function.dynamodb')
+    def test_upsert_launch_data_splits_summary_and_detail(self, mock_dynamodb):
+        transformed = self.processor.transform_launch_data(self.sample_launch)
+        
+        self.processor.upsert_launch_data(transformed)
+        
+        detail_call, summary_call = mock_dynamodb.put_item.call_args_list
+        summary = summary_call.kwargs['Item']
+        self.assertEqual(summary['launch_id'], {'S': 'test123'})
+        self.assertEqual(summary['flight_number'], {'N': '1'})
+        self.assertEqual(summary['payload_types'], {'L': [{'S': 'Satellite'}]})
+        self.assertNotIn('details', summary)
+        
+        detail = detail_call.kwargs['Item']
+        self.assertEqual(detail_call.kwargs['TableName'], 'spacex-launch-details')
+        self.assertEqual(detail['details'], {'S': 'Test launch details'})
+        self.assertNotIn('mission_name', detail)
+    
+    @patch('lambda_function.dynamodb')
+    def test_upsert_compresses_large_detail_attributes(self, mock_dynamodb):
+        transformed = self.processor.transform_launch_data(self.sample_launch)
+        transformed['details'] = 'Long mission description. ' * 40
+        
+        self.processor.upsert_launch_data(transformed)
+        
+        detail = mock_dynamodb.put_item.call_args_list[0].kwargs['Item']
+        self.assertEqual(detail['details']['B'][:2], b'zs')
+        self.assertLess(len(detail['details']['B']), len(transformed['details']))
+        # Por debajo del umbral se mantiene el tipo original
+        self.assertEqual(detail['payload_names'], {'L': [{'S': 'Test Satellite'}]})
+
+class TestCheckpoint(unittest.TestCase):
+    
+    def setUp(self):
+        self.launches = [{'id': launch_id} for launch_id in ('c3', 'a1', 'b2')]
+        self.store = {}
+        for name, implementation in (
+            ('load', lambda control, url: self.store.get(url)),
+            ('save', lambda control, url, saved: self.store.__setitem__(url, dict(saved))),
+            ('clear', lambda control, url: self.store.pop(url, None)),
+        ):
+            patcher = patch.object(checkpoint, name, side_effect=implementation)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(scheduling, 'save_upcoming')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.written = []
+    
+    def processor(self):
+        processor = SpaceXDataProcessor()
+        
+        def fetch(conditional=True):
+            processor.pending_fetch_state = {'etag': None, 'last_modified': None, 'body_hash': 'h1'}
+            return self.launches
+        processor.fetch_launches_data = MagicMock(side_effect=fetch)
+        processor.transform_launch_data = lambda launch: launch
+        processor.upsert_launch_data = lambda launch: self.written.append(launch['id']) or True
+        processor.commit_fetch_state = MagicMock()
+        return processor
+    
+    def test_resumes_after_checkpoint_processing_each_launch_once(self):
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 1000
+        
+        first = self.processor().process_launches(context)
+        self.assertFalse(first['complete'])
+        self.assertEqual(first['remaining'], 2)
+        
+        second_processor = self.processor()
+        second = second_processor.process_launches()
+        
+        self.assertEqual(self.written, ['a1', 'b2', 'c3'])
+        self.assertEqual(second['total_processed'], 3)
+        self.assertEqual(second['invocations'], 2)
+        second_processor.fetch_launches_data.assert_called_once_with(conditional=False)
+        second_processor.commit_fetch_state.assert_called_once_with()
+        self.assertEqual(self.store, {})
+    
+    def test_changed_body_restarts_ingest(self):
+        self.store[SpaceXDataProcessor().spacex_api_url] = {
+            'body_hash': 'old', 'cursor': 'b2', 'total_processed': 2, 'successful_upserts': 2, 'invocations': 1
+        }
+        
+        result = self.processor().process_launches()
+        
+        self.assertEqual(self.written, ['a1', 'b2', 'c3'])
+        self.assertEqual(result['total_processed'], 3)
+
+class TestFanOut(unittest.TestCase):
+    
+    def page(self, page, limit):
+        docs = [{'id': f'launch{n}', 'name': f'Mission {n}'} for n in range((page - 1) * limit, min(page * limit, 5))]
+        return {'docs': docs, 'totalDocs': 5}
+    
+    @patch('lambda_function.dynamodb')
+    @patch('fanout.fetch_page')
+    def test_thread_dispatcher_aggregates_shards(self, mock_fetch_page, mock_dynamodb):
+        mock_fetch_page.side_effect = lambda url, page, limit, **kwargs: self.page(page, limit)
+        
+        with patch.object(fanout, 'FANOUT_DISPATCHER', 'thread'):
+            result = SpaceXDataProcessor().fan_out(page_size=2)
+        
+        self.assertEqual(result['shards'], 3)
+        self.assertEqual(result['total_processed'], 5)
+        self.assertEqual(result['successful_upserts'], 5)
+        self.assertEqual(result['failed_shards'], 0)
+        # Resumen y detalle por lanzamiento
+        self.assertEqual(mock_dynamodb.put_item.call_count, 10)
+    
+    @patch('lambda_function.dynamodb')
+    @patch('fanout.fetch_page')
+    def test_shard_threads_record_into_the_run_ledger(self, mock_fetch_page, mock_dynamodb):
+        mock_fetch_page.side_effect = lambda url, page, limit, **kwargs: self.page(page, limit)
+        mock_dynamodb.put_item.return_value = {}
+        run = ledger.RunLedger('coordinator', kind='fanout')
+        token = ledger.current_run.set(run)
+        try:
+            with patch.object(fanout, 'FANOUT_DISPATCHER', 'thread'):
+                SpaceXDataProcessor().fan_out(page_size=2)
+        finally:
+            ledger.current_run.reset(token)
+        
+        self.assertEqual(run.items_changed, 5)
+        self.assertEqual(len(run.write_latencies_ms), 5)
+    
+    def test_coordinator_stops_waiting_before_its_deadline(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        worker = lambda shard: release.wait(5) if shard['page'] == 2 else {'total_processed': 1}
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = (fanout.FANOUT_SAFETY_MARGIN_SECONDS + 0.1) * 1000
+        
+        start = time.monotonic()
+        results = fanout.ThreadDispatcher(worker).dispatch(
+            [{'page': 1, 'limit': 1}, {'page': 2, 'limit': 1}], fanout.wait_seconds(context)
+        )
+        summary = fanout.aggregate(results)
+        
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(summary['total_processed'], 1)
+        self.assertEqual((summary['failed_shards'], summary['timed_out_shards']), (1, 1))
+        self.assertEqual(ledger.RunLedger('x').entry(summary)['outcome'], 'partial')
+    
+    def test_lambda_dispatcher_reads_worker_results(self):
+        client = MagicMock()
+        body = json.dumps({'result': {'total_processed': 2, 'successful_upserts': 2, 'failed_upserts': 0}})
+        client.invoke.return_value = {'Payload': MagicMock(read=lambda: json.dumps({'statusCode': 200, 'body': body}))}
+        
+        dispatcher = fanout.LambdaDispatcher('spacex-data-processor', max_workers=2, client=client)
+        result = fanout.aggregate(dispatcher.dispatch([{'page': 1, 'limit': 2}, {'page': 2, 'limit': 2}]))
+        
+        self.assertEqual(result['total_processed'], 4)
+        payload = json.loads(client.invoke.call_args.kwargs['Payload'])
+        self.assertIn(payload['shard']['page'], (1, 2))
+
+class TestScheduling(unittest.TestCase):
+    
+    NOW = 1704067200
+    
+    def test_sparse_without_upcoming_launches(self):
+        next_run = scheduling.compute_next_run(self.NOW, [], sparse=43200)
+        self.assertEqual(next_run, self.NOW + 43200)
+    
+    def test_wakes_up_at_the_start_of_the_next_window(self):
+        launch_time = self.NOW + 5 * 3600
+        next_run = scheduling.compute_next_run(self.NOW, [launch_time], sparse=43200, before=3600)
+        self.assertEqual(next_run, launch_time - 3600)
+    
+    def test_dense_inside_the_window_including_after_liftoff(self):
+        for launch_time in (self.NOW + 1800, self.NOW - 4 * 3600):
+            next_run = scheduling.compute_next_run(self.NOW, [launch_time], dense=600, before=3600, after=6 * 3600)
+            self.assertEqual(next_run, self.NOW + 600)
+    
+    def test_never_earlier_than_the_minimum_interval(self):
+        next_run = scheduling.compute_next_run(self.NOW, [self.NOW + 3660], before=3600, minimum=300)
+        self.assertEqual(next_run, self.NOW + 300)
+    
+    def test_upcoming_times_ignores_past_and_landed_launches(self):
+        launches = [
+            {'upcoming': True, 'date_unix': self.NOW + 100},
+            {'upcoming': True, 'date_unix': self.NOW - 30 * 24 * 3600},
+            {'upcoming': False, 'date_unix': self.NOW + 50},
+        ]
+        self.assertEqual(scheduling.upcoming_times(launches, now=self.NOW), [self.NOW + 100])
 
 class TestLambdaHandler(unittest.TestCase):
     
+    def setUp(self):
+        patcher = patch('lambda_function.Lease')
+        self.lease = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.lease.acquire.return_value = True
+        patcher = patch('lambda_function.dynamodb')
+        self.dynamodb = patcher.start()
+        self.addCleanup(patcher.stop)
+    
     @patch('lambda_function.SpaceXDataProcessor')
     def test_lambda_handler_success(self, mock_processor):
         mock_instance = MagicMock()
@@ -78,6 +335,7 @@ class TestLambdaHandler(unittest.TestCase):
             'successful_upserts': 10,
             'failed_upserts': 0
         }
+        mock_instance.schedule_next_run.return_value = 1704067200
         mock_processor.return_value = mock_instance
         
         response = lambda_handler({}, None)
@@ -85,6 +343,166 @@ class TestLambdaHandler(unittest.TestCase):
         self.assertEqual(response['statusCode'], 200)
         body = json.loads(response['body'])
         self.assertEqual(body['message'], 'SpaceX data processed successfully')
+        self.lease.release.assert_called_once_with(mock_instance.process_launches.return_value)
+    
+    @patch('lambda_function.SpaceXDataProcessor')
+    def test_every_invocation_records_a_ledger_entry(self, mock_processor):
+        mock_processor.return_value.process_launches.return_value = {
+            'total_processed': 2, 'successful_upserts': 1, 'failed_upserts': 1
+        }
+        mock_processor.return_value.schedule_next_run.return_value = None
+        
+        lambda_handler({}, None)
+        
+        put = self.dynamodb.put_item.call_args.kwargs
+        self.assertEqual(put['Item']['pk'], {'S': 'run'})
+        self.assertEqual(put['Item']['outcome'], {'S': 'partial'})
+        self.assertEqual(put['Item']['total_processed'], {'N': '2'})
+        self.assertIn('expires_at', put['Item'])
+    
+    @patch('lambda_function.SpaceXDataProcessor')
+    def test_invocation_emits_a_single_emf_line(self, mock_processor):
+        mock_processor.return_value.process_launches.return_value = {
+            'total_processed': 2, 'successful_upserts': 2, 'failed_upserts': 0
+        }
+        mock_processor.return_value.schedule_next_run.return_value = None
+        output = io.StringIO()
+        
+        with contextlib.redirect_stdout(output):
+            lambda_handler({}, None)
+        
+        documents = [json.loads(line) for line in output.getvalue().splitlines() if '"_aws"' in line]
+        self.assertEqual(len(documents), 1)
+        document = documents[0]
+        directive = document['_aws']['CloudWatchMetrics'][0]
+        self.assertEqual(directive['Namespace'], 'SpaceX/Ingest')
+        self.assertEqual(directive['Dimensions'], [['RunKind'], []])
+        for metric in directive['Metrics']:
+            self.assertIn(metric['Name'], document)
+        self.assertEqual(document['RunKind'], 'full')
+        self.assertEqual(document['LaunchesProcessed'], 2)
+    
+    @patch('lambda_function.SpaceXDataProcessor')
+    def test_concurrent_invocation_skips_without_processing(self, mock_processor):
+        self.lease.acquire.return_value = False
+        
+        response = lambda_handler({}, None)
+        
+        body = json.loads(response['body'])
+        self.assertTrue(body['result']['skipped'])
+        mock_processor.return_value.process_launches.assert_not_called()
+        self.lease.release.assert_not_called()
+    
+    @patch('lambda_function.SpaceXDataProcessor')
+    def test_waiting_invocation_reuses_running_result(self, mock_processor):
+        self.lease.acquire.return_value = False
+        self.lease.wait_for_result.return_value = {'total_processed': 3}
+        
+        response = lambda_handler({'wait': 30}, None)
+        
+        body = json.loads(response['body'])
+        self.assertEqual(body['result'], {'total_processed': 3, 'shared': True})
+        self.lease.wait_for_result.assert_called_once_with(30)
+        mock_processor.return_value.process_launches.assert_not_called()
+    
+    @patch('lambda_function.checkpoint.resume')
+    @patch('lambda_function.SpaceXDataProcessor')
+    def test_resume_is_invoked_after_releasing_the_lease(self, mock_processor, mock_resume):
+        calls = MagicMock()
+        calls.attach_mock(self.lease.release, 'release')
+        calls.attach_mock(mock_resume, 'resume')
+        mock_resume.return_value = True
+        mock_processor.return_value.process_launches.return_value = {'total_processed': 1, 'complete': False}
+        
+        lambda_handler({}, None)
+        
+        self.assertEqual([name for name, _, _ in calls.mock_calls], ['release', 'resume'])
+
+
+class TestLedger(unittest.TestCase):
+    
+    def setUp(self):
+        self.run = ledger.RunLedger('request-1')
+        token = ledger.current_run.set(self.run)
+        self.addCleanup(ledger.current_run.reset, token)
+    
+    def test_record_write_ignores_last_updated_when_detecting_changes(self):
+        item = {'launch_id': {'S': 'a1'}, 'status': {'S': 'success'}, 'last_updated': {'S': 'now'}}
+        response = {
+            'Attributes': dict(item, last_updated={'S': 'before'}),
+            'ConsumedCapacity': {'CapacityUnits': 1.0},
+            'ResponseMetadata': {'RetryAttempts': 2}
+        }
+        
+        self.assertFalse(ledger.record_write(response, item))
+        self.assertTrue(ledger.record_write(response, dict(item, status={'S': 'failed'})))
+        self.assertTrue(ledger.record_write({}, item))
+        self.assertEqual(self.run.wcu, 2.0)
+        self.assertEqual(self.run.retries, 4)
+    
+    def test_throttled_responses_are_counted(self):
+        throttled = (MagicMock(), {'Error': {'Code': 'ProvisionedThroughputExceededException'}})
+        ledger.count_throttles(response=throttled, attempts=1)
+        ledger.count_throttles(response=(MagicMock(), {}), attempts=1)
+        ledger.count_throttles(response=None, caught_exception=OSError())
+        self.assertEqual(self.run.throttles, 1)
+    
+    def test_emf_write_latency_percentiles(self):
+        entry = self.run.entry({'total_processed': 100, 'failed_upserts': 3})
+        document = emf.metrics_document(entry, [float(n) for n in range(1, 101)])
+        self.assertEqual(document['WriteLatencyP50'], 51.0)
+        self.assertEqual(document['WriteLatencyP99'], 100.0)
+        self.assertEqual(document['UnprocessedItems'], 3)
+        # Sin escrituras no se declaran percentiles vacíos
+        self.assertNotIn('WriteLatencyP50', emf.metrics_document(entry))
+    
+    def test_stages_accumulate_into_the_entry(self):
+        with ledger.stage('transform'):
+            pass
+        entry = self.run.entry({'unchanged': True})
+        self.assertEqual(entry['outcome'], 'unchanged')
+        self.assertEqual(set(entry['stages_ms']), set(ledger.STAGES))
+
+class TestLease(unittest.TestCase):
+    
+    def test_acquire_is_conditional_and_release_checks_owner(self):
+        control = MagicMock()
+        run_lease = lease.Lease(control, 'request-1')
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 120000
+        
+        run_lease.acquire(context)
+        run_lease.release({'total_processed': 1})
+        
+        put = control.put.call_args_list[0]
+        self.assertEqual(put.kwargs['condition'], 'attribute_not_exists(pk) OR expires_at < :now')
+        self.assertEqual(put.kwargs['ttl_seconds'], 120 + lease.LEASE_MARGIN_SECONDS)
+        control.put.assert_called_with(lease.RESULT_PK, 'ingest', unittest.mock.ANY, ttl_seconds=lease.RESULT_TTL_SECONDS)
+        self.assertEqual(control.delete.call_args.kwargs['values'], {':owner': 'request-1'})
+    
+    def test_expired_lease_has_no_holder(self):
+        control = MagicMock()
+        control.get.return_value = {'owner': 'crashed', 'expires_at': int(time.time()) - 10}
+        self.assertIsNone(lease.Lease(control, 'request-2').holder())
+
+class TestProfiling(unittest.TestCase):
+    
+    def test_disabled_decorator_returns_handler_unchanged(self):
+        handler = lambda event, context: 'ok'
+        self.assertIs(profiling.profile_handler(handler), handler)
+    
+    def test_signed_event_writes_profile(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                patch.object(profiling, 'PROFILE_SECRET', 'secret'), \
+                patch.object(profiling, 'PROFILE_DIR', directory):
+            handler = profiling.profile_handler(lambda event, context: 'ok')
+            
+            self.assertEqual(handler({}, None), 'ok')
+            self.assertEqual(os.listdir(directory), [])
+            
+            event = {'debug_profile': profiling.sign('secret', int(time.time()) + 60)}
+            self.assertEqual(handler(event, None), 'ok')
+            self.assertEqual(len(os.listdir(directory)), 1)
 
 if __name__ == '__main__':
     unittest.main()